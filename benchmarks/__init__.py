@@ -0,0 +1,13 @@
+"""
+    benchmarks/__init__.py
+
+    Benchmarks of the throughput, latency and memory use of nllegalcit.
+
+    Run them from the root of the repository with python -m benchmarks.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
@@ -0,0 +1,99 @@
+"""
+    benchmarks/__main__.py
+
+    Run the benchmarks, save the results as JSON, and compare them with the results of another
+    run, for example of another commit:
+
+        python -m benchmarks --output before.json
+        git checkout other-branch
+        python -m benchmarks --output after.json --compare before.json
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+from typing import Any, Optional
+
+from .suite import BENCHMARKS, run
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, check=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata() -> dict[str, Any]:
+    """Get the environment in which the benchmarks run."""
+
+    return {
+        "commit": _git_commit(),
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def _row(result: dict[str, Any], baseline: Optional[dict[str, Any]]) -> str:
+    row = (f"{result['benchmark']:<32} {result['corpus']:<26} {result['chars_per_second']:>12,.0f}"
+           f" {result['citations_per_second']:>10,.0f} {result['latency_p50_ms']:>9.2f}"
+           f" {result['latency_p99_ms']:>9.2f} {result['peak_memory_bytes'] / 1024 ** 2:>8.1f}")
+
+    if baseline is not None:
+        change = result["chars_per_second"] / baseline["chars_per_second"] - 1
+        row += f" {change:>+8.1%}"
+
+    return row
+
+
+def main() -> int:
+    """Run the benchmarks with the command line arguments."""
+
+    argument_parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark nllegalcit.")
+    argument_parser.add_argument(
+        "-b", "--benchmark", action="append", choices=list(BENCHMARKS),
+        help="run only this benchmark, may be given more than once"
+    )
+    argument_parser.add_argument("--quick", action="store_true", help="skip the largest documents")
+    argument_parser.add_argument("--repeat", type=int, default=3, help="the number of times each corpus is parsed")
+    argument_parser.add_argument("-o", "--output", help="save the results as JSON to this file")
+    argument_parser.add_argument("--compare", metavar="BASELINE", help="compare the throughput with a saved JSON file")
+    args = argument_parser.parse_args()
+
+    baselines: dict[tuple[str, str], dict[str, Any]] = {}
+    if args.compare is not None:
+        with open(args.compare, encoding="utf-8") as f:
+            baselines = {(r["benchmark"], r["corpus"]): r for r in json.load(f)["results"]}
+
+    header = (f"{'benchmark':<32} {'corpus':<26} {'chars/s':>12} {'cit/s':>10} {'p50 ms':>9} {'p99 ms':>9}"
+              f" {'peak MiB':>8}")
+    print(header + (f" {'chars/s':>8}" if baselines else ""))
+
+    def progress(result: dict[str, Any]) -> None:
+        print(_row(result, baselines.get((result["benchmark"], result["corpus"]))), flush=True)
+
+    results = run(args.benchmark, args.quick, args.repeat, progress)
+
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"metadata": metadata(), "results": results}, f, indent=2)
+            f.write("\n")
+
+    return 0
+
+
+sys.exit(main())
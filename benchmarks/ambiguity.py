@@ -0,0 +1,193 @@
+"""
+    benchmarks/ambiguity.py
+
+    Report which rules of a citation grammar have ambiguous derivations on a corpus, and how
+    much they add to the shared packed parse forest (SPPF) that the Earley parser builds:
+
+        python -m benchmarks.ambiguity
+        python -m benchmarks.ambiguity --types kamerstuk --density 30
+
+    The windows found by the prefilter in citation-dense synthetic documents are parsed with
+    ambiguity="forest". A node of the forest is ambiguous if it has more than one derivation.
+    The Earley parser keeps the first derivation (in the order in which it resolves ambiguity),
+    and the nodes that are only reachable through the other derivations are discarded: these
+    are counted for the rule of the outermost ambiguous node that leads to them. The rule
+    __start_plus_0 is the repetition of the start rule, in which the text is split into
+    citations and the text in between them.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+import argparse
+import sys
+from typing import Any, Iterable, Optional
+
+from lark import Lark
+from lark.parsers.earley_forest import SymbolNode
+
+from nllegalcit.grammar import load_parser
+from nllegalcit.parser import _grammar
+
+from .corpora import synthetic_document
+
+
+class RuleAmbiguity():  # pylint: disable=too-few-public-methods
+    """The nodes of a rule in the forests of a corpus, and the ambiguity in them"""
+
+    def __init__(self, rule: str):
+        self.rule = rule
+
+        #: The symbol nodes of the rule, and their packed nodes (one for each derivation)
+        self.nodes = 0
+
+        #: The symbol nodes of the rule with more than one derivation
+        self.ambiguous = 0
+
+        #: The derivations of the ambiguous nodes after the first one
+        self.alternatives = 0
+
+        #: The nodes which are only reachable through the discarded derivations of the rule
+        self.discarded = 0
+
+
+def _rule(node: SymbolNode) -> str:
+    # An intermediate node is a partially matched expansion of a rule
+    return str(node.s[0].origin.name if node.is_intermediate else node.s.name)
+
+
+class ForestProfile():
+    """The size of the forests of a corpus, and of the ambiguity of each rule in them"""
+
+    def __init__(self) -> None:
+        self.rules: dict[str, RuleAmbiguity] = {}
+        self.windows = 0
+        self.chars = 0
+        self.nodes = 0
+        self.resolved = 0
+
+    def _rule(self, node: SymbolNode) -> RuleAmbiguity:
+        name = _rule(node)
+        if name not in self.rules:
+            self.rules[name] = RuleAmbiguity(name)
+
+        return self.rules[name]
+
+    def add(self, root: SymbolNode, chars: int) -> None:
+        """Add the forest with the given root, of a window of chars characters."""
+
+        self.windows += 1
+        self.chars += chars
+
+        # The packed nodes of each symbol node, sorted by the order in which they are resolved
+        children: dict[int, list[Any]] = {}
+
+        def symbols(packed_node: Any) -> Iterable[SymbolNode]:
+            return (child for child in (packed_node.left, packed_node.right) if isinstance(child, SymbolNode))
+
+        def visit(node: SymbolNode) -> bool:
+            if id(node) in children:
+                return False
+
+            children[id(node)] = node.children
+            rule = self._rule(node)
+            rule.nodes += 1 + len(children[id(node)])
+            if len(children[id(node)]) > 1:
+                rule.ambiguous += 1
+                rule.alternatives += len(children[id(node)]) - 1
+
+            return True
+
+        # The resolved derivation, which takes the first derivation of every node
+        resolved = []
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if visit(node):
+                resolved.append(node)
+                stack.extend(symbols(children[id(node)][0]))
+
+        self.resolved += 2 * len(resolved)
+
+        # The discarded derivations of the ambiguous nodes in the resolved derivation
+        for node in resolved:
+            rule = self._rule(node)
+            for packed_node in children[id(node)][1:]:
+                rule.discarded += 1
+                stack = list(symbols(packed_node))
+                while stack:
+                    discarded = stack.pop()
+                    if visit(discarded):
+                        rule.discarded += 1 + len(children[id(discarded)])
+                        for child in children[id(discarded)]:
+                            stack.extend(symbols(child))
+
+        self.nodes += sum(1 + len(packed_nodes) for packed_nodes in children.values())
+
+    def report(self) -> str:
+        """Format the profile as a table, with the rules that add the most nodes first."""
+
+        lines = [
+            f"{self.windows} windows, {self.chars:,} characters: {self.nodes:,} nodes,"
+            f" of which {self.resolved:,} in the resolved derivations"
+            f" ({self.resolved / max(self.nodes, 1):.0%})",
+            "",
+            f"{'rule':<40} {'nodes':>9} {'share':>6} {'ambiguous':>10} {'alternatives':>13} {'discarded':>10}",
+        ]
+        for rule in sorted(self.rules.values(), key=lambda r: (-r.discarded, -r.alternatives, -r.nodes)):
+            lines.append(f"{rule.rule:<40} {rule.nodes:>9,} {rule.nodes / max(self.nodes, 1):>6.1%}"
+                         f" {rule.ambiguous:>10,} {rule.alternatives:>13,} {rule.discarded:>10,}")
+
+        return "\n".join(lines)
+
+
+def forest_parser(types: Optional[Iterable[str]] = None) -> Lark:
+    """Load the Earley parser of the grammar of the given types of citations, which returns the SPPF."""
+
+    grammar = _grammar(types)
+    return load_parser(grammar.name, grammar.source, parser="earley", ambiguity="forest")
+
+
+def profile(texts: Iterable[str], types: Optional[Iterable[str]] = None, prefilter: bool = True) -> ForestProfile:
+    """Parse the windows of texts found by the prefilter (or the complete texts), and profile their forests."""
+
+    grammar = _grammar(types)
+    lark_parser = forest_parser(types)
+    forest_profile = ForestProfile()
+    for text in texts:
+        for start, end in grammar.windows(text, prefilter):
+            # With ambiguity="forest", the root of the SPPF is returned instead of a tree
+            forest_profile.add(lark_parser.parse(text[start:end]), end - start)  # type: ignore[arg-type]
+
+    return forest_profile
+
+
+def main() -> int:
+    """Profile the ambiguity of a grammar with the command line arguments."""
+
+    argument_parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.ambiguity",
+        description="Report the ambiguous rules of a citation grammar on synthetic documents."
+    )
+    argument_parser.add_argument("--types", help="the types of citations of the grammar, separated by commas")
+    argument_parser.add_argument("--documents", type=int, default=3, help="the number of synthetic documents")
+    argument_parser.add_argument("--size", type=int, default=10_000,
+                                 help="the size of the synthetic documents, in characters")
+    argument_parser.add_argument("--density", type=float, default=10.0,
+                                 help="the number of citations per 1000 characters")
+    argument_parser.add_argument("--no-prefilter", action="store_true",
+                                 help="parse the complete documents instead of the windows found by the prefilter")
+    args = argument_parser.parse_args()
+
+    types = args.types.split(",") if args.types else None
+    texts = [synthetic_document(args.size, args.density, seed) for seed in range(args.documents)]
+    print(profile(texts, types, not args.no_prefilter).report())
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
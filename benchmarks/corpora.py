@@ -0,0 +1,151 @@
+"""
+    benchmarks/corpora.py
+
+    The documents used in the benchmarks: the inputs of the linkextractor test cases, and
+    synthetic documents of growing size and citation density.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+import ast
+import pathlib
+import random
+
+TESTS_DIR = pathlib.Path(__file__).parent.parent / "tests"
+
+LINKEXTRACTOR_DIR = TESTS_DIR / "linkextractor"
+
+# Sentences without citations, some of which contain trigger terms of the prefilter
+PROSE = [
+    "De rechtbank overweegt dat de verdachte op 12 maart 2019 te Amsterdam opzettelijk heeft gehandeld.",
+    "Het hof is van oordeel dat artikel 6 EVRM niet is geschonden.",
+    "Zoals blijkt uit de verklaringen van getuigen en het proces-verbaal van 3 april 2020, is dat niet het geval.",
+    "Zie ook de conclusie van de A-G onder punt 4.2, p. 17.",
+    "De Hoge Raad heeft eerder geoordeeld dat een dergelijke uitleg niet strookt met de wetsgeschiedenis.",
+    "In de memorie van toelichting wordt hierover niets opgemerkt.",
+    "Het beroep in cassatie is gericht tegen de uitspraak van het gerechtshof van 14 juli 2021.",
+    "Het middel faalt.",
+]
+
+# Citations, with a placeholder for a number which varies between citations
+CITATIONS = [
+    "ECLI:NL:HR:2006:AV{n:04d}",
+    "ECLI:NL:RBAMS:2019:{n}",
+    "HR 12 januari 2007, LJN AZ{n:04d}",
+    "Kamerstukken II 2005/06, 30 {n:03d}, nr. 3",
+    "Kamerstukken I 1979/80, 15 {n:03d}, nr. 42e, blz. 7",
+    "Kamerstukken II 2019/20, 35 {n:03d}, nr. 6, p. 12",
+    "Kamerstukken II 2016/17, 34 {n:03d}, nr. 3, p. 25-26",
+]
+
+
+def linkextractor_inputs() -> list[str]:
+    """Get the inputs of the linkextractor test cases in tests/linkextractor."""
+
+    inputs = []
+    for path in sorted(LINKEXTRACTOR_DIR.glob("test_*.py")):
+        for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"))):
+            if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.args):
+                continue
+
+            argument = node.args[0]
+            if node.func.id in ("parse_citations", "parse_kamerstukcitation") and isinstance(argument, ast.Constant) \
+                    and isinstance(argument.value, str):
+                inputs.append(argument.value)
+
+    return inputs
+
+
+def test_inputs() -> list[str]:
+    """Get every distinct string in the test cases in tests, which includes all their inputs."""
+
+    inputs: dict[str, None] = {}
+    for path in sorted(TESTS_DIR.glob("**/*.py")):
+        for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"))):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str) and node.value.strip():
+                inputs[node.value] = None
+
+    return list(inputs)
+
+
+def synthetic_document(size: int, density: float, seed: int = 0) -> str:
+    """Create a document of about size characters, with density citations per 1000 characters.
+
+    Paragraphs of a few sentences are separated by blank lines. The same size, density and
+    seed always give the same document.
+    """
+
+    rng = random.Random(seed)
+    parts: list[str] = []
+    length = 0
+    sentences = 0
+    next_citation = rng.expovariate(density / 1000) if density > 0 else float("inf")
+
+    while length < size:
+        if length >= next_citation:
+            sentence = f"Zie {rng.choice(CITATIONS).format(n=rng.randrange(1000))}."
+            next_citation += rng.expovariate(density / 1000)
+        else:
+            sentence = rng.choice(PROSE)
+
+        sentences += 1
+        separator = "\n\n" if sentences % 5 == 0 else " "
+        parts.append(sentence + separator)
+        length += len(sentence) + len(separator)
+
+    return "".join(parts)
+
+
+def split_pages(text: str, page_size: int = 3000) -> list[str]:
+    """Split a document into pages of about page_size characters, with lines of at most 90 characters."""
+
+    pages: list[str] = []
+    lines: list[str] = []
+    line = ""
+    page_length = 0
+
+    for word in text.split(" "):
+        if len(line) + len(word) >= 90 or "\n" in word:
+            lines.append(line)
+            page_length += len(line)
+            line = ""
+
+            if page_length >= page_size:
+                pages.append("\n".join(lines))
+                lines = []
+                page_length = 0
+
+        line = f"{line} {word.strip()}" if line else word.strip()
+
+    lines.append(line)
+    pages.append("\n".join(lines))
+
+    return pages
+
+
+# Text which is inserted by mutate_document, to create citations that are almost correct
+INSERTIONS = [" ", ",", ".", ":", "/", "-", "–", "0", "7", "nr.", "p.", "II", "LJN", "ECLI:NL:", "HR", "blz. "]
+
+
+def mutate_document(text: str, mutations: int, seed: int = 0) -> str:
+    """Make mutations random edits to text: delete, duplicate or insert a few characters.
+
+    The same text, number of mutations and seed always give the same document.
+    """
+
+    rng = random.Random(seed)
+    for _ in range(mutations):
+        position = rng.randrange(len(text) + 1)
+        edit = rng.randrange(3)
+        if edit == 0:
+            text = text[:position] + text[position + rng.randint(1, 3):]
+        elif edit == 1:
+            text = text[:position] + text[position:position + rng.randint(1, 8)] + text[position:]
+        else:
+            text = text[:position] + rng.choice(INSERTIONS) + text[position:]
+
+    return text
@@ -0,0 +1,151 @@
+"""
+    benchmarks/differential.py
+
+    Parse every test input and a large synthetic corpus with both the Earley and the regex
+    engine, and report every text on which they disagree:
+
+        python -m benchmarks.differential
+
+    The synthetic corpus consists of citation-dense documents, and of copies of them with random
+    edits, which contain many almost correct citations. The exit status is 1 if the engines
+    disagree on any text.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+import argparse
+import functools
+import sys
+import time
+from typing import Any, Callable, Iterator, Optional
+
+from nllegalcit import CitationParseException, parse_citations, parse_kamerstukcitation
+
+from .corpora import linkextractor_inputs, mutate_document, synthetic_document, test_inputs
+
+#: The functions that are compared, which are called as function(text, engine=engine)
+FUNCTIONS: dict[str, Callable[..., list]] = {
+    "parse_citations": parse_citations,
+    "parse_citations[prefilter=False]": functools.partial(parse_citations, prefilter=False),
+    "parse_kamerstukcitation": parse_kamerstukcitation,
+    "parse_citations[ecli]": functools.partial(parse_citations, types=("ecli",)),
+    "parse_citations[ljn]": functools.partial(parse_citations, types=("ljn",)),
+    "parse_citations[ecli,ljn]": functools.partial(parse_citations, types=("ecli", "ljn")),
+}
+
+#: The densities (citations per 1000 characters) of the synthetic documents
+DENSITIES: tuple[float, ...] = (2.0, 10.0, 30.0)
+
+
+class Disagreement():  # pylint: disable=too-few-public-methods
+    """The citations that the engines found in a text (or the exception they raised), if they are not the same"""
+
+    def __init__(self, corpus: str, function: str, text: str, earley: Any, regex: Any):
+        self.corpus = corpus
+        self.function = function
+        self.text = text
+        self.earley = earley
+        self.regex = regex
+
+    def __str__(self) -> str:
+        lines = [f"{self.corpus}, {self.function}: {self.text[:200]!r}"]
+        for engine, citations in (("earley", self.earley), ("regex", self.regex)):
+            if isinstance(citations, Exception):
+                lines.append(f"  {engine}: {citations!r}")
+            else:
+                lines.append(f"  {engine}: " + ", ".join(f"{c!r} [{c.start}:{c.end}]" for c in citations))
+
+        return "\n".join(lines)
+
+
+def _key(citations: Any) -> Any:
+    if isinstance(citations, Exception):
+        return repr(citations)
+
+    # Citations compare equal regardless of their position
+    return [(c, c.start, c.end) for c in citations]
+
+
+def corpora(documents: int, size: int, mutations: int) -> Iterator[tuple[str, list[str], list[str]]]:
+    """Yield the (name, texts, functions) of the compared corpora.
+
+    The synthetic documents are only compared with a prefilter, as parsing them completely with
+    the Earley parser takes very long.
+    """
+
+    yield "linkextractor", linkextractor_inputs(), list(FUNCTIONS)
+    yield "tests", test_inputs(), list(FUNCTIONS)
+
+    functions = [name for name in FUNCTIONS if name != "parse_citations[prefilter=False]"]
+    for density in DENSITIES:
+        texts = [synthetic_document(size, density, seed) for seed in range(documents)]
+        yield f"synthetic-{size}-{density:g}", texts, functions
+        yield (f"mutated-{size}-{density:g}",
+               [mutate_document(text, mutations, seed) for seed, text in enumerate(texts)], functions)
+
+
+def compare(
+        corpus: str,
+        texts: list[str],
+        functions: list[str],
+        seconds: Optional[dict[str, float]] = None) -> Iterator[Disagreement]:
+    """Parse texts with both engines and the given FUNCTIONS, and yield every disagreement.
+
+    A CitationParseException (for a citation that matches the grammar, but is invalid) is
+    compared like a result, as both engines should raise it. If a seconds dictionary is given,
+    the time spent by each engine is added to it.
+    """
+
+    for name in functions:
+        function = FUNCTIONS[name]
+        for text in texts:
+            found: dict[str, Any] = {}
+            for engine in ("earley", "regex"):
+                start = time.perf_counter()
+                try:
+                    found[engine] = function(text, engine=engine)
+                except CitationParseException as e:
+                    found[engine] = e
+                if seconds is not None:
+                    seconds[engine] = seconds.get(engine, 0.0) + time.perf_counter() - start
+
+            if _key(found["earley"]) != _key(found["regex"]):
+                yield Disagreement(corpus, name, text, found["earley"], found["regex"])
+
+
+def main() -> int:
+    """Compare the engines with the command line arguments."""
+
+    argument_parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.differential", description="Compare the Earley and regex engines of nllegalcit."
+    )
+    argument_parser.add_argument("--documents", type=int, default=10,
+                                 help="the number of synthetic documents of each density")
+    argument_parser.add_argument("--size", type=int, default=10_000,
+                                 help="the size of the synthetic documents, in characters")
+    argument_parser.add_argument("--mutations", type=int, default=200,
+                                 help="the number of random edits of each mutated document")
+    args = argument_parser.parse_args()
+
+    disagreements = 0
+    for corpus, texts, functions in corpora(args.documents, args.size, args.mutations):
+        seconds: dict[str, float] = {}
+        corpus_disagreements = 0
+        for disagreement in compare(corpus, texts, functions, seconds):
+            print(disagreement, flush=True)
+            corpus_disagreements += 1
+
+        print(f"{corpus}: {len(texts)} texts, {sum(len(text) for text in texts):,} characters,"
+              f" {corpus_disagreements} disagreements (earley {seconds['earley']:.1f} s,"
+              f" regex {seconds['regex']:.1f} s)", flush=True)
+        disagreements += corpus_disagreements
+
+    return 1 if disagreements else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
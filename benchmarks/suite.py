@@ -0,0 +1,222 @@
+"""
+    benchmarks/suite.py
+
+    Measure the throughput, latency and peak memory use of the parse functions on the
+    benchmark corpora.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+import functools
+import io
+import math
+import time
+import tracemalloc
+from typing import Any, Callable, Iterator, Optional
+
+from nllegalcit import parse_citations, parse_citations_from_pdf, parse_kamerstukcitation
+from nllegalcit.parser import parser
+from nllegalcit.prefilter import candidate_windows
+from nllegalcit.visitors import CitationVisitor
+
+from tests.pdf import make_pdf
+
+from .corpora import linkextractor_inputs, split_pages, synthetic_document
+
+#: Sizes (in characters) of the synthetic documents
+SIZES: tuple[int, ...] = (10_000, 100_000, 1_000_000)
+
+#: Sizes of the synthetic documents with the quick option
+QUICK_SIZES: tuple[int, ...] = (10_000,)
+
+#: Densities (citations per 1000 characters) of the synthetic documents
+DENSITIES: tuple[float, ...] = (0.5, 2.0, 10.0)
+
+#: Density of the synthetic PDF files
+PDF_DENSITY: float = 2.0
+
+#: Densities of the synthetic documents of which only visiting the parse trees is benchmarked
+TREE_DENSITIES: tuple[float, ...] = (2.0, 10.0)
+
+#: Subsets of the citation types for which parse_citations(types=...) is benchmarked
+TYPE_SUBSETS: tuple[tuple[str, ...], ...] = (("ecli",), ("ljn",), ("ecli", "ljn"), ("kamerstuk",))
+
+
+class Corpus():  # pylint: disable=too-few-public-methods
+    """A named list of documents, with the number of characters of the text of each document"""
+
+    def __init__(self, name: str, documents: list[Any], chars: list[int]):
+        self.name = name
+        self.documents = documents
+        self.chars = chars
+
+
+def _synthetic_count(size: int) -> int:
+    """The number of synthetic documents of a size in a corpus, to get a latency distribution of small documents"""
+
+    return max(1, min(5, 50_000 // size))
+
+
+def text_corpora(sizes: tuple[int, ...]) -> Iterator[Corpus]:
+    """Yield the linkextractor inputs, and the synthetic text corpora of the given sizes."""
+
+    inputs = linkextractor_inputs()
+    yield Corpus("linkextractor", inputs, [len(text) for text in inputs])
+
+    for size in sizes:
+        for density in DENSITIES:
+            documents = [synthetic_document(size, density, seed) for seed in range(_synthetic_count(size))]
+            yield Corpus(f"synthetic-{size}-{density:g}", documents, [len(text) for text in documents])
+
+
+def pdf_corpora(sizes: tuple[int, ...]) -> Iterator[Corpus]:
+    """Yield the synthetic PDF corpora of the given sizes."""
+
+    for size in sizes:
+        documents = []
+        chars = []
+        for seed in range(_synthetic_count(size)):
+            pages = split_pages(synthetic_document(size, PDF_DENSITY, seed))
+            documents.append(make_pdf(pages))
+            chars.append(sum(len(page) for page in pages))
+
+        yield Corpus(f"pdf-{size}-{PDF_DENSITY:g}", documents, chars)
+
+
+def tree_corpora(sizes: tuple[int, ...]) -> Iterator[Corpus]:
+    """Yield corpora of the parse trees of citation-dense synthetic documents of the smallest size.
+
+    Every document is a list of (window, offset, parse tree) tuples, one for each window found by
+    the prefilter.
+    """
+
+    size = min(sizes)
+    for density in TREE_DENSITIES:
+        documents = []
+        chars = []
+        for seed in range(_synthetic_count(size)):
+            text = synthetic_document(size, density, seed)
+            documents.append([(text[start:end], start, parser.parse(text[start:end]))
+                              for start, end in candidate_windows(text)])
+            chars.append(len(text))
+
+        yield Corpus(f"trees-{size}-{density:g}", documents, chars)
+
+
+def _parse_pdf(document: bytes) -> list:
+    return parse_citations_from_pdf(io.BytesIO(document))
+
+
+def _visit_trees(document: list[tuple[str, int, Any]]) -> list:
+    citations = []
+    for window, offset, tree in document:
+        v = CitationVisitor(window, offset)
+        v.visit(tree)
+        citations.extend(v.citations)
+
+    return citations
+
+
+#: The benchmarked functions, and the kind of corpora they take
+BENCHMARKS: dict[str, tuple[Callable[[Any], list], str]] = {
+    "parse_citations": (parse_citations, "text"),
+    "parse_kamerstukcitation": (parse_kamerstukcitation, "text"),
+    "parse_citations[regex]": (functools.partial(parse_citations, engine="regex"), "text"),
+    "parse_kamerstukcitation[regex]": (functools.partial(parse_kamerstukcitation, engine="regex"), "text"),
+    "parse_citations_from_pdf": (_parse_pdf, "pdf"),
+    "visit_citations": (_visit_trees, "trees"),
+}
+BENCHMARKS.update({
+    f"parse_citations[{','.join(types)}]": (functools.partial(parse_citations, types=types), "text")
+    for types in TYPE_SUBSETS
+})
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Get the p-th percentile of values, by the nearest-rank method."""
+
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def _peak_memory(function: Callable[[Any], list], document: Any) -> int:
+    """Get the largest amount of memory allocated while parsing a document, in bytes."""
+
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        function(document)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    return peak
+
+
+def measure(benchmark: str, corpus: Corpus, repeat: int = 3) -> dict[str, Any]:
+    """Parse every document in the corpus repeat times with a benchmarked function, and measure it.
+
+    The latencies are those of single documents. The peak memory is measured while parsing the
+    largest document once more, as tracing memory allocations slows down parsing.
+    """
+
+    function = BENCHMARKS[benchmark][0]
+    latencies: list[float] = []
+    citations = 0
+
+    for _ in range(repeat):
+        citations = 0
+        for document in corpus.documents:
+            start = time.perf_counter()
+            citations += len(function(document))
+            latencies.append(time.perf_counter() - start)
+
+    seconds = sum(latencies) / repeat
+    chars = sum(corpus.chars)
+
+    return {
+        "benchmark": benchmark,
+        "corpus": corpus.name,
+        "documents": len(corpus.documents),
+        "chars": chars,
+        "citations": citations,
+        "seconds": seconds,
+        "chars_per_second": chars / seconds,
+        "citations_per_second": citations / seconds,
+        "latency_p50_ms": percentile(latencies, 50) * 1000,
+        "latency_p99_ms": percentile(latencies, 99) * 1000,
+        "peak_memory_bytes": _peak_memory(function, corpus.documents[corpus.chars.index(max(corpus.chars))]),
+    }
+
+
+def run(
+        benchmarks: Optional[list[str]] = None,
+        quick: bool = False,
+        repeat: int = 3,
+        progress: Optional[Callable[[dict[str, Any]], None]] = None) -> list[dict[str, Any]]:
+    """Run the benchmarks (by default all of them), and return a result for each benchmark and corpus."""
+
+    sizes = QUICK_SIZES if quick else SIZES
+    create_corpora = {"text": text_corpora(sizes), "pdf": pdf_corpora(sizes[:2]), "trees": tree_corpora(sizes)}
+    corpora: dict[str, list[Corpus]] = {}
+
+    results = []
+    for benchmark in benchmarks or list(BENCHMARKS):
+        function, kind = BENCHMARKS[benchmark]
+        if kind not in corpora:
+            corpora[kind] = list(create_corpora[kind])
+
+        # Parse one document first, so that one-time initialization is not measured
+        function(corpora[kind][0].documents[0])
+
+        for corpus in corpora[kind]:
+            result = measure(benchmark, corpus, repeat)
+            results.append(result)
+            if progress is not None:
+                progress(result)
+
+    return results
@@ -10,17 +10,50 @@
 
 # mypy: disable-error-code="name-defined"
 
-from .citations import Citation, CaseLawCitation, LjnCitation, EcliCitation, KamerstukCitation
+from .citations import Citation, CaseLawCitation, LjnCitation, EcliCitation, KamerstukCitation, CitationSummary
 from .parser import parse_citations, parse_citations_from_pdf, parse_citations_from_pdf_url, parse_kamerstukcitation
+from .parser import iter_citations, iter_citations_from_pdf, iter_kamerstukcitations, summarize_citations
 from .errors import CitationParseException
 from .utils import ecli_citation_from_correct_string
+from .batch import BatchResult, parse_citations_batch, parse_citations_from_pdf_batch
+from .fetch import parse_citations_from_pdf_urls
+from .columnar import CitationColumns, ParquetCitationWriter
+from .graph import CitationGraph, CitationGraphBuilder
+from .ljn import LjnIndex, build_ljn_index
+from .cache import CitationCache
+from .memo import ParagraphCache
+from .document import Document
+from .stats import Stats, collect_stats
 
 del visitors  # pylint: disable=undefined-variable
 del errors  # pylint: disable=undefined-variable
 del citations  # pylint: disable=undefined-variable
 del parser  # pylint: disable=undefined-variable
 del utils  # pylint: disable=undefined-variable
+del batch  # pylint: disable=undefined-variable
+del grammar  # pylint: disable=undefined-variable
+del prefilter  # pylint: disable=undefined-variable
+del windows  # pylint: disable=undefined-variable
+del fetch  # pylint: disable=undefined-variable
+del pdf  # pylint: disable=undefined-variable
+del columnar  # pylint: disable=undefined-variable
+del graph  # pylint: disable=undefined-variable
+del ljn  # pylint: disable=undefined-variable
+del cache  # pylint: disable=undefined-variable
+del memo  # pylint: disable=undefined-variable
+del stats  # pylint: disable=undefined-variable
+del regexparser  # pylint: disable=undefined-variable
+del document  # pylint: disable=undefined-variable
 
 __all__ = ["Citation", "CaseLawCitation", "EcliCitation", "KamerstukCitation",
            "parse_citations", "parse_citations_from_pdf", "parse_citations_from_pdf_url", "parse_kamerstukcitation",
+           "iter_citations", "iter_citations_from_pdf", "iter_kamerstukcitations",
+           "CitationSummary", "summarize_citations",
+           "BatchResult", "parse_citations_batch", "parse_citations_from_pdf_batch",
+           "parse_citations_from_pdf_urls",
+           "CitationColumns", "ParquetCitationWriter",
+           "CitationGraph", "CitationGraphBuilder",
+           "LjnIndex", "build_ljn_index",
+           "CitationCache", "ParagraphCache", "Document",
+           "Stats", "collect_stats",
            "CitationParseException"]
@@ -0,0 +1,17 @@
+"""
+    nllegalcit/__main__.py
+
+    Run the nllegalcit command with python -m nllegalcit.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
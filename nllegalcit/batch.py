@@ -0,0 +1,120 @@
+"""
+    nllegalcit/batch.py
+
+    Parse citations in many documents at once, using multiple processes.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+import multiprocessing
+import pathlib
+import time
+from typing import Any, Callable, Iterable, Optional
+
+from .citations import Citation
+from .parser import parse_citations, parse_citations_from_pdf
+
+
+class BatchResult():  # pylint: disable=too-few-public-methods
+    """The result of parsing one document in a batch"""
+
+    #: The citations found in the document
+    citations: list[Citation]
+
+    #: The time it took to parse the document, in seconds
+    seconds: float
+
+    def __init__(self, citations: list[Citation], seconds: float):
+        self.citations = citations
+        self.seconds = seconds
+
+    def __repr__(self) -> str:
+        return f"BatchResult({self.citations!r}, seconds={self.seconds:.3f})"
+
+
+# Function and keyword arguments used to parse one document, set per worker process
+_worker_function: Callable[..., list[Citation]] = parse_citations
+_worker_kwargs: dict[str, Any] = {}
+
+
+def _init_worker(function: Callable[..., list[Citation]], kwargs: dict[str, Any]) -> None:
+    """Initialize a worker process.
+
+    Importing nllegalcit (which happens before this is called) loads the grammar, so this only
+    happens once per worker, and not for every document.
+    """
+
+    global _worker_function, _worker_kwargs  # pylint: disable=global-statement
+
+    _worker_function = function
+    _worker_kwargs = kwargs
+
+
+def _parse(function: Callable[..., list[Citation]], kwargs: dict[str, Any], document: Any) -> BatchResult:
+    start = time.perf_counter()
+    citations = function(document, **kwargs)
+
+    return BatchResult(citations, time.perf_counter() - start)
+
+
+def _parse_one(document: Any) -> BatchResult:
+    """Parse one document in a worker process, with the function and arguments set by _init_worker."""
+    return _parse(_worker_function, _worker_kwargs, document)
+
+
+def _run_batch(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+        function: Callable[..., list[Citation]],
+        documents: Iterable[Any],
+        workers: Optional[int],
+        chunksize: int,
+        max_tasks_per_child: Optional[int],
+        kwargs: dict[str, Any]) -> list[BatchResult]:
+
+    if workers == 1:
+        return [_parse(function, kwargs, document) for document in documents]
+
+    with multiprocessing.Pool(
+            processes=workers,
+            initializer=_init_worker,
+            initargs=(function, kwargs),
+            maxtasksperchild=max_tasks_per_child) as pool:
+        return list(pool.imap(_parse_one, documents, chunksize=chunksize))
+
+
+def parse_citations_batch(
+        texts: Iterable[str],
+        workers: Optional[int] = None,
+        chunksize: int = 1,
+        max_tasks_per_child: Optional[int] = None,
+        **kwargs) -> list[BatchResult]:
+    """Parse any supported citation in each of the given texts, using a pool of processes.
+
+    workers is the number of processes to use, which defaults to the number of CPUs. With
+    workers=1, the texts are parsed in the current process. Texts are sent to the workers in
+    chunks of chunksize texts, and each worker is replaced by a new process after
+    max_tasks_per_child chunks, if given. Any other keyword arguments are passed on to
+    parse_citations.
+
+    Returns one BatchResult for each text, in the same order as the given texts.
+    """
+
+    return _run_batch(parse_citations, texts, workers, chunksize, max_tasks_per_child, kwargs)
+
+
+def parse_citations_from_pdf_batch(
+        pdffiles: Iterable[str | pathlib.Path],
+        workers: Optional[int] = None,
+        chunksize: int = 1,
+        max_tasks_per_child: Optional[int] = 100,
+        **kwargs) -> list[BatchResult]:
+    """Parse any supported citations in each of the given PDF files, using a pool of processes.
+
+    This works like parse_citations_batch, but by default replaces every worker process after
+    100 chunks, to limit the memory that builds up in long-running processes that read PDFs.
+    """
+
+    return _run_batch(parse_citations_from_pdf, pdffiles, workers, chunksize, max_tasks_per_child, kwargs)
@@ -0,0 +1,267 @@
+"""
+    nllegalcit/cache.py
+
+    A persistent cache of parse results in an SQLite database, keyed by the contents of the
+    parsed document, the arguments that change the results, and the version of the code.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+import hashlib
+import io
+import json
+import mmap
+import pathlib
+import sqlite3
+import time
+from typing import Any, IO, Iterable, Optional
+
+from .citations import Citation, EcliCitation, KamerstukCitation, LjnCitation
+from .grammar import cache_dir, grammar_hash
+from .memo import ParagraphCache
+from .parser import parse_citations, parse_citations_from_pdf
+
+#: The default maximum size of the stored results, in bytes
+DEFAULT_MAX_SIZE: int = 1024 ** 3
+
+# Last access times are only updated if they are older than this, in seconds, so that most
+# cache hits do not need to write to the database
+_ACCESS_RESOLUTION = 3600
+
+_CITATION_CLASSES: dict[str, type[Citation]] = {
+    "EcliCitation": EcliCitation,
+    "LjnCitation": LjnCitation,
+    "KamerstukCitation": KamerstukCitation,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    accessed INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed);
+CREATE TABLE IF NOT EXISTS total (size INTEGER NOT NULL);
+INSERT INTO total SELECT 0 WHERE NOT EXISTS (SELECT * FROM total);
+CREATE TRIGGER IF NOT EXISTS results_insert AFTER INSERT ON results
+    BEGIN UPDATE total SET size = size + new.size; END;
+CREATE TRIGGER IF NOT EXISTS results_delete AFTER DELETE ON results
+    BEGIN UPDATE total SET size = size - old.size; END;
+"""
+
+
+def code_version() -> str:
+    """Get a hash of the grammars and of all modules of nllegalcit, which all affect the citations found."""
+
+    h = hashlib.sha256(grammar_hash().encode("utf-8"))
+    for module in sorted(pathlib.Path(__file__).parent.glob("*.py")):
+        h.update(module.name.encode("utf-8"))
+        h.update(module.read_bytes())
+
+    return h.hexdigest()
+
+
+def _options(
+        types: Optional[str | Iterable[str]] = None,
+        paragraph_cache: Optional[ParagraphCache] = None,
+        engine: str = "earley",
+        **_: Any) -> bytes:
+    """Get a normalized form of the arguments of a parse function that change which citations are found.
+
+    The other arguments, such as prefilter, window_size and workers, give the same results.
+    """
+
+    options = {
+        "types": None if types is None else sorted({types} if isinstance(types, str) else set(types)),
+        "paragraphs": paragraph_cache is not None,
+        "engine": engine,
+    }
+
+    return json.dumps(options, sort_keys=True).encode("utf-8")
+
+
+def _encode(citations: list[Citation]) -> str:
+    rows = []
+    for citation in citations:
+        fields = [getattr(citation, name) for name in citation._fields]  # pylint: disable=protected-access
+        if isinstance(citation, KamerstukCitation):
+            fields[0] = citation.kamer.value
+        rows.append([type(citation).__name__, fields, citation.start, citation.end, citation.page])
+
+    return json.dumps(rows, separators=(",", ":"))
+
+
+def _decode(value: str, source: Optional[str]) -> list[Citation]:
+    return [
+        _CITATION_CLASSES[name](*fields, start=start, end=end, page=page, source=source)
+        for name, fields, start, end, page in json.loads(value)
+    ]
+
+
+class CitationCache():
+    """A cache of the citations found in texts and PDF files, stored in an SQLite database.
+
+    Results are stored by a hash of the text or the PDF file, and of the arguments that change
+    the results (types, whether a paragraph_cache is used, and engine), so unchanged documents
+    only cost a hash and a lookup. The version of the grammars and of the code of nllegalcit is
+    part of the key: results of other versions are removed when the cache is opened. If the
+    stored results grow larger than max_size bytes, the least recently used results are
+    removed. The database uses write-ahead logging, so that multiple processes can use the same
+    cache.
+
+    Citations from a cached text get that text as their source, so their matched_text is
+    available. Citations from a cached PDF file have no matched_text.
+    """
+
+    #: The number of results found in the cache
+    hits: int
+
+    #: The number of results not found in the cache
+    misses: int
+
+    def __init__(self, path: Optional[str | pathlib.Path] = None, max_size: int = DEFAULT_MAX_SIZE):
+        """Open the cache at path, by default results.sqlite3 in the nllegalcit cache directory."""
+
+        if path is None:
+            directory = cache_dir()
+            if directory is None:
+                raise ValueError("Caching is disabled by NLLEGALCIT_CACHE_DIR, so a path is required")
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / "results.sqlite3"
+
+        self.max_size = max_size
+        self.version = code_version()
+        self.hits = 0
+        self.misses = 0
+
+        self._db = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        with self._db:
+            self._db.executescript(_SCHEMA)
+            self._db.execute("DELETE FROM results WHERE version != ?", (self.version,))
+
+    def _key(self, kind: str, content: Any, options: bytes) -> str:
+        h = hashlib.sha256(kind.encode("utf-8"))
+        h.update(self.version.encode("utf-8"))
+        h.update(options)
+        h.update(content)
+
+        return h.hexdigest()
+
+    def _get(self, key: str) -> Optional[str]:
+        row = self._db.execute("SELECT value, accessed FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        value: str = row[0]
+        accessed: int = row[1]
+
+        now = int(time.time())
+        if accessed < now - _ACCESS_RESOLUTION:
+            self._db.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+
+        return value
+
+    def _put(self, key: str, citations: list[Citation]) -> None:
+        value = _encode(citations)
+
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self._db.execute(
+                "INSERT OR IGNORE INTO results (key, version, value, size, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, self.version, value, len(value) + len(key), int(time.time()))
+            )
+            self._evict()
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+
+    def _evict(self) -> None:
+        """Remove the least recently used results, until the results take at most max_size bytes."""
+
+        (total,) = self._db.execute("SELECT size FROM total").fetchone()
+        if total <= self.max_size:
+            return
+
+        # Evict down to 90% of the maximum size, so that this does not happen at every insert
+        excess = total - self.max_size * 9 // 10
+        keys = []
+        for key, size in self._db.execute("SELECT key, size FROM results ORDER BY accessed, rowid"):
+            keys.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+
+        self._db.executemany("DELETE FROM results WHERE key = ?", keys)
+
+    def __len__(self) -> int:
+        count: int = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return count
+
+    def size(self) -> int:
+        """Get the size of the stored results, in bytes."""
+
+        total: int = self._db.execute("SELECT size FROM total").fetchone()[0]
+        return total
+
+    def parse_citations(self, text: str | mmap.mmap, **kwargs: Any) -> list[Citation]:
+        """Parse any supported citation in a given text, using the cache.
+
+        This takes the same arguments as nllegalcit.parse_citations.
+        """
+
+        content = text.encode("utf-8", errors="surrogatepass") if isinstance(text, str) else text
+        key = self._key("text", content, _options(**kwargs))
+        source = text if isinstance(text, str) else None
+
+        value = self._get(key)
+        if value is not None:
+            return _decode(value, source)
+
+        citations = parse_citations(text, **kwargs)
+        self._put(key, citations)
+
+        return citations
+
+    def parse_citations_from_pdf(self, pdffile: str | IO[Any] | pathlib.Path, **kwargs: Any) -> list[Citation]:
+        """Parse any supported citations in a given PDF file, using the cache.
+
+        This takes the same arguments as nllegalcit.parse_citations_from_pdf.
+        """
+
+        if isinstance(pdffile, (str, pathlib.Path)):
+            content = pathlib.Path(pdffile).read_bytes()
+        else:
+            content = pdffile.read()
+
+        key = self._key("pdf", content, _options(**kwargs))
+
+        value = self._get(key)
+        if value is not None:
+            return _decode(value, None)
+
+        citations = parse_citations_from_pdf(io.BytesIO(content), **kwargs)
+        self._put(key, citations)
+
+        return citations
+
+    def close(self) -> None:
+        """Close the database."""
+
+        self._db.close()
+
+    def __enter__(self) -> "CitationCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
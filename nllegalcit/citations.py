@@ -8,29 +8,142 @@
     SPDX-License-Identifier: EUPL-1.2
 """
 
+import functools
 from enum import Enum
-from typing import Optional
+from typing import Any, ClassVar, Optional, TypeVar, TYPE_CHECKING
 
+if TYPE_CHECKING:
+    from .ljn import LjnIndex
 
+_C = TypeVar("_C", bound="Citation")
+
+
+def _restore(cls: type["Citation"], fields: tuple, position: dict[str, Any]) -> "Citation":
+    """Recreate a pickled Citation"""
+    return cls(*fields, **position)
+
+
+@functools.total_ordering
 class Citation():
-    """Base Citation class"""
+    """Base Citation class
+
+    Citations are immutable. They are equal if the cited documents are the same, regardless of
+    their position in the text, so they can be used in sets and as keys of dicts. Citations are
+    ordered by their type and then by their fields.
+    """
+
+    __slots__ = ("start", "end", "page", "matched_text")
+
+    # The names of the fields that identify the cited document, in the order of the arguments of __init__
+    _fields: ClassVar[tuple[str, ...]] = ()
+
+    #: The position of the first character of this Citation in the parsed text.
+    start: Optional[int]
+
+    #: The position just after the last character of this Citation in the parsed text.
+    end: Optional[int]
+
+    #: The number of the page (starting at 1) on which this Citation starts, if it was found in a PDF file.
+    page: Optional[int]
+
+    #: The underlying text that resulted in this Citation, if it was found in a text.
+    matched_text: Optional[str]
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self, *,
+            start: Optional[int] = None,
+            end: Optional[int] = None,
+            page: Optional[int] = None,
+            source: Optional[str] = None,
+            source_offset: int = 0,
+            matched_text: Optional[str] = None):
+        """Set the position of this Citation in the parsed text, if it was found in a text.
+
+        source is the part of the parsed text in which this Citation was found, which starts at
+        position source_offset in the parsed text. start and end are positions in the parsed text.
+        Only the matched text is sliced from source and kept, not source itself, so that a
+        Citation does not keep the text alive and pickles small. Instead of source, the
+        matched_text can be given.
+        """
+
+        if source is not None and start is not None and end is not None:
+            matched_text = source[start - source_offset:end - source_offset]
+
+        object.__setattr__(self, "start", start)
+        object.__setattr__(self, "end", end)
+        object.__setattr__(self, "page", page)
+        object.__setattr__(self, "matched_text", matched_text)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def _key(self) -> tuple:
+        """The values that identify and order this Citation"""
+        return (type(self).__name__,) + tuple(getattr(self, name) for name in self._fields)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Citation):
+            return self._key() == other._key()
+
+        return NotImplemented
+
+    def __lt__(self, other: object) -> bool:
+        if isinstance(other, Citation):
+            return self._key() < other._key()
+
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __reduce__(self):
+        position = {
+            "start": self.start,
+            "end": self.end,
+            "page": self.page,
+            "matched_text": self.matched_text
+        }
+        return _restore, (type(self), tuple(getattr(self, name) for name in self._fields), position)
+
+    def replace(self: _C, **changes: Any) -> _C:
+        """Create a copy of this Citation, with some of its fields or its position replaced."""
+
+        values: dict[str, Any] = {name: getattr(self, name) for name in self._fields}
+        values.update(start=self.start, end=self.end, page=self.page, matched_text=self.matched_text)
+        values.update(changes)
 
-    #: The underlying text that resulted in this Citation.
-    matched_text: str
+        return type(self)(**values)
+
+    def shift(self: _C, offset: int) -> _C:
+        """Create a copy of this Citation, positioned offset characters further in the parsed text."""
+
+        return self.replace(
+            start=None if self.start is None else self.start + offset,
+            end=None if self.end is None else self.end + offset
+        )
 
 
 class CaseLawCitation(Citation):
     """Generic citation to case law"""
 
+    __slots__ = ()
+
 
 class LjnCitation(CaseLawCitation):
     """CaseLawCitation for LJN citations"""
 
+    __slots__ = ("code",)
+    _fields = ("code",)
+
     #: The LJN code, e.g. AU9722
     code: str
 
-    def __init__(self, code: str):
-        self.code = code
+    def __init__(self, code: str, **position: Any):
+        super().__init__(**position)
+        object.__setattr__(self, "code", code)
 
     def __str__(self) -> str:
         return f"LJN {self.code}"
@@ -38,18 +151,17 @@ class LjnCitation(CaseLawCitation):
     def __repr__(self) -> str:
         return self.__str__()
 
-    def __eq__(self, __value: object) -> bool:
-        if isinstance(__value, LjnCitation):
-            return self.code == __value.code
-        else:
-            return False
-
-    # TODO: Implement a translation/lookup to EcliCitation
+    def resolve(self, index: "LjnIndex") -> Optional["EcliCitation"]:
+        """Get the EcliCitation with this LJN from an LjnIndex, or None if the LJN is unknown."""
+        return index.resolve(self)
 
 
 class EcliCitation(CaseLawCitation):
     """CaseLawCitation for ECLI-citations"""
 
+    __slots__ = ("country", "court", "year", "casenumber")
+    _fields = ("country", "court", "year", "casenumber")
+
     #: The country code in this ECLI, e.g. NL, DE, FR, EU, CE.
     country: str
 
@@ -59,12 +171,12 @@ class EcliCitation(CaseLawCitation):
     year: int
     casenumber: str
 
-    def __init__(self, country: str, court: str, year: int, casenumber: str):
-
-        self.country = country
-        self.court = court
-        self.year = year
-        self.casenumber = casenumber
+    def __init__(self, country: str, court: str, year: int, casenumber: str, **position: Any):
+        super().__init__(**position)
+        object.__setattr__(self, "country", country)
+        object.__setattr__(self, "court", court)
+        object.__setattr__(self, "year", year)
+        object.__setattr__(self, "casenumber", casenumber)
 
     def __str__(self) -> str:
         return f"ECLI:{self.country}:{self.court}:{self.year}:{self.casenumber}"
@@ -72,26 +184,19 @@ class EcliCitation(CaseLawCitation):
     def __repr__(self) -> str:
         return self.__str__()
 
-    def __eq__(self, __value: object) -> bool:
-        if isinstance(__value, EcliCitation):
-            return (
-                (self.country == __value.country) and
-                (self.court == __value.court) and
-                (self.year == __value.year) and
-                (self.casenumber == __value.casenumber)
-            )
-        else:
-            return False
-
 
 class KamerstukCitation(Citation):
     """Structured representation of a citation of a kamerstuk"""
 
     class Kamer(Enum):
+        """The chamber of the States General, with its usual abbreviation in citations"""
         TK = "II"
         EK = "I"
         VV = "VV"
 
+    __slots__ = ("kamer", "vergaderjaar", "dossiernummer", "ondernummer", "paginaverwijzing", "rijksdossiernummer")
+    _fields = ("kamer", "vergaderjaar", "dossiernummer", "ondernummer", "paginaverwijzing", "rijksdossiernummer")
+
     kamer: Kamer
     vergaderjaar: str
     dossiernummer: str
@@ -101,46 +206,98 @@ class KamerstukCitation(Citation):
 
     def __init__(
             self,
-            kamer: str,
+            kamer: "KamerstukCitation.Kamer | str",
             vergaderjaar: str,
             dossiernummer: str,
             ondernummer: str,
-            paginaverwijzing=None,
-            rijksdossiernummer=None):
-        self.kamer = kamer  # type: ignore
-        self.vergaderjaar = vergaderjaar
-        self.dossiernummer = dossiernummer
-        self.ondernummer = ondernummer
-        self.paginaverwijzing = paginaverwijzing
-        self.rijksdossiernummer = rijksdossiernummer
+            paginaverwijzing: Optional[str] = None,
+            rijksdossiernummer: Optional[str] = None,
+            **position: Any):
+        """Create a KamerstukCitation; kamer is a Kamer or its abbreviation, e.g. "II"."""
+        super().__init__(**position)
+        object.__setattr__(self, "kamer", KamerstukCitation.Kamer(kamer))
+        object.__setattr__(self, "vergaderjaar", vergaderjaar)
+        object.__setattr__(self, "dossiernummer", dossiernummer)
+        object.__setattr__(self, "ondernummer", ondernummer)
+        object.__setattr__(self, "paginaverwijzing", paginaverwijzing)
+        object.__setattr__(self, "rijksdossiernummer", rijksdossiernummer)
+
+    def _key(self) -> tuple:
+        # Kamers are ordered by their abbreviation, and missing optional fields come first
+        return (
+            type(self).__name__,
+            self.kamer.value,
+            self.vergaderjaar,
+            self.dossiernummer,
+            self.ondernummer,
+            self.paginaverwijzing is not None,
+            self.paginaverwijzing or "",
+            self.rijksdossiernummer is not None,
+            self.rijksdossiernummer or ""
+        )
 
     def __str__(self) -> str:
+        kamer = self.kamer.value
+
         # There surely must be a better way to do this
         if self.rijksdossiernummer is not None and self.paginaverwijzing is not None:
-            return (f"KamerstukCitation {self.kamer} {self.vergaderjaar} {self.dossiernummer}"
+            return (f"KamerstukCitation {kamer} {self.vergaderjaar} {self.dossiernummer}"
                     f" ({self.rijksdossiernummer}) {self.ondernummer} {self.paginaverwijzing}")
         if self.paginaverwijzing is not None:
-            return (f"KamerstukCitation {self.kamer} {self.vergaderjaar} {self.dossiernummer}"
+            return (f"KamerstukCitation {kamer} {self.vergaderjaar} {self.dossiernummer}"
                     f"{self.ondernummer} {self.paginaverwijzing}")
         if self.rijksdossiernummer is not None:
-            return (f"KamerstukCitation {self.kamer} {self.vergaderjaar} {self.dossiernummer}"
+            return (f"KamerstukCitation {kamer} {self.vergaderjaar} {self.dossiernummer}"
                     f" ({self.rijksdossiernummer}) {self.ondernummer}")
 
-        return f"KamerstukCitation {self.kamer} {self.vergaderjaar} {self.dossiernummer} {self.ondernummer}"
+        return f"KamerstukCitation {kamer} {self.vergaderjaar} {self.dossiernummer} {self.ondernummer}"
 
     def __repr__(self) -> str:
         if self.paginaverwijzing is not None:
-            return f"Kamerstukken {self.kamer} {self.vergaderjaar}, {self.dossiernummer}, nr. {self.ondernummer} p. {self.paginaverwijzing}"
-
-        return f"Kamerstukken {self.kamer} {self.vergaderjaar}, {self.dossiernummer}, nr. {self.ondernummer}"
-
-    def __eq__(self, other) -> bool:
-        if isinstance(other, KamerstukCitation):
-            return ((self.kamer == other.kamer) and
-                    (self.vergaderjaar == other.vergaderjaar) and
-                    (self.dossiernummer == other.dossiernummer) and
-                    (self.ondernummer == other.ondernummer) and
-                    (self.paginaverwijzing == other.paginaverwijzing) and
-                    (self.rijksdossiernummer == other.rijksdossiernummer))
-        else:
-            return False
+            return (f"Kamerstukken {self.kamer.value} {self.vergaderjaar}, {self.dossiernummer},"
+                    f" nr. {self.ondernummer} p. {self.paginaverwijzing}")
+
+        return f"Kamerstukken {self.kamer.value} {self.vergaderjaar}, {self.dossiernummer}, nr. {self.ondernummer}"
+
+
+class CitationSummary():
+    """The occurrences of one distinct Citation in a text"""
+
+    __slots__ = ("citation", "count", "first", "last")
+
+    #: The first occurrence of the Citation
+    citation: Citation
+
+    #: The number of occurrences of the Citation
+    count: int
+
+    #: The start of the first occurrence of the Citation in the text
+    first: Optional[int]
+
+    #: The start of the last occurrence of the Citation in the text
+    last: Optional[int]
+
+    def __init__(self, citation: Citation, count: int = 1, first: Optional[int] = None, last: Optional[int] = None):
+        self.citation = citation
+        self.count = count
+        self.first = citation.start if first is None else first
+        self.last = citation.start if last is None else last
+
+    def add(self, citation: Citation) -> None:
+        """Count another occurrence of the Citation, which is found after the earlier ones."""
+        self.count += 1
+        self.last = citation.start
+
+    def __repr__(self) -> str:
+        return f"CitationSummary({self.citation!r}, count={self.count}, first={self.first}, last={self.last})"
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CitationSummary):
+            return ((self.citation == other.citation) and
+                    (self.count == other.count) and
+                    (self.first == other.first) and
+                    (self.last == other.last))
+
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
@@ -0,0 +1,363 @@
+"""
+    nllegalcit/cli.py
+
+    The nllegalcit command, which extracts the citations from a corpus of text and PDF files
+    to a JSON Lines or CSV file.
+
+    Runs can be resumed: after the citations of a file have been written, the file is recorded
+    in a manifest, with a hash of its contents and the size of the output so far. When the
+    command is run again with the same output, files that are in the manifest with the same
+    hash are skipped, and anything written after the last recorded file is removed from the
+    output. The citations of files whose contents changed are appended to the output again, and
+    at the end of the run the output is rewritten without their earlier citations.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import pathlib
+import sys
+import threading
+from typing import IO, Iterable, Iterator, Optional, Sequence
+
+from .citations import Citation
+from .columnar import INT_COLUMNS, STRING_COLUMNS, citation_record
+from .parser import parse_citations, parse_citations_from_pdf
+
+#: The columns of the CSV output
+COLUMNS: tuple[str, ...] = STRING_COLUMNS + INT_COLUMNS
+
+#: The suffixes of the files that are extracted from directories
+SUFFIXES: tuple[str, ...] = (".txt", ".pdf")
+
+# The maximum number of files that are sent to the workers, but not written yet
+_MAX_PENDING = 1000
+
+
+class _Task():  # pylint: disable=too-few-public-methods
+    """A file to extract, with the hash of its contents in the manifest, if any"""
+
+    __slots__ = ("path", "previous_digest", "output_format")
+
+    def __init__(self, path: str, previous_digest: Optional[str], output_format: str):
+        self.path = path
+        self.previous_digest = previous_digest
+        self.output_format = output_format
+
+
+class _Result():  # pylint: disable=too-few-public-methods
+    """The result of extracting a file: the output to write, or an error"""
+
+    __slots__ = ("path", "digest", "count", "data", "error")
+
+    def __init__(self, path: str, digest: str = "", count: int = 0, data: bytes = b"", error: Optional[str] = None):
+        self.path = path
+        self.digest = digest
+        self.count = count
+        self.data = data
+        self.error = error
+
+    @property
+    def unchanged(self) -> bool:
+        """Whether the file was skipped, because its contents did not change"""
+
+        return self.error is None and not self.digest
+
+
+def _digest(content: bytes) -> str:
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def _format(path: str, citations: list[Citation], output_format: str) -> bytes:
+    records = [citation_record(path, citation) for citation in citations]
+
+    if output_format == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows([record[name] for name in COLUMNS] for record in records)
+        return buffer.getvalue().encode("utf-8")
+
+    return "".join(
+        json.dumps({name: value for name, value in record.items() if value is not None}, ensure_ascii=False) + "\n"
+        for record in records
+    ).encode("utf-8")
+
+
+def _extract(task: _Task) -> _Result:
+    """Extract the citations from one file, unless its contents did not change."""
+
+    try:
+        with open(task.path, "rb") as f:
+            content = f.read()
+
+        digest = _digest(content)
+        if digest == task.previous_digest:
+            return _Result(task.path)
+
+        if task.path.lower().endswith(".pdf"):
+            citations = parse_citations_from_pdf(io.BytesIO(content))
+        else:
+            citations = parse_citations(content.decode("utf-8", errors="replace"))
+
+        return _Result(task.path, digest, len(citations), _format(task.path, citations, task.output_format))
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        return _Result(task.path, error=f"{type(e).__name__}: {e}")
+
+
+def iter_files(paths: Iterable[str]) -> Iterator[str]:
+    """Yield the given files, and the text and PDF files in the given directories, recursively."""
+
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+
+        for directory, subdirectories, files in os.walk(path):
+            subdirectories.sort()
+            for name in sorted(files):
+                if name.lower().endswith(SUFFIXES):
+                    yield os.path.join(directory, name)
+
+
+class Manifest():
+    """The files of which the citations were written to the output, see the module docstring.
+
+    Every line of the manifest is a JSON array [path, hash, number of citations, size of the
+    output after the citations of the file were written].
+    """
+
+    def __init__(self, path: str | pathlib.Path):
+        self.path = pathlib.Path(path)
+
+        #: The hashes of the files in the manifest, by path
+        self.digests: dict[str, str] = {}
+
+        #: The size of the output up to the last file in the manifest
+        self.offset = 0
+
+        #: The number of files in the manifest that were recorded again, after their contents changed
+        self.superseded = 0
+
+        # The lines of the manifest, as [path, hash, number of citations, offset]
+        self._entries: list[tuple[str, str, int, int]] = []
+
+        self._file: Optional[IO[bytes]] = None
+
+    def load(self, output_size: int) -> None:
+        """Read the manifest, ignoring files which were not completely written to the output."""
+
+        if not self.path.exists():
+            return
+
+        valid_size = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    path, digest, count, offset = json.loads(line)
+                except ValueError:
+                    # The last line may be incomplete if the previous run was interrupted
+                    break
+
+                if not line.endswith(b"\n") or offset > output_size:
+                    break
+
+                self._add(path, digest, count, offset)
+                valid_size += len(line)
+
+        with open(self.path, "r+b") as f:
+            f.truncate(valid_size)
+
+    def open(self) -> None:
+        """Open the manifest to record files."""
+
+        self._file = open(self.path, "ab")  # pylint: disable=consider-using-with
+
+    def record(self, result: _Result, offset: int) -> None:
+        """Record that the citations of a file were written, and the output is now offset bytes."""
+
+        assert self._file is not None
+
+        self._file.write(json.dumps([result.path, result.digest, result.count, offset]).encode("utf-8") + b"\n")
+        self._file.flush()
+        self._add(result.path, result.digest, result.count, offset)
+
+    def _add(self, path: str, digest: str, count: int, offset: int) -> None:
+        if path in self.digests:
+            self.superseded += 1
+
+        self.digests[path] = digest
+        self.offset = offset
+        self._entries.append((path, digest, count, offset))
+
+    def compact(self, output_path: str | pathlib.Path, header_size: int = 0) -> None:
+        """Rewrite the output and the manifest with only the last citations recorded for each file.
+
+        The first header_size bytes of the output, before the citations of the first file, are kept.
+        """
+
+        assert self._file is None
+
+        latest = {path: i for i, (path, *_) in enumerate(self._entries)}
+        output_path = pathlib.Path(output_path)
+        new_output = output_path.with_name(output_path.name + ".tmp")
+        new_manifest = self.path.with_name(self.path.name + ".tmp")
+
+        entries = []
+        with open(output_path, "rb") as old, open(new_output, "wb") as output:
+            output.write(old.read(header_size))
+            start = header_size
+            for i, entry in enumerate(self._entries):
+                if latest[entry[0]] == i:
+                    old.seek(start)
+                    output.write(old.read(entry[3] - start))
+                    entries.append(entry[:3] + (output.tell(),))
+                start = entry[3]
+
+        with open(new_manifest, "wb") as manifest:
+            for entry in entries:
+                manifest.write(json.dumps(entry).encode("utf-8") + b"\n")
+
+        # Without a manifest the output is extracted again, so an interrupted compaction is not a problem
+        self.path.unlink()
+        os.replace(new_output, output_path)
+        os.replace(new_manifest, self.path)
+
+        self._entries = entries
+        self.offset = entries[-1][3] if entries else header_size
+        self.superseded = 0
+
+    def close(self) -> None:
+        """Close the manifest."""
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _iter_results(tasks: Iterable[_Task], workers: int, chunksize: int) -> Iterator[_Result]:
+    if workers == 1:
+        yield from map(_extract, tasks)
+        return
+
+    # The pool takes tasks as fast as it can, so limit the number of tasks that wait for a result
+    pending = threading.BoundedSemaphore(max(_MAX_PENDING, 2 * workers * chunksize))
+
+    def limited() -> Iterator[_Task]:
+        for task in tasks:
+            pending.acquire()  # pylint: disable=consider-using-with
+            yield task
+
+    # Workers are replaced regularly, to limit the memory that builds up in processes that read PDFs
+    with multiprocessing.Pool(processes=workers, maxtasksperchild=1000) as pool:
+        for result in pool.imap_unordered(_extract, limited(), chunksize=chunksize):
+            pending.release()
+            yield result
+
+
+def build_argument_parser() -> argparse.ArgumentParser:
+    """Create the parser of the command line arguments of the nllegalcit command."""
+
+    argument_parser = argparse.ArgumentParser(
+        prog="nllegalcit",
+        description="Extract the citations to Dutch legal documents from text and PDF files."
+    )
+    argument_parser.add_argument(
+        "paths", nargs="*",
+        help=f"files, and directories which are searched recursively for {' and '.join(SUFFIXES)} files"
+    )
+    argument_parser.add_argument(
+        "-f", "--files-from", metavar="FILE",
+        help="read the paths to extract from FILE, one per line, or from standard input if FILE is -"
+    )
+    argument_parser.add_argument("-o", "--output", required=True, help="the JSON Lines or CSV file to write")
+    argument_parser.add_argument(
+        "--format", choices=("jsonl", "csv"),
+        help="the format of the output, by default csv if the output ends with .csv, and jsonl otherwise"
+    )
+    argument_parser.add_argument("--manifest", help="the manifest of extracted files, by default OUTPUT.manifest")
+    argument_parser.add_argument(
+        "-j", "--workers", type=int, default=os.cpu_count() or 1,
+        help="the number of processes that extract citations, by default the number of CPUs"
+    )
+    argument_parser.add_argument(
+        "--chunksize", type=int, default=16, help="the number of files sent to a process at once"
+    )
+
+    return argument_parser
+
+
+def _read_paths(files_from: Optional[str]) -> Iterator[str]:
+    if files_from is None:
+        return
+
+    with (open(files_from, encoding="utf-8") if files_from != "-" else sys.stdin) as f:
+        for line in f:
+            path = line.rstrip("\r\n")
+            if path:
+                yield path
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the nllegalcit command, and return its exit status."""
+
+    argument_parser = build_argument_parser()
+    args = argument_parser.parse_args(argv)
+    if not args.paths and args.files_from is None:
+        argument_parser.error("no paths to extract")
+
+    output_format = args.format or ("csv" if args.output.lower().endswith(".csv") else "jsonl")
+    output_path = pathlib.Path(args.output)
+    manifest = Manifest(args.manifest or f"{args.output}.manifest")
+
+    output_size = output_path.stat().st_size if output_path.exists() else 0
+    manifest.load(output_size)
+
+    def tasks() -> Iterator[_Task]:
+        for path in iter_files(args.paths):
+            yield _Task(path, manifest.digests.get(path), output_format)
+        for path in iter_files(_read_paths(args.files_from)):
+            yield _Task(path, manifest.digests.get(path), output_format)
+
+    extracted = unchanged = failed = citations = 0
+    header = (",".join(COLUMNS) + "\n").encode("utf-8") if output_format == "csv" else b""
+
+    with open(output_path, "ab") as output:
+        # Remove the output of files that are not in the manifest
+        output.truncate(manifest.offset)
+
+        if output_format == "csv" and manifest.offset == 0:
+            output.write(header)
+
+        manifest.open()
+        try:
+            for result in _iter_results(tasks(), max(args.workers, 1), args.chunksize):
+                if result.error is not None:
+                    failed += 1
+                    print(f"nllegalcit: {result.path}: {result.error}", file=sys.stderr)
+                elif result.unchanged:
+                    unchanged += 1
+                else:
+                    output.write(result.data)
+                    output.flush()
+                    manifest.record(result, output.tell())
+                    extracted += 1
+                    citations += result.count
+        finally:
+            manifest.close()
+
+    if manifest.superseded:
+        manifest.compact(output_path, len(header))
+
+    print(f"nllegalcit: {citations} citations in {extracted} files, {unchanged} unchanged files skipped,"
+          f" {failed} files failed", file=sys.stderr)
+
+    return 1 if failed else 0
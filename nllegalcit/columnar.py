@@ -0,0 +1,221 @@
+"""
+    nllegalcit/columnar.py
+
+    Collect citations in columns, and write them to Arrow record batches and Parquet files.
+
+    This requires pyarrow, which is an optional dependency (pip install nllegalcit[arrow]).
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+import array
+import pathlib
+from typing import Any, Iterable, Optional
+
+from .citations import Citation, EcliCitation, KamerstukCitation, LjnCitation
+
+#: The string columns, in the order of the schema
+STRING_COLUMNS: tuple[str, ...] = (
+    "doc_id", "type", "country", "court", "casenumber", "ljn", "kamer", "vergaderjaar", "dossiernummer",
+    "ondernummer", "paginaverwijzing", "rijksdossiernummer"
+)
+
+#: The integer columns, which come after the string columns in the schema
+INT_COLUMNS: tuple[str, ...] = ("year", "page", "start", "end")
+
+# Columns with few distinct values, which are dictionary encoded
+_DICTIONARY_COLUMNS: tuple[str, ...] = ("type", "country", "court", "kamer")
+
+_TYPE_NAMES: dict[type, str] = {EcliCitation: "ecli", LjnCitation: "ljn", KamerstukCitation: "kamerstuk"}
+
+
+def _import_pyarrow():
+    try:
+        # pylint: disable=import-outside-toplevel
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Columnar export requires pyarrow, install it with pip install nllegalcit[arrow]") from e
+
+    return pyarrow
+
+
+def citation_record(doc_id: str, citation: Citation) -> dict[str, Any]:
+    """Get the columns of a citation found in document doc_id, in the order of the schema.
+
+    Fields that do not apply to the type of citation (such as the court of a KamerstukCitation)
+    are None.
+    """
+
+    record: dict[str, Any] = dict.fromkeys(STRING_COLUMNS + INT_COLUMNS)
+    record["doc_id"] = doc_id
+    record["type"] = _TYPE_NAMES.get(type(citation), type(citation).__name__)
+
+    if isinstance(citation, EcliCitation):
+        record["country"] = citation.country
+        record["court"] = citation.court
+        record["casenumber"] = citation.casenumber
+        record["year"] = citation.year
+    elif isinstance(citation, LjnCitation):
+        record["ljn"] = citation.code
+    elif isinstance(citation, KamerstukCitation):
+        record["kamer"] = citation.kamer.value
+        record["vergaderjaar"] = citation.vergaderjaar
+        record["dossiernummer"] = citation.dossiernummer
+        record["ondernummer"] = citation.ondernummer
+        record["paginaverwijzing"] = citation.paginaverwijzing
+        record["rijksdossiernummer"] = citation.rijksdossiernummer
+
+    record["page"] = citation.page
+    record["start"] = citation.start
+    record["end"] = citation.end
+
+    return record
+
+
+def citation_schema():
+    """Get the pyarrow schema of the record batches created by CitationColumns."""
+
+    pa = _import_pyarrow()
+
+    fields = []
+    for name in STRING_COLUMNS:
+        if name in _DICTIONARY_COLUMNS:
+            fields.append(pa.field(name, pa.dictionary(pa.int32(), pa.string())))
+        else:
+            fields.append(pa.field(name, pa.string(), nullable=name != "doc_id"))
+
+    fields.append(pa.field("year", pa.int32()))
+    fields.append(pa.field("page", pa.int32()))
+    fields.append(pa.field("start", pa.int64()))
+    fields.append(pa.field("end", pa.int64()))
+
+    return pa.schema(fields)
+
+
+class CitationColumns():
+    """Buffers that collect citations column by column.
+
+    Every citation is one row, with the id of the document in which it was found. Fields that
+    do not apply to a type of citation (such as the court of a KamerstukCitation) are null.
+    Integers are kept in typed arrays, so that building a record batch does not need to
+    convert Python objects.
+    """
+
+    def __init__(self):
+        self._strings: dict[str, list[Optional[str]]] = {}
+        self._ints: dict[str, array.array] = {}
+        self._valid: dict[str, bytearray] = {}
+        self.clear()
+
+    def __len__(self) -> int:
+        return len(self._strings["doc_id"])
+
+    def _append_int(self, name: str, value: Optional[int]) -> None:
+        self._ints[name].append(0 if value is None else value)
+        self._valid[name].append(value is not None)
+
+    def append(self, doc_id: str, citation: Citation) -> None:
+        """Add a citation found in document doc_id."""
+
+        record = citation_record(doc_id, citation)
+
+        for name in STRING_COLUMNS:
+            self._strings[name].append(record[name])
+
+        for name in INT_COLUMNS:
+            self._append_int(name, record[name])
+
+    def extend(self, doc_id: str, citations: Iterable[Citation]) -> None:
+        """Add all citations found in document doc_id."""
+
+        for citation in citations:
+            self.append(doc_id, citation)
+
+    def clear(self) -> None:
+        """Remove all collected citations."""
+
+        self._strings = {name: [] for name in STRING_COLUMNS}
+        self._ints = {name: array.array("q") for name in INT_COLUMNS}
+        self._valid = {name: bytearray() for name in INT_COLUMNS}
+
+    def to_arrow(self):
+        """Create a pyarrow.RecordBatch of the collected citations."""
+
+        pa = _import_pyarrow()
+        pc = pa.compute
+        schema = citation_schema()
+        length = len(self)
+
+        columns = []
+        for name in STRING_COLUMNS:
+            column = pa.array(self._strings[name], type=pa.string())
+            columns.append(column.dictionary_encode() if name in _DICTIONARY_COLUMNS else column)
+
+        for name in INT_COLUMNS:
+            valid = self._valid[name]
+            validity = None
+            if valid.count(0):
+                # Turn the bytes with 0 or 1 into a validity bitmap
+                valid_bytes = pa.Array.from_buffers(pa.uint8(), length, [None, pa.py_buffer(valid)])
+                validity = pc.not_equal(valid_bytes, 0).buffers()[1]  # pylint: disable=no-member
+
+            column = pa.Array.from_buffers(pa.int64(), length, [validity, pa.py_buffer(self._ints[name])])
+            columns.append(column.cast(schema.field(name).type))
+
+        return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+class ParquetCitationWriter():
+    """Write citations to a Parquet file, in row groups of batch_size citations.
+
+    Use it as a context manager, or call close() when done:
+    ::
+
+        with ParquetCitationWriter("citations.parquet") as writer:
+            for doc_id, text in documents:
+                writer.write(doc_id, parse_citations(text))
+    """
+
+    def __init__(self, where: str | pathlib.Path, batch_size: int = 100_000, **options: Any):
+        """Open the Parquet file where. Other options are passed to pyarrow.parquet.ParquetWriter."""
+
+        pa = _import_pyarrow()
+
+        options.setdefault("compression", "zstd")
+
+        self.batch_size = batch_size
+        self.columns = CitationColumns()
+        self._writer = pa.parquet.ParquetWriter(str(where), citation_schema(), **options)
+
+    def write(self, doc_id: str, citations: Iterable[Citation]) -> None:
+        """Write the citations found in document doc_id."""
+
+        self.columns.extend(doc_id, citations)
+
+        if len(self.columns) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered citations as a row group."""
+
+        if len(self.columns) > 0:
+            self._writer.write_batch(self.columns.to_arrow())
+            self.columns.clear()
+
+    def close(self) -> None:
+        """Write the remaining citations and close the file."""
+
+        self.flush()
+        self._writer.close()
+
+    def __enter__(self) -> "ParquetCitationWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
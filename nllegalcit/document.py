@@ -0,0 +1,294 @@
+"""
+    nllegalcit/document.py
+
+    A document which is edited, such as in an editor, of which the citations are kept up to date
+    by parsing only the paragraphs that were changed.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+import itertools
+from typing import Any, Iterable, Iterator, Optional, overload, Sequence
+
+from .citations import Citation
+from .memo import iter_paragraphs
+from .parser import parse_citations
+
+
+class _Lengths():
+    """The lengths of a sequence of blocks, as a Fenwick tree.
+
+    The start of a block and the block at a position are found, and the length of a block is
+    changed, in O(log n) time for n blocks.
+    """
+
+    def __init__(self, lengths: Iterable[int]):
+        # Entry i is the sum of the lengths of the blocks from i - (i & -i) up to i
+        starts = [0, *itertools.accumulate(lengths)]
+        self._tree = [starts[i] - starts[i & (i - 1)] for i in range(len(starts))]
+
+    def __len__(self) -> int:
+        return len(self._tree) - 1
+
+    def add(self, index: int, delta: int) -> None:
+        """Add delta to the length of block index."""
+
+        i = index + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def start(self, index: int) -> int:
+        """Get the start of block index, which is the sum of the lengths of the blocks before it."""
+
+        total = 0
+        i = index
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+
+        return total
+
+    def find(self, pos: int) -> int:
+        """Get the index of the block which contains the position pos, or of the last block if pos is at the end."""
+
+        index = 0
+        bit = 1 << (len(self._tree) - 1).bit_length()
+        while bit:
+            if index + bit < len(self._tree) and self._tree[index + bit] <= pos:
+                index += bit
+                pos -= self._tree[index]
+            bit >>= 1
+
+        return min(index, len(self) - 1)
+
+
+def _split(text: str) -> list[tuple[str, int, int]]:
+    """Split text into blocks which each start with a paragraph, and end with the blank lines after it.
+
+    Whitespace at the start of text is part of the first block. Returns the text of each block,
+    and the (start, end) of its paragraph in the block.
+    """
+
+    paragraphs = list(iter_paragraphs(text))
+    if not paragraphs:
+        return [(text, 0, 0)]
+
+    blocks = []
+    block_start = 0
+    for i, (start, end) in enumerate(paragraphs):
+        block_end = paragraphs[i + 1][0] if i + 1 < len(paragraphs) else len(text)
+        blocks.append((text[block_start:block_end], start - block_start, end - block_start))
+        block_start = block_end
+
+    return blocks
+
+
+class _Citations(Sequence[Citation]):
+    """The citations of a Document, shifted to their positions in the text when they are accessed.
+
+    This is a view: it follows the edits of the document. A citation is found in O(log n) time
+    for n paragraphs, with the tree of the number of citations in each paragraph.
+    """
+
+    def __init__(self, document: "Document"):
+        self._document = document
+
+    def __len__(self) -> int:
+        counts = self._document._counts  # pylint: disable=protected-access
+        return counts.start(len(counts))
+
+    @overload
+    def __getitem__(self, index: int) -> Citation:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Citation]:
+        ...
+
+    def __getitem__(self, index: int | slice) -> Citation | list[Citation]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        length = len(self)
+        if not -length <= index < length:
+            raise IndexError("citation index out of range")
+        if index < 0:
+            index += length
+
+        document = self._document
+        block = document._counts.find(index)  # pylint: disable=protected-access
+        citation = document._citations[block][index - document._counts.start(block)]  # pylint: disable=protected-access
+        return citation.shift(document._lengths.start(block))  # pylint: disable=protected-access
+
+    def __iter__(self) -> Iterator[Citation]:
+        start = 0
+        for text, citations in zip(self._document._texts, self._document._citations):  # pylint: disable=protected-access
+            for citation in citations:
+                yield citation.shift(start)
+            start += len(text)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (_Citations, list, tuple)):
+            return list(self) == list(other)
+
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class Document():  # pylint: disable=too-many-instance-attributes
+    """A text which is edited, of which the citations are kept up to date.
+
+    The text is split into paragraphs (separated by blank lines), and the citations of each
+    paragraph are kept with their positions relative to the paragraph. An edit only parses the
+    paragraphs that it changed and their neighbours (which it may merge with or split from), so
+    the time it takes does not depend on the length of the document. Paragraphs of which the
+    text did not change are not parsed again. Citations which span a blank line are not found.
+
+    The prefilter, types and engine are used to parse each paragraph, see parse_citations. For
+    example, in an editor:
+    ::
+
+        document = Document(text, engine="regex")
+        document.edit(120, 125, "2006")
+        citations = document.citations
+    """
+
+    def __init__(
+            self,
+            text: str = "",
+            prefilter: bool = True,
+            types: Optional[str | Iterable[str]] = None,
+            engine: str = "earley"):
+        self.prefilter = prefilter
+        self.types = types
+        self.engine = engine
+
+        blocks = _split(text)
+        self._texts = [block[0] for block in blocks]
+        self._citations = [self._parse(*block) for block in blocks]
+        self._lengths = _Lengths(map(len, self._texts))
+        self._counts = _Lengths(map(len, self._citations))
+
+        self._text: Optional[str] = text
+        self._view = _Citations(self)
+
+    def __len__(self) -> int:
+        return self._lengths.start(len(self._lengths))
+
+    def __repr__(self) -> str:
+        return f"Document({len(self)} characters, {len(self._texts)} paragraphs)"
+
+    @property
+    def text(self) -> str:
+        """The current text of the document"""
+
+        if self._text is None:
+            self._text = "".join(self._texts)
+
+        return self._text
+
+    @property
+    def citations(self) -> Sequence[Citation]:
+        """The citations in the current text of the document, in the order of their position.
+
+        This is a view, which follows later edits: use list(document.citations) for a copy.
+        """
+
+        return self._view
+
+    def _parse(self, text: str, start: int, end: int) -> tuple[Citation, ...]:
+        """Parse the paragraph from start to end in the text of a block."""
+
+        if start == end:
+            return ()
+
+        citations = parse_citations(text[start:end], self.prefilter, types=self.types, engine=self.engine)
+        return tuple(citation.shift(start) for citation in citations)
+
+    def edit(self, start: int, end: int, replacement: str) -> tuple[list[Citation], list[Citation]]:
+        """Replace the text from start to end with replacement, and update the citations.
+
+        Returns the citations of the changed paragraphs before the edit (the removed citations,
+        with their positions before the edit) and after it (the added citations, with their
+        positions after the edit). The citations of paragraphs which did not change are in
+        neither list.
+        """
+
+        if not 0 <= start <= end <= len(self):
+            raise ValueError(f"Cannot replace {start}:{end} in a document of {len(self)} characters")
+
+        # The changed blocks, and one more on each side
+        first = max(self._lengths.find(start) - 1, 0)
+        last = min(self._lengths.find(end) + 2, len(self._texts))
+        texts, citations = self._reparse(first, last, start, end, replacement)
+
+        removed = self._changes(first, self._texts[first:last], self._citations[first:last], texts)
+        added = self._changes(first, texts, citations, self._texts[first:last])
+
+        if len(texts) == last - first:
+            for i, (text, block_citations) in enumerate(zip(texts, citations)):
+                self._lengths.add(first + i, len(text) - len(self._texts[first + i]))
+                self._counts.add(first + i, len(block_citations) - len(self._citations[first + i]))
+            self._texts[first:last] = texts
+            self._citations[first:last] = citations
+        else:
+            self._texts[first:last] = texts
+            self._citations[first:last] = citations
+            self._lengths = _Lengths(map(len, self._texts))
+            self._counts = _Lengths(map(len, self._citations))
+
+        self._text = None
+
+        return removed, added
+
+    def _reparse(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+            self,
+            first: int,
+            last: int,
+            start: int,
+            end: int,
+            replacement: str) -> tuple[list[str], list[tuple[Citation, ...]]]:
+        """Apply an edit to the blocks from first to last, and split and parse them again.
+
+        Blocks of which the text did not change keep their citations.
+        """
+
+        offset = self._lengths.start(first)
+        old_text = "".join(self._texts[first:last])
+        new_text = old_text[:start - offset] + replacement + old_text[end - offset:]
+
+        old_citations = dict(zip(self._texts[first:last], self._citations[first:last]))
+        texts = []
+        citations = []
+        for block in _split(new_text):
+            texts.append(block[0])
+            reused = old_citations.get(block[0])
+            citations.append(reused if reused is not None else self._parse(*block))
+
+        return texts, citations
+
+    def _changes(
+            self,
+            first: int,
+            texts: list[str],
+            citations: list[tuple[Citation, ...]],
+            other_texts: list[str]) -> list[Citation]:
+        """Get the citations of the blocks in texts which are not in other_texts, shifted to their positions."""
+
+        changes: list[Citation] = []
+        start = self._lengths.start(first)
+        for text, block_citations in zip(texts, citations):
+            if text not in other_texts:
+                changes.extend(citation.shift(start) for citation in block_citations)
+            start += len(text)
+
+        return changes
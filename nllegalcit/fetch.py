@@ -0,0 +1,104 @@
+"""
+    nllegalcit/fetch.py
+
+    Concurrently download and parse many PDF files from the web.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+import asyncio
+import collections
+import concurrent.futures
+import io
+import time
+from typing import Iterable, Optional
+from urllib.parse import urlsplit
+
+import requests
+import requests.adapters
+
+from .citations import Citation
+from .parser import parse_citations_from_pdf, DEFAULT_TIMEOUT
+from .stats import current_stats
+
+
+def _parse_pdf_bytes(content: bytes) -> list[Citation]:
+    return parse_citations_from_pdf(io.BytesIO(content))
+
+
+def _download(session: requests.Session, url: str, timeout: float) -> bytes:
+    stats = current_stats()
+    start = time.perf_counter()
+    response = session.get(url, timeout=timeout)
+    response.raise_for_status()
+    if stats is not None:
+        stats.record("download", time.perf_counter() - start, len(response.content))
+
+    return response.content
+
+
+async def parse_citations_from_pdf_urls(  # pylint: disable=too-many-arguments, too-many-positional-arguments, too-many-locals
+        urls: Iterable[str],
+        max_connections: int = 16,
+        max_connections_per_host: int = 4,
+        timeout: float = DEFAULT_TIMEOUT,
+        executor: Optional[concurrent.futures.Executor] = None,
+        return_exceptions: bool = False) -> list[list[Citation] | BaseException]:
+    """Download and parse the PDF files at the given URLs concurrently.
+
+    At most max_connections downloads run at the same time, of which at most
+    max_connections_per_host to the same host. Each download times out after timeout seconds.
+    The PDF files are parsed in the given executor (by default a new process pool), so that
+    parsing one file overlaps with downloading the others.
+
+    Returns the citations of each URL, in the same order as the given URLs. If
+    return_exceptions is True, a failed download or parse gives the exception instead of a
+    list of citations, like asyncio.gather. Otherwise, the first exception is raised, and the
+    other downloads and parses are cancelled.
+
+    This is a coroutine, for example:
+
+    >>> asyncio.run(parse_citations_from_pdf_urls(urls))
+    """
+
+    loop = asyncio.get_running_loop()
+
+    connections = asyncio.Semaphore(max_connections)
+    hosts: collections.defaultdict[str, asyncio.Semaphore] = collections.defaultdict(
+        lambda: asyncio.Semaphore(max_connections_per_host)
+    )
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    download_executor = concurrent.futures.ThreadPoolExecutor(max_connections)
+    parse_executor = executor if executor is not None else concurrent.futures.ProcessPoolExecutor()
+
+    async def fetch_and_parse(url: str) -> list[Citation]:
+        async with hosts[urlsplit(url).netloc], connections:
+            content = await loop.run_in_executor(download_executor, _download, session, url, timeout)
+
+        return await loop.run_in_executor(parse_executor, _parse_pdf_bytes, content)
+
+    tasks = [asyncio.ensure_future(fetch_and_parse(url)) for url in urls]
+    try:
+        return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+    finally:
+        # After the first exception (or a cancellation), gather leaves the other tasks running, so
+        # stop them before their executors are shut down
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        # Downloads that already started may still use the session, so wait for them (without
+        # blocking the event loop) before closing it
+        await asyncio.to_thread(download_executor.shutdown, wait=True, cancel_futures=True)
+        if executor is None:
+            parse_executor.shutdown(wait=False, cancel_futures=True)
+        session.close()
@@ -0,0 +1,181 @@
+"""
+    nllegalcit/grammar.py
+
+    Loading of the Lark parsers, using an on-disk cache of the compiled grammars.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+import hashlib
+import importlib
+import io
+import logging
+import os
+import pathlib
+import pickle
+import sys
+import tempfile
+import types
+from typing import Any, Iterable, Optional
+
+import lark
+from lark import Lark
+
+logger = logging.getLogger(__name__)
+
+GRAMMAR_DIR: pathlib.Path = pathlib.Path(__file__).parent / "grammars"
+
+#: The types of citations that can be selected with subset_grammar
+CITATION_TYPES: tuple[str, ...] = ("ecli", "ljn", "kamerstuk")
+
+# The rules of caselaw.lark that recognize ECLI and LJN citations. They are imported under the
+# same names as in citations.lark, so that the parse trees are the same for the visitors.
+_CASE_LAW_RULES = {
+    "ecli": "caselaw__case_law_ecli",
+    "ljn": "caselaw__ljn",
+}
+
+
+def grammar_hash() -> str:
+    """Get a hash of the contents of all grammar files."""
+
+    h = hashlib.sha256()
+    for grammar_file in sorted(GRAMMAR_DIR.glob("*.lark")):
+        h.update(grammar_file.name.encode("utf-8"))
+        h.update(grammar_file.read_bytes())
+
+    return h.hexdigest()
+
+
+def cache_dir() -> Optional[pathlib.Path]:
+    """Get the directory in which compiled grammars are cached.
+
+    This is $NLLEGALCIT_CACHE_DIR if it is set, or otherwise the nllegalcit directory in the
+    user's cache directory. If NLLEGALCIT_CACHE_DIR is set to an empty string, caching is
+    disabled and None is returned.
+    """
+
+    directory = os.environ.get("NLLEGALCIT_CACHE_DIR")
+    if directory is not None:
+        return pathlib.Path(directory) if directory else None
+
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME")
+    if xdg_cache_home:
+        return pathlib.Path(xdg_cache_home) / "nllegalcit"
+
+    return pathlib.Path.home() / ".cache" / "nllegalcit"
+
+
+def subset_grammar(citation_types: Iterable[str]) -> str:
+    """Create a grammar which finds only the given types of citations (see CITATION_TYPES).
+
+    The grammar imports only the required rules of caselaw.lark and kamerstukken.lark, and
+    its parse trees have the same shape as those of citations.lark. It is meant to be loaded
+    with load_parser(name, source=grammar).
+    """
+
+    selected = set(citation_types)
+    unknown = selected.difference(CITATION_TYPES)
+    if unknown:
+        raise ValueError(f"Unknown citation types {sorted(unknown)}, expected any of {CITATION_TYPES}")
+    if not selected:
+        raise ValueError("No citation types selected")
+
+    case_law_rules = [rule for citation_type, rule in _CASE_LAW_RULES.items() if citation_type in selected]
+    start = ["kamerstuk"] if "kamerstuk" in selected else []
+    start += ["case_law"] if case_law_rules else []
+
+    lines = [f"?start: ({' | '.join(start + ['_text'])})+", "", "%import citations._text -> _text"]
+    if "kamerstuk" in selected:
+        lines.append("%import kamerstukken.kamerstuk -> kamerstuk")
+    if case_law_rules:
+        lines.insert(1, f"case_law: {' | '.join(case_law_rules)}")
+        lines.extend(f"%import caselaw.{rule.removeprefix('caselaw__')} -> {rule}" for rule in case_law_rules)
+
+    return "\n".join(lines) + "\n"
+
+
+class _ParserPickler(pickle.Pickler):
+    """Pickler that stores references to modules (such as re) by name"""
+
+    def reducer_override(self, obj):
+        """Reduce modules to an import of the module"""
+        if isinstance(obj, types.ModuleType):
+            return importlib.import_module, (obj.__name__,)
+
+        return NotImplemented
+
+
+def _cache_key(grammar: str, source: Optional[str], options: dict[str, Any]) -> str:
+    h = hashlib.sha256()
+    h.update(grammar.encode("utf-8"))
+    h.update(repr(source).encode("utf-8"))
+    h.update(repr(sorted(options.items())).encode("utf-8"))
+    h.update(grammar_hash().encode("utf-8"))
+    h.update(lark.__version__.encode("utf-8"))
+    h.update(repr(sys.version_info[:2]).encode("utf-8"))
+
+    return h.hexdigest()
+
+
+def _write_cache(cache_file: pathlib.Path, parser: Lark) -> None:
+    buffer = io.BytesIO()
+    _ParserPickler(buffer).dump(parser)
+
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+
+    # Write to a temporary file first, so that concurrent processes never read a partial file
+    fd, tmp_name = tempfile.mkstemp(dir=cache_file.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(buffer.getvalue())
+        os.replace(tmp_name, cache_file)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def load_parser(grammar: str, source: Optional[str] = None, **options) -> Lark:
+    """Create a Lark parser for the given grammar, which is relative to the grammars directory.
+
+    Instead of a grammar file, the text of a grammar can be given as source, in which case
+    grammar is only its name. Such a grammar can import rules from the grammar files, for
+    example with %import caselaw.ljn.
+
+    The compiled parser is cached on disk, keyed by the contents of the grammar files, the
+    options and the versions of Lark and Python. Later calls, also from other processes, load
+    the parser from this cache instead of compiling the grammar again.
+    """
+
+    directory = cache_dir()
+    cache_file = None
+
+    if directory is not None:
+        cache_file = directory / f"grammar-{_cache_key(grammar, source, options)}.pickle"
+
+        try:
+            with open(cache_file, "rb") as f:
+                parser = pickle.load(f)
+            if isinstance(parser, Lark):
+                return parser
+        except FileNotFoundError:
+            pass
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.warning("Failed to load grammar from cache %s, compiling it instead", cache_file, exc_info=True)
+
+    if source is None:
+        parser = Lark.open(str(GRAMMAR_DIR / grammar), **options)
+    else:
+        parser = Lark(source, import_paths=[str(GRAMMAR_DIR)], **options)
+
+    if cache_file is not None:
+        try:
+            _write_cache(cache_file, parser)
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.warning("Failed to write grammar cache %s", cache_file, exc_info=True)
+
+    return parser
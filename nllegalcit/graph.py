@@ -0,0 +1,278 @@
+"""
+    nllegalcit/graph.py
+
+    A graph of the citations in a corpus of documents, stored as compressed sparse row arrays.
+
+    This requires numpy, which is an optional dependency (pip install nllegalcit[graph]).
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+import array
+import collections
+import pathlib
+from typing import Any, Iterable, Optional
+
+from .citations import Citation, EcliCitation, KamerstukCitation, LjnCitation
+
+
+def _import_numpy():
+    try:
+        import numpy  # pylint: disable=import-outside-toplevel
+    except ImportError as e:
+        raise ImportError("The citation graph requires numpy, install it with pip install nllegalcit[graph]") from e
+
+    return numpy
+
+
+def citation_target(citation: Citation) -> str:
+    """Get the identifier of the document cited by a citation.
+
+    Citations of different parts of the same document, such as different pages of a kamerstuk,
+    have the same target. Whitespace, such as a line break within a citation, is normalized: it
+    is removed from an ECLI, and replaced by a single space otherwise.
+    """
+
+    if isinstance(citation, EcliCitation):
+        return "".join(str(citation).split())
+
+    if isinstance(citation, LjnCitation):
+        target = str(citation)
+    elif isinstance(citation, KamerstukCitation):
+        target = (f"Kamerstukken {citation.kamer.value} {citation.vergaderjaar}, {citation.dossiernummer},"
+                  f" nr. {citation.ondernummer}")
+    else:
+        target = repr(citation)
+
+    return " ".join(target.split())
+
+
+def _check_name(name: str) -> str:
+    if "\n" in name or "\r" in name:
+        raise ValueError(f"Names in a citation graph can not contain line breaks: {name!r}")
+
+    return name
+
+
+class CitationGraph():  # pylint: disable=too-many-instance-attributes
+    """A graph of documents citing targets, as compressed sparse row (CSR) arrays.
+
+    Documents and targets have dense integer ids, in the order in which they were added. The
+    targets cited by document d are indices[indptr[d]:indptr[d + 1]], and weights holds the
+    number of times each of these targets is cited by d.
+    """
+
+    #: The names of the documents, by id
+    documents: list[str]
+
+    #: The names of the cited targets (see citation_target), by id
+    targets: list[str]
+
+    def __init__(self, documents: list[str], targets: list[str], indptr: Any, indices: Any, weights: Any):
+        self.documents = documents
+        self.targets = targets
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+
+        self._document_ids: Optional[dict[str, int]] = None
+        self._target_ids: Optional[dict[str, int]] = None
+        self._transposed: Optional[tuple[Any, Any]] = None
+
+    def __repr__(self) -> str:
+        return f"CitationGraph({len(self.documents)} documents, {len(self.targets)} targets, {len(self.indices)} edges)"
+
+    def document_id(self, document: str) -> int:
+        """Get the id of a document, by its name."""
+
+        if self._document_ids is None:
+            self._document_ids = {name: i for i, name in enumerate(self.documents)}
+
+        return self._document_ids[document]
+
+    def target_id(self, target: str | Citation) -> int:
+        """Get the id of a target, by its name or by a Citation of it."""
+
+        if isinstance(target, Citation):
+            target = citation_target(target)
+
+        if self._target_ids is None:
+            self._target_ids = {name: i for i, name in enumerate(self.targets)}
+
+        return self._target_ids[target]
+
+    def out_degree(self):
+        """Get the number of distinct targets cited by every document, as an array by document id."""
+
+        return _import_numpy().diff(self.indptr)
+
+    def in_degree(self):
+        """Get the number of documents citing every target, as an array by target id."""
+
+        return _import_numpy().bincount(self.indices, minlength=len(self.targets))
+
+    def top_cited(self, n: int = 10) -> list[tuple[str, int]]:
+        """Get the n targets cited by the most documents, with the number of documents citing them."""
+
+        np = _import_numpy()
+
+        in_degree = self.in_degree()
+        n = min(n, len(in_degree))
+        if n == 0:
+            return []
+
+        # The n targets with the highest in-degree, ordered by in-degree and then by id
+        top = np.argpartition(-in_degree, n - 1)[:n]  # pylint: disable=invalid-unary-operand-type
+        top = top[np.lexsort((top, -in_degree[top]))]  # pylint: disable=invalid-unary-operand-type
+
+        return [(self.targets[t], int(in_degree[t])) for t in top]
+
+    def cited_by_document(self, document: str) -> list[str]:
+        """Get the targets cited by a document."""
+
+        d = self.document_id(document)
+
+        return [self.targets[t] for t in self.indices[self.indptr[d]:self.indptr[d + 1]]]
+
+    def _transpose(self) -> tuple[Any, Any]:
+        """Get the CSR arrays of the reversed graph, from targets to the documents citing them."""
+
+        if self._transposed is None:
+            np = _import_numpy()
+
+            rows = np.repeat(np.arange(len(self.documents), dtype=np.int32), self.out_degree())
+            order = np.argsort(self.indices, kind="stable")
+            indptr = np.zeros(len(self.targets) + 1, dtype=np.int64)
+            np.cumsum(self.in_degree(), out=indptr[1:])
+
+            self._transposed = (indptr, rows[order])
+
+        return self._transposed
+
+    def citing_documents(self, target: str | Citation) -> list[str]:
+        """Get the documents citing a target."""
+
+        t = self.target_id(target)
+        indptr, indices = self._transpose()
+
+        return [self.documents[d] for d in indices[indptr[t]:indptr[t + 1]]]
+
+    def neighbours(self, document: str) -> list[str]:
+        """Get the other documents which cite at least one of the targets cited by a document."""
+
+        np = _import_numpy()
+
+        d = self.document_id(document)
+        indptr, indices = self._transpose()
+        targets = self.indices[self.indptr[d]:self.indptr[d + 1]]
+
+        if len(targets) == 0:
+            return []
+
+        documents = np.unique(np.concatenate([indices[indptr[t]:indptr[t + 1]] for t in targets]))
+
+        return [self.documents[n] for n in documents if n != d]
+
+    def save(self, directory: str | pathlib.Path) -> None:
+        """Save the graph to a directory, which is created if it does not exist yet."""
+
+        np = _import_numpy()
+
+        directory = pathlib.Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        np.save(directory / "indptr.npy", self.indptr)
+        np.save(directory / "indices.npy", self.indices)
+        np.save(directory / "weights.npy", self.weights)
+
+        for name, names in (("documents", self.documents), ("targets", self.targets)):
+            with open(directory / f"{name}.txt", "w", encoding="utf-8", newline="\n") as f:
+                for line in names:
+                    f.write(f"{line}\n")
+
+    @classmethod
+    def load(cls, directory: str | pathlib.Path, mmap: bool = True) -> "CitationGraph":
+        """Load a graph saved with save. If mmap is True, the arrays are memory-mapped."""
+
+        np = _import_numpy()
+
+        directory = pathlib.Path(directory)
+        mmap_mode = "r" if mmap else None
+
+        names = {}
+        for name in ("documents", "targets"):
+            with open(directory / f"{name}.txt", encoding="utf-8", newline="\n") as f:
+                names[name] = f.read().split("\n")[:-1]
+
+        return cls(
+            names["documents"],
+            names["targets"],
+            np.load(directory / "indptr.npy", mmap_mode=mmap_mode),
+            np.load(directory / "indices.npy", mmap_mode=mmap_mode),
+            np.load(directory / "weights.npy", mmap_mode=mmap_mode)
+        )
+
+
+class CitationGraphBuilder():
+    """Build a CitationGraph, one document at a time.
+
+    The edges are kept in typed arrays while the graph is built, so that no Python object is
+    kept per edge.
+    """
+
+    def __init__(self):
+        self._documents: dict[str, int] = {}
+        self._targets: dict[str, int] = {}
+        self._indptr = array.array("q", [0])
+        self._indices = array.array("i")
+        self._weights = array.array("i")
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add(self, document: str, citations: Iterable[Citation]) -> None:
+        """Add a document and the citations found in it. Every document may only be added once.
+
+        If the document or a target can not be added, a ValueError is raised and the builder is
+        not changed.
+        """
+
+        if document in self._documents:
+            raise ValueError(f"Document {document!r} was already added")
+        _check_name(document)
+
+        # All targets are checked before anything is added
+        targets = collections.Counter(citation_target(citation) for citation in citations)
+        for target in targets:
+            if target not in self._targets:
+                _check_name(target)
+
+        self._documents[document] = len(self._documents)
+
+        counts: dict[int, int] = {}
+        for target, count in targets.items():
+            t = self._targets.setdefault(target, len(self._targets))
+            counts[t] = count
+
+        for t in sorted(counts):
+            self._indices.append(t)
+            self._weights.append(counts[t])
+
+        self._indptr.append(len(self._indices))
+
+    def build(self) -> CitationGraph:
+        """Create the CitationGraph of the documents added so far."""
+
+        np = _import_numpy()
+
+        return CitationGraph(
+            list(self._documents),
+            list(self._targets),
+            np.frombuffer(self._indptr, dtype=np.int64).copy(),
+            np.frombuffer(self._indices, dtype=np.int32).copy(),
+            np.frombuffer(self._weights, dtype=np.int32).copy()
+        )
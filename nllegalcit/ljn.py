@@ -0,0 +1,223 @@
+"""
+    nllegalcit/ljn.py
+
+    Resolve LJN citations to ECLI citations, using a local index file.
+
+    The index is built once from a mapping of LJNs to ECLIs, such as an offline dump of the
+    rechtspraak.nl open data. It is a file of fixed-width records, sorted by LJN, which is
+    memory-mapped and binary searched, so it is never loaded into Python objects as a whole.
+    The file starts with a header, followed by all LJNs as 32-bit numbers and then all ECLIs
+    (padded with NUL bytes to the length of the longest ECLI), so that the LJNs can be searched
+    as one array.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+import bisect
+import mmap
+import pathlib
+import re
+import struct
+from typing import Any, Iterable, Optional
+
+from .citations import EcliCitation, LjnCitation
+from .utils import ecli_citation_from_correct_string
+
+# The header of an index file: magic bytes, width of the ECLIs, number of LJNs
+_MAGIC = b"NLLJNIX1"
+_HEADER = struct.Struct("<8sIQ")
+_HEADER_SIZE = 32
+
+_KEY = struct.Struct("<I")
+
+re_ljn: re.Pattern = re.compile(r"[A-Z]{2}[0-9]{4}")
+
+
+def _normalize_ljn(ljn: str | LjnCitation) -> str:
+    if isinstance(ljn, LjnCitation):
+        return ljn.code
+
+    return ljn.replace(" ", "").upper()
+
+
+def ljn_number(ljn: str | LjnCitation) -> Optional[int]:
+    """Get the number of an LJN in the index, or None if it is not a valid LJN.
+
+    An LJN consists of two letters and four digits, e.g. AU9722, so every LJN has a number
+    below 26 * 26 * 10000.
+    """
+
+    ljn = _normalize_ljn(ljn)
+    if re_ljn.fullmatch(ljn) is None:
+        return None
+
+    return ((ord(ljn[0]) - 65) * 26 + (ord(ljn[1]) - 65)) * 10000 + int(ljn[2:])
+
+
+def build_ljn_index(mapping: Iterable[tuple[str, str]], path: str | pathlib.Path) -> int:
+    """Build an LJN index file at path from (LJN, ECLI) pairs, and return the number of LJNs in it.
+
+    If an LJN occurs more than once in the mapping, its first ECLI is used.
+    """
+
+    ecli_by_number: dict[int, bytes] = {}
+    for ljn, ecli in mapping:
+        number = ljn_number(ljn)
+        if number is None:
+            raise ValueError(f"Invalid LJN {ljn!r}")
+
+        ecli_by_number.setdefault(number, ecli.strip().encode("ascii"))
+
+    ecli_width = max((len(ecli) for ecli in ecli_by_number.values()), default=0)
+    numbers = sorted(ecli_by_number)
+
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, ecli_width, len(numbers)).ljust(_HEADER_SIZE, b"\0"))
+        for number in numbers:
+            f.write(_KEY.pack(number))
+        for number in numbers:
+            f.write(ecli_by_number[number].ljust(ecli_width, b"\0"))
+
+    return len(numbers)
+
+
+class _Keys():
+    """Sequence of the LJN numbers in an index, for bisect"""
+
+    def __init__(self, buffer: mmap.mmap, length: int):
+        self.buffer = buffer
+        self.length = length
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, i: int) -> int:
+        number: int = _KEY.unpack_from(self.buffer, _HEADER_SIZE + i * _KEY.size)[0]
+        return number
+
+
+class LjnIndex():
+    """A memory-mapped LJN index file, built by build_ljn_index.
+
+    Use it as a context manager, or call close() when done:
+    ::
+
+        with LjnIndex("ljn.idx") as index:
+            ecli = index.resolve(LjnCitation("AU9722"))
+    """
+
+    def __init__(self, path: str | pathlib.Path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, ecli_width, length = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not an LJN index file")
+
+        self._ecli_width: int = ecli_width
+        self._length: int = length
+
+        self._keys = _Keys(self._mmap, self._length)
+        self._eclis_start = _HEADER_SIZE + self._length * _KEY.size
+
+        # numpy views of the LJN numbers and ECLIs, see lookup_many
+        self._key_array: Any = None
+        self._ecli_array: Any = None
+
+    def __len__(self) -> int:
+        return self._length
+
+    def lookup(self, ljn: str | LjnCitation) -> Optional[str]:
+        """Get the ECLI for an LJN or LjnCitation as a string, or None if the LJN is not in the index."""
+
+        number = ljn_number(ljn)
+        if number is None:
+            return None
+
+        i = bisect.bisect_left(self._keys, number)
+        if i == self._length or self._keys[i] != number:
+            return None
+
+        start = self._eclis_start + i * self._ecli_width
+        return self._mmap[start:start + self._ecli_width].rstrip(b"\0").decode("ascii")
+
+    def lookup_many(self, ljns: Iterable[str | LjnCitation]) -> list[Optional[str]]:
+        """Get the ECLIs for many LJNs at once as strings, in order.
+
+        If numpy is installed, the LJNs are converted and searched as arrays, which is much
+        faster than looking them up one by one.
+        """
+
+        codes = [ljn.code if isinstance(ljn, LjnCitation) else ljn for ljn in ljns]
+
+        try:
+            import numpy as np  # pylint: disable=import-outside-toplevel
+        except ImportError:
+            return [self.lookup(code) for code in codes]
+
+        if self._length == 0 or not codes:
+            return [None] * len(codes)
+
+        if self._key_array is None:
+            self._key_array = np.frombuffer(self._mmap, "<u4", self._length, _HEADER_SIZE)
+            self._ecli_array = np.frombuffer(self._mmap, f"S{self._ecli_width}", self._length, self._eclis_start)
+
+        # The code points of the LJNs, padded with zeroes, in upper case
+        code_points = np.array(codes, dtype="U").view(np.uint32).reshape(len(codes), -1).astype(np.int64)
+        code_points -= 32 * ((code_points >= ord("a")) & (code_points <= ord("z")))
+        if code_points.shape[1] < 6:
+            return [self.lookup(code) for code in codes]
+
+        # Compute the numbers of the LJNs; LJNs with spaces in them are normalized one by one
+        letters = code_points[:, :2] - ord("A")
+        digits = code_points[:, 2:6] - ord("0")
+        valid = ((letters >= 0) & (letters < 26)).all(axis=1) & ((digits >= 0) & (digits < 10)).all(axis=1)
+        valid &= (code_points[:, 6:] == 0).all(axis=1)
+        numbers = (letters[:, 0] * 26 + letters[:, 1]) * 10000 + digits @ np.array([1000, 100, 10, 1])
+
+        for i in np.flatnonzero((code_points == ord(" ")).any(axis=1)).tolist():
+            number = ljn_number(codes[i])
+            valid[i] = number is not None
+            numbers[i] = number or 0
+
+        # Searching the LJNs in sorted order is much faster, as it accesses the index in order
+        order = np.argsort(numbers)
+        found = np.empty(len(codes), dtype=np.int64)
+        found[order] = np.searchsorted(self._key_array, numbers[order])
+        found[found == self._length] = 0
+        valid &= self._key_array[found] == numbers
+
+        eclis = self._ecli_array[found].astype(f"U{self._ecli_width}").tolist()
+
+        return [ecli if v else None for ecli, v in zip(eclis, valid.tolist())]
+
+    def resolve(self, ljn: str | LjnCitation) -> Optional[EcliCitation]:
+        """Get the EcliCitation for an LJN or LjnCitation, or None if the LJN is not in the index."""
+
+        ecli = self.lookup(ljn)
+
+        return None if ecli is None else ecli_citation_from_correct_string(ecli)
+
+    def resolve_many(self, ljns: Iterable[str | LjnCitation]) -> list[Optional[EcliCitation]]:
+        """Get the EcliCitations for many LJNs at once, in order. See lookup_many."""
+
+        return [None if ecli is None else ecli_citation_from_correct_string(ecli) for ecli in self.lookup_many(ljns)]
+
+    def close(self) -> None:
+        """Close the index file."""
+
+        # The numpy views have to be released before the mmap can be closed
+        self._key_array = None
+        self._ecli_array = None
+        self._mmap.close()
+
+    def __enter__(self) -> "LjnIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,109 @@
+"""
+    nllegalcit/memo.py
+
+    An in-process cache of the citations found in paragraphs, so that paragraphs that occur in
+    many documents (such as standard considerations and signature blocks) are parsed only once.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+import collections
+import hashlib
+import re
+from typing import Iterator, Optional
+
+from .citations import Citation
+
+#: The default maximum number of paragraphs in a ParagraphCache
+DEFAULT_MAX_PARAGRAPHS: int = 10_000
+
+# Paragraphs are separated by blank lines
+re_paragraph_separator: re.Pattern = re.compile(r"\n[ \t\r\f\v]*\n\s*")
+
+
+def iter_paragraphs(text: str) -> Iterator[tuple[int, int]]:
+    """Yield the (start, end) positions of the paragraphs in text, which are separated by blank lines.
+
+    Whitespace at the start and end of a paragraph is not part of it, so that the same paragraph
+    has the same text wherever it occurs.
+    """
+
+    start = len(text) - len(text.lstrip())
+    for separator in re_paragraph_separator.finditer(text, start):
+        if separator.start() > start:
+            yield start, separator.start()
+        start = separator.end()
+
+    end = len(text.rstrip())
+    if start < end:
+        yield start, end
+
+
+class ParagraphCache():
+    """A bounded LRU cache of the citations found in paragraphs, keyed by a hash of the paragraph.
+
+    The citations are stored with positions relative to the start of the paragraph. Only
+    paragraphs that are parsed (because they may contain a citation) are counted and stored.
+    """
+
+    #: The number of paragraphs found in the cache
+    hits: int
+
+    #: The number of paragraphs not found in the cache
+    misses: int
+
+    def __init__(self, max_paragraphs: int = DEFAULT_MAX_PARAGRAPHS):
+        self.max_paragraphs = max_paragraphs
+        self.hits = 0
+        self.misses = 0
+
+        self._paragraphs: collections.OrderedDict[tuple[str, bytes], tuple[Citation, ...]] = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._paragraphs)
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of the paragraphs that were found in the cache."""
+
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @staticmethod
+    def key(kind: str, paragraph: str) -> tuple[str, bytes]:
+        """Get the key of a paragraph, for the kind of citations that are parsed."""
+
+        return kind, hashlib.blake2b(paragraph.encode("utf-8", errors="surrogatepass"), digest_size=16).digest()
+
+    def get(self, key: tuple[str, bytes]) -> Optional[tuple[Citation, ...]]:
+        """Get the citations of the paragraph with this key, or None if it is not in the cache."""
+
+        citations = self._paragraphs.get(key)
+        if citations is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._paragraphs.move_to_end(key)
+
+        return citations
+
+    def put(self, key: tuple[str, bytes], citations: tuple[Citation, ...]) -> None:
+        """Store the citations of the paragraph with this key, removing the least recently used paragraphs."""
+
+        self._paragraphs[key] = citations
+        self._paragraphs.move_to_end(key)
+
+        while len(self._paragraphs) > self.max_paragraphs:
+            self._paragraphs.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all paragraphs and reset the counters."""
+
+        self._paragraphs.clear()
+        self.hits = 0
+        self.misses = 0
@@ -8,65 +8,436 @@
     SPDX-License-Identifier: EUPL-1.2
 """
 
+import bisect
 import io
+import mmap
 import pathlib
-from typing import Any, IO
+import re
+import time
+from typing import Any, Callable, IO, Iterable, Iterator, Optional
 
 import requests
-
 from lark import Lark
-from pypdf import PdfReader
 
-from .citations import Citation, KamerstukCitation
-from .visitors import CitationVisitor, CitationVisitorOnlyKamerstukCitations
+from .citations import Citation, CitationSummary, KamerstukCitation
+from .grammar import CITATION_TYPES, load_parser, subset_grammar
+from .memo import ParagraphCache, iter_paragraphs
+from .pdf import iter_pdf_pages
+from .prefilter import candidate_windows, compile_triggers, re_trigger, re_trigger_kamerstuk
+from .regexparser import RegexParser
+from .stats import current_stats
+from .visitors import CitationVisitor, CitationVisitorOnlyKamerstukCitations, CitationSummaryVisitor
+from .windows import iter_chunk_windows, iter_windows, WINDOW_SIZE
+
+
+class _Grammar():
+    """A grammar in the grammars directory, with the prefilter triggers of the citations in it.
+
+    If source is given, it is the text of the grammar, and name is only used to identify it.
+    The Earley parser of the grammar is loaded when it is first used, and the regex parser is
+    built from it when it is first used.
+    """
+
+    def __init__(self, name: str, trigger: re.Pattern, source: Optional[str] = None):
+        self.name = name
+        self.trigger = trigger
+        self.source = source
+        self._parser: Optional[Lark] = None
+        self._regex_parser: Optional[RegexParser] = None
+
+    @property
+    def parser(self) -> Lark:
+        """The Earley parser of the grammar"""
+
+        if self._parser is None:
+            self._parser = load_parser(self.name, self.source, parser="earley")
+
+        return self._parser
+
+    @property
+    def regex_parser(self) -> RegexParser:
+        """The regex parser of the grammar"""
+
+        if self._regex_parser is None:
+            self._regex_parser = RegexParser(self.parser)
+
+        return self._regex_parser
+
+    def engine(self, engine: str) -> Lark | RegexParser:
+        """Get the parser of an engine (see ENGINES)."""
+
+        _check_engine(engine)
+
+        return self.regex_parser if engine == "regex" else self.parser
+
+    def windows(self, text: str, prefilter: bool = True) -> list[tuple[int, int]]:
+        """Get the (start, end) windows of text to parse, which is all of text if prefilter is False."""
+
+        if prefilter:
+            return candidate_windows(text, trigger=self.trigger)
+
+        return [(0, len(text))] if text else []
+
+
+# All supported citations
+_ALL_CITATIONS = _Grammar("citations.lark", re_trigger)
+
+# Only citations to Kamerstukken, which is faster to parse than all citations
+_KAMERSTUK_CITATIONS = _Grammar("citations_kamerstukken.lark", re_trigger_kamerstuk)
+
+# The grammars of the subsets of CITATION_TYPES that were used, by the types in them
+_grammars: dict[frozenset[str], _Grammar] = {
+    frozenset(CITATION_TYPES): _ALL_CITATIONS,
+    frozenset({"kamerstuk"}): _KAMERSTUK_CITATIONS,
+}
+
+parser = _ALL_CITATIONS.parser
+
+#: The parsers that can be selected with engine=: the Earley parser of Lark, and a RegexParser
+#: which gives the same results, but is much faster
+ENGINES: tuple[str, ...] = ("earley", "regex")
+
+
+def _check_engine(engine: str) -> None:
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}, expected one of {', '.join(ENGINES)}")
+
+
+def _grammar(types: Optional[str | Iterable[str]]) -> _Grammar:
+    """Get the grammar of the given types of citations (see CITATION_TYPES), or of all types if types is None."""
+
+    if types is None:
+        return _ALL_CITATIONS
+
+    key = frozenset([types] if isinstance(types, str) else types)
+    grammar = _grammars.get(key)
+    if grammar is None:
+        source = subset_grammar(key)
+        grammar = _Grammar(f"citations[{','.join(sorted(key))}]", compile_triggers(key), source)
+        _grammars[key] = grammar
+
+    return grammar
+
+
+#: Default timeout for downloading a PDF file, in seconds
+DEFAULT_TIMEOUT: float = 60
+
+
+def _parse_windows(  # pylint: disable=too-many-arguments, too-many-positional-arguments, too-many-locals
+        text: str,
+        windows: Iterable[tuple[int, int]],
+        visitor_class: Callable[[str, int], CitationVisitor],
+        offset: int = 0,
+        grammar: _Grammar = _ALL_CITATIONS,
+        engine: str = "earley") -> Iterator[Citation]:
+    """Parse the given (start, end) windows of text, which starts at position offset in the complete text."""
+
+    stats = current_stats()
+    parse = grammar.engine(engine).parse
+
+    for start, end in windows:
+        window = text[start:end]
+        v = visitor_class(window, offset + start)
+
+        if stats is None:
+            v.visit(parse(window))
+        else:
+            parse_start = time.perf_counter()
+            tree = parse(window)
+            visit_start = time.perf_counter()
+            v.visit(tree)
+            visit_end = time.perf_counter()
+
+            nodes = sum(1 for _ in tree.iter_subtrees())
+            stats.record("parse", visit_start - parse_start, len(window))
+            stats.record("visit", visit_end - visit_start, nodes)
+            stats.count(nodes, v.citations)
+
+        yield from v.citations
+
+
+def _iter_paragraphs(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+        text: str,
+        visitor_class: Callable[[str, int], CitationVisitor],
+        prefilter: bool,
+        offset: int,
+        paragraph_cache: ParagraphCache,
+        grammar: _Grammar,
+        engine: str) -> Iterator[Citation]:
+    """Parse text paragraph by paragraph, reusing the citations of paragraphs in paragraph_cache."""
+
+    kind = f"{getattr(visitor_class, '__name__', repr(visitor_class))}:{grammar.name}"
+
+    for start, end in iter_paragraphs(text):
+        paragraph = text[start:end]
+        windows = grammar.windows(paragraph, prefilter)
+        if not windows:
+            continue
+
+        key = paragraph_cache.key(kind, paragraph)
+        citations = paragraph_cache.get(key)
+        if citations is None:
+            citations = tuple(_parse_windows(paragraph, windows, visitor_class, grammar=grammar, engine=engine))
+            paragraph_cache.put(key, citations)
+
+        for citation in citations:
+            yield citation.shift(offset + start)
+
+
+def _iter_text(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+        text: str,
+        visitor_class: Callable[[str, int], CitationVisitor],
+        prefilter: bool = True,
+        offset: int = 0,
+        paragraph_cache: Optional[ParagraphCache] = None,
+        grammar: _Grammar = _ALL_CITATIONS,
+        engine: str = "earley") -> Iterator[Citation]:
+    """Parse text, which starts at position offset in the complete text, and yield every citation.
+
+    If prefilter is True, only the candidate windows of the text which may contain a
+    citation are parsed, instead of the complete text. If a paragraph_cache is given, the text
+    is parsed paragraph by paragraph, and paragraphs in the cache are not parsed again.
+    """
+
+    if paragraph_cache is not None:
+        return _iter_paragraphs(text, visitor_class, prefilter, offset, paragraph_cache, grammar, engine)
+
+    return _parse_windows(text, grammar.windows(text, prefilter), visitor_class, offset, grammar, engine)
+
+
+def _iter_windowed(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+        windows: Iterable[tuple[str, int, int]],
+        visitor_class: type[CitationVisitor],
+        prefilter: bool,
+        paragraph_cache: Optional[ParagraphCache] = None,
+        grammar: _Grammar = _ALL_CITATIONS,
+        engine: str = "earley") -> Iterator[Citation]:
+    """Parse overlapping windows one by one, and yield the citations found in them.
+
+    Citations that lie in the overlap of two windows are only yielded once. A citation which
+    straddles the edge of a window is only dropped if it is found whole in the next window.
+    """
+
+    pending: list[Citation] = []
+    previous_cut = 0
+
+    for window, offset, cut in windows:
+        found = list(_iter_text(window, visitor_class, prefilter, offset, paragraph_cache, grammar, engine))
+
+        for citation in pending:
+            if not any(f.start < citation.end and citation.start < f.end for f in found):  # type: ignore[operator]
+                yield citation
+
+        pending = []
+        for citation in found:
+            if citation.end <= previous_cut:  # type: ignore[operator]
+                # Already yielded from the previous window
+                continue
+
+            if citation.end > offset + cut:  # type: ignore[operator]
+                pending.append(citation)
+            else:
+                yield citation
+
+        previous_cut = offset + cut
+
+
+def _iter(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+        text: str | mmap.mmap,
+        visitor_class: type[CitationVisitor],
+        prefilter: bool = True,
+        window_size: Optional[int] = None,
+        paragraph_cache: Optional[ParagraphCache] = None,
+        grammar: _Grammar = _ALL_CITATIONS,
+        engine: str = "earley") -> Iterator[Citation]:
+    _check_engine(engine)
+
+    if window_size is None and isinstance(text, mmap.mmap):
+        window_size = WINDOW_SIZE
+
+    if window_size is None:
+        return _iter_text(text, visitor_class, prefilter, 0, paragraph_cache, grammar, engine)  # type: ignore[arg-type]
+
+    return _iter_windowed(iter_windows(text, window_size), visitor_class, prefilter, paragraph_cache, grammar, engine)
+
+
+def iter_citations(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+        text: str | mmap.mmap,
+        prefilter: bool = True,
+        window_size: Optional[int] = None,
+        paragraph_cache: Optional[ParagraphCache] = None,
+        types: Optional[str | Iterable[str]] = None,
+        engine: str = "earley") -> Iterator[Citation]:
+    """Iterate over any supported citation in a given text, as soon as it is found.
+
+    This takes the same arguments as parse_citations. Citations are yielded after each parsed
+    window of the text, so they can already be processed while the rest of the text is parsed.
+    """
+
+    return _iter(text, CitationVisitor, prefilter, window_size, paragraph_cache, _grammar(types), engine)
+
+
+def parse_citations(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+        text: str | mmap.mmap,
+        prefilter: bool = True,
+        window_size: Optional[int] = None,
+        paragraph_cache: Optional[ParagraphCache] = None,
+        types: Optional[str | Iterable[str]] = None,
+        engine: str = "earley") -> list[Citation]:
+    """Parse any supported citation in a given text.
+
+    By default, the text is first scanned for trigger terms, and only the parts of the text
+    around these triggers are parsed. This gives the same results as parsing the complete text,
+    which can be done by setting prefilter to False.
 
-parser = Lark.open(
-    "grammars/citations.lark",
-    rel_to=__file__,
-    parser="earley"
-)
+    If a window_size (in characters) is given, the text is split at paragraph or sentence
+    boundaries into overlapping windows of at most this size, which are parsed one by one. This
+    limits the memory use for very long texts. text may also be a memory-mapped UTF-8 text file,
+    which is always parsed window by window, so that it is never decoded as one string.
 
+    If a ParagraphCache is given, the text is parsed paragraph by paragraph (paragraphs are
+    separated by blank lines), and the citations of paragraphs which were parsed before are
+    taken from the cache instead of being parsed again. This speeds up parsing corpora in which
+    the same paragraphs occur in many documents. Citations which span a blank line are not
+    found in this mode.
 
-def parse_citations(text: str) -> list[Citation]:
-    """Parse any supported citation in a given text."""
+    If types is given, only citations of these types are parsed: any of "ecli", "ljn" and
+    "kamerstuk" (see nllegalcit.grammar.CITATION_TYPES). A smaller grammar with only the rules
+    for these types is then compiled (or loaded from the grammar cache) the first time the
+    types are used, which makes parsing faster.
 
-    parsetree = parser.parse(text)
-    v = CitationVisitor()
-    v.visit(parsetree)
+    The engine is the parser that is used: "earley" (the default) for the Earley parser of Lark,
+    or "regex" for a parser which matches the same grammar with regular expressions, and is many
+    times faster. Both engines find the same citations (see ENGINES).
+    """
+
+    return list(iter_citations(text, prefilter, window_size, paragraph_cache, types, engine))
+
+
+def summarize_citations(
+        text: str | mmap.mmap,
+        prefilter: bool = True,
+        window_size: Optional[int] = None,
+        types: Optional[str | Iterable[str]] = None,
+        engine: str = "earley") -> list[CitationSummary]:
+    """Count the distinct supported citations in a given text.
+
+    This takes the same arguments as parse_citations, and returns a CitationSummary for every
+    distinct citation, with the number of occurrences and the positions of the first and last
+    occurrence, in the order of their first occurrence. The citations are counted while the
+    parse trees are visited, so the list of all occurrences is never built.
+    """
+
+    summary: dict[Citation, CitationSummary] = {}
+    grammar = _grammar(types)
+    _check_engine(engine)
 
-    return v.citations
+    if window_size is None and isinstance(text, str):
+        # The windows of the prefilter do not overlap, so each visitor can add to the summary
+        def visitor(window: str, offset: int) -> CitationVisitor:
+            return CitationSummaryVisitor(window, offset, summary)
+
+        for _ in _iter_text(text, visitor, prefilter, grammar=grammar, engine=engine):
+            pass
+    else:
+        # Overlapping windows may find the same citation twice, so count the deduplicated stream
+        counter = CitationSummaryVisitor(summary=summary)
+        for citation in _iter(text, CitationVisitor, prefilter, window_size, grammar=grammar, engine=engine):
+            counter.add_citation(citation)
+
+    return list(summary.values())
+
+
+def iter_citations_from_pdf(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+        pdffile: str | IO[Any] | pathlib.Path,
+        prefilter: bool = True,
+        window_size: int = WINDOW_SIZE,
+        workers: int = 1,
+        types: Optional[str | Iterable[str]] = None,
+        engine: str = "earley") -> Iterator[Citation]:
+    """Iterate over any supported citations in a given PDF file, page by page.
+
+    The text of each page is parsed as soon as it has been extracted, together with the end of
+    the previous page, so that citations which continue on the next page are also found. Each
+    citation gets the number of the page on which it starts. If workers is larger than 1, the
+    text of the pages is extracted by a pool of processes. If types is given, only citations of
+    these types are parsed, and engine is the parser that is used, see parse_citations.
+    """
 
+    grammar = _grammar(types)
+    _check_engine(engine)
 
-def parse_citations_from_pdf(pdffile: str | IO[Any] | pathlib.Path) -> list[Citation]:
+    page_starts: list[int] = []
+
+    def pages() -> Iterator[str]:
+        offset = 0
+        for page_text in iter_pdf_pages(pdffile, workers):
+            page_starts.append(offset)
+            offset += len(page_text)
+            yield page_text
+
+    windows = iter_chunk_windows(pages(), window_size)
+
+    for citation in _iter_windowed(windows, CitationVisitor, prefilter, grammar=grammar, engine=engine):
+        yield citation.replace(page=bisect.bisect_right(page_starts, citation.start))  # type: ignore[type-var]
+
+
+def parse_citations_from_pdf(
+        pdffile: str | IO[Any] | pathlib.Path,
+        workers: int = 1,
+        types: Optional[str | Iterable[str]] = None,
+        engine: str = "earley") -> list[Citation]:
     """Parse any supported citations in a given PDF file.
 
     Reading the PDF file is done via pypdf. The pdffile may be any file object or a path
-    to the pdf file.
+    to the pdf file. If workers is larger than 1, the text of the pages is extracted by a pool
+    of processes. If types is given, only citations of these types are parsed, and engine is the
+    parser that is used, see parse_citations.
     """
 
-    reader = PdfReader(pdffile)
+    return list(iter_citations_from_pdf(pdffile, workers=workers, types=types, engine=engine))
+
 
-    pdf_text: str = ""
+def parse_citations_from_pdf_url(url: str, timeout: float = DEFAULT_TIMEOUT) -> list[Citation]:
+    """Parse any supported citations in a PDF which is located at the given URL.
 
-    for page in reader.pages:
-        pdf_text += page.extract_text()
+    The download times out after timeout seconds. To parse many URLs, use
+    parse_citations_from_pdf_urls, which downloads them concurrently.
+    """
 
-    return parse_citations(pdf_text)
+    stats = current_stats()
+    start = time.perf_counter()
+    pdf_response = requests.get(url, timeout=timeout)
+    if stats is not None:
+        stats.record("download", time.perf_counter() - start, len(pdf_response.content))
 
+    return parse_citations_from_pdf(io.BytesIO(pdf_response.content))
 
-def parse_citations_from_pdf_url(url: str) -> list[Citation]:
-    """Parse any supported citations in a PDF which is located at the given URL."""
 
-    pdf_response = requests.get(url)
+def iter_kamerstukcitations(
+        text: str | mmap.mmap,
+        prefilter: bool = True,
+        window_size: Optional[int] = None,
+        paragraph_cache: Optional[ParagraphCache] = None,
+        engine: str = "earley") -> Iterator[KamerstukCitation]:
+    """Iterate over only the KamerstukCitations in a given text, as soon as they are found.
 
-    return parse_citations_from_pdf(io.BytesIO(pdf_response.content))
+    This uses a separate grammar with only the rules for Kamerstukken, which is loaded when it
+    is first used. The engine is the parser that is used, see parse_citations.
+    """
 
+    return _iter(  # type: ignore[return-value]
+        text, CitationVisitorOnlyKamerstukCitations, prefilter, window_size, paragraph_cache, _KAMERSTUK_CITATIONS,
+        engine
+    )
 
-def parse_kamerstukcitation(text: str) -> list[KamerstukCitation]:
-    """Parse only KamerstukCitations in a given text."""
 
-    parsetree = parser.parse(text)
-    v = CitationVisitorOnlyKamerstukCitations()
-    v.visit(parsetree)
+def parse_kamerstukcitation(
+        text: str | mmap.mmap,
+        prefilter: bool = True,
+        window_size: Optional[int] = None,
+        paragraph_cache: Optional[ParagraphCache] = None,
+        engine: str = "earley") -> list[KamerstukCitation]:
+    """Parse only KamerstukCitations in a given text."""
 
-    return v.citations
+    return list(iter_kamerstukcitations(text, prefilter, window_size, paragraph_cache, engine))
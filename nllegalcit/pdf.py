@@ -0,0 +1,96 @@
+"""
+    nllegalcit/pdf.py
+
+    Extraction of the text of PDF files, optionally using multiple processes.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+import io
+import multiprocessing
+import pathlib
+import time
+from typing import Any, IO, Iterator, Optional
+
+from pypdf import PdfReader, PageObject
+
+from .stats import current_stats
+
+# The PdfReader of a worker process, see _init_worker
+_worker_reader: Optional[PdfReader] = None  # pylint: disable=invalid-name
+
+
+def page_has_text(page: PageObject) -> bool:
+    """Check whether a page can contain any text, without extracting it.
+
+    Text can only be drawn using a font, so a page without fonts in its resources (for
+    example a scanned, image-only page) can not contain text. Form XObjects may have their own
+    fonts, so a page with these is assumed to contain text.
+    """
+
+    resources = page.get("/Resources")
+    if resources is None:
+        return False
+
+    resources = resources.get_object()
+    if "/Font" in resources:
+        return True
+
+    xobjects = resources.get("/XObject")
+    if xobjects is None:
+        return False
+
+    return any(xobject.get_object().get("/Subtype") == "/Form" for xobject in xobjects.get_object().values())
+
+
+def extract_page_text(page: PageObject) -> str:
+    """Extract the text of a page, skipping pages that can not contain any text."""
+
+    stats = current_stats()
+    start = time.perf_counter()
+
+    text = page.extract_text() if page_has_text(page) else ""
+
+    if stats is not None:
+        stats.record("pdf_extract", time.perf_counter() - start, len(text))
+
+    return text
+
+
+def _init_worker(source: str | pathlib.Path | bytes) -> None:
+    global _worker_reader  # pylint: disable=global-statement
+
+    _worker_reader = PdfReader(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+
+def _extract_page_number(number: int) -> str:
+    assert _worker_reader is not None
+    return extract_page_text(_worker_reader.pages[number])
+
+
+def iter_pdf_pages(pdffile: str | IO[Any] | pathlib.Path, workers: int = 1) -> Iterator[str]:
+    """Extract the text of a PDF file page by page, in order.
+
+    If workers is larger than 1, the pages are divided over a pool of processes, which each
+    open the PDF file themselves.
+    """
+
+    if workers == 1:
+        for page in PdfReader(pdffile).pages:
+            yield extract_page_text(page)
+        return
+
+    source: str | pathlib.Path | bytes
+    if isinstance(pdffile, (str, pathlib.Path)):
+        source = pdffile
+    else:
+        source = pdffile.read()
+
+    number_of_pages = len(PdfReader(io.BytesIO(source) if isinstance(source, bytes) else source).pages)
+
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(source,)) as pool:
+        yield from pool.imap(_extract_page_number, range(number_of_pages))
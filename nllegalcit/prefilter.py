@@ -0,0 +1,109 @@
+"""
+    nllegalcit/prefilter.py
+
+    Cheap regular expression prefilter to find the parts of a text that may contain a citation.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+import re
+from typing import Iterable
+
+# The triggers below are written as necessary conditions of the rules in the grammars: every
+# citation that the Earley parser can recognize contains at least one trigger match. This is
+# what allows us to only parse the text around these matches, while still getting the same
+# results as parsing the complete text. Optional parts of a citation (such as the KSLABEL or
+# the ONDERNUMMARAANDUIDING of a kamerstuk) can not be used as a trigger for that reason.
+
+# Same as the unicode.WS terminal imported in the grammars
+_WS = r"[ \t\xa0\f\r\n]"
+
+# Every ECLI contains a court, followed by an ECLI_SEPARATOR and an ECLI_YEAR (caselaw.lark).
+_TRIGGER_ECLI = rf"[a-zA-Z0-9]{_WS}*[:;]{_WS}*(?:19|20)[0-9]{{2}}"
+
+# Complete LJN_LABEL_RE and LJN_CONTENT, since only the label itself would match many Dutch
+# words (e.g. "duidelijk").
+_TRIGGER_LJN = rf"(?i:LJN?|ELRO)(?:{_WS}+|-)?(?i:N(?:UMME)?R)?(?:{_WS}|[:.=])+[a-zA-Z]{{2}}{_WS}*[0-9]{{4}}"
+
+# Every kamerstuk contains the end of a kamer (II, TK, T.K., Tweede Kamer, etc.), optionally
+# followed by a vergaderjaar, followed by a dossiernummer (kamerstukken.lark).
+_TRIGGER_KAMERSTUK = (
+    r"(?:[I12]|Kamer|K\.?|VV|Vergadering)"
+    rf"(?:[,\s]+(?:(?i:(?:vergader.?jaar|zitting)[a-z]*){_WS}+)?"
+    r"(?:(?:18|19|20)[0-9]{2}|'?[0-9]{2})(?:/-\s*|/|-)(?:(?:18|19|20)[0-9]{2}|'?[0-9]{2}))?"
+    r"(?:[,\s]+|-)[0-9]{2}[-.\s]?[0-9]{2,3}"
+)
+
+# The triggers of each type of citation in grammar.CITATION_TYPES
+_TRIGGERS = {
+    "ecli": _TRIGGER_ECLI,
+    "ljn": _TRIGGER_LJN,
+    "kamerstuk": _TRIGGER_KAMERSTUK,
+}
+
+
+def compile_triggers(types: Iterable[str]) -> re.Pattern:
+    """Compile the triggers of the given types of citations into one pattern."""
+
+    types = set(types)
+    return re.compile("|".join(trigger for citation_type, trigger in _TRIGGERS.items() if citation_type in types))
+
+
+re_trigger: re.Pattern = compile_triggers(_TRIGGERS)
+
+# Triggers of only the citations to Kamerstukken, for citations_kamerstukken.lark
+re_trigger_kamerstuk: re.Pattern = compile_triggers(["kamerstuk"])
+
+#: Number of characters around a trigger that is parsed. This must be larger than the longest
+#: citation that can be recognized.
+WINDOW_MARGIN: int = 200
+
+# Maximum number of characters to look for whitespace when extending a window
+_MAX_SNAP: int = 100
+
+
+def _snap_start(text: str, pos: int) -> int:
+    """Move pos back to the start of the word it is in"""
+    limit = max(0, pos - _MAX_SNAP)
+    while pos > limit and not text[pos - 1].isspace():
+        pos -= 1
+
+    return pos
+
+
+def _snap_end(text: str, pos: int) -> int:
+    """Move pos forward to the end of the word it is in"""
+    limit = min(len(text), pos + _MAX_SNAP)
+    while pos < limit and not text[pos].isspace():
+        pos += 1
+
+    return pos
+
+
+def candidate_windows(
+        text: str,
+        margin: int = WINDOW_MARGIN,
+        trigger: re.Pattern = re_trigger) -> list[tuple[int, int]]:
+    """Find the (start, end) windows of text which may contain a citation.
+
+    Every window contains at least one match of trigger and margin characters of context around
+    it, extended to word boundaries. Overlapping windows are merged, and the windows are
+    returned in the order in which they appear in the text.
+    """
+
+    windows: list[tuple[int, int]] = []
+
+    for match in trigger.finditer(text):
+        start = _snap_start(text, max(0, match.start() - margin))
+        end = _snap_end(text, min(len(text), match.end() + margin))
+
+        if windows and start <= windows[-1][1]:
+            windows[-1] = (windows[-1][0], max(end, windows[-1][1]))
+        else:
+            windows.append((start, end))
+
+    return windows
@@ -0,0 +1,287 @@
+"""
+    nllegalcit/regexparser.py
+
+    A parser which finds the citations of a citation grammar with regular expressions instead of
+    with the Earley parser, and builds the same parse trees of the citations.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+import collections
+import itertools
+import re
+from typing import Any, Iterator
+
+from lark import Lark, Token, Tree
+from lark.grammar import Rule, Terminal
+
+# The matches of a symbol at a position: its parse tree (or token) by the position at which it ends
+_Matches = dict[int, Any]
+
+# A citation which ends at some position: its start, the rank of its rule, and its parse tree
+_Item = tuple[int, int, Any]
+
+
+class RegexParser():  # pylint: disable=too-few-public-methods, too-many-instance-attributes
+    """Parse texts with the rules and terminals of a Lark citation grammar, using regular expressions.
+
+    The start rule of the grammar must be of the form ``?start: (kamerstuk | case_law | _text)+``,
+    in which every item except filler is a citation, and filler (the text between citations)
+    matches a single terminal. The positions at which a citation may start are found with a
+    master regular expression, which has a named group for each citation rule, and matches the
+    first prefix_length terminals of every way in which it can be matched. From these positions,
+    the citation rules are matched terminal by terminal, with the terminals of the grammar.
+
+    Like the dynamic lexer of the Earley parser, every terminal is matched greedily, and never
+    backtracks into a shorter match. The citation rules are therefore not compiled into a single
+    regular expression: without atomic groups, it would backtrack exponentially on runs of
+    whitespace, and with lookahead groups to emulate them, it is as slow as the Earley parser.
+
+    The text is split into citations and filler in the same way as by the Earley parser with
+    ambiguity="resolve". Going backwards from the end of the text, the item before the current
+    position is one that spans the rest of the text, if there is one, and otherwise the first
+    item of the start rule that ends there, starting as late as possible.
+    """
+
+    def __init__(self, lark_parser: Lark, filler: str = "_text", prefix_length: int = 4):
+        self.rules: dict[str, list[Rule]] = collections.defaultdict(list)
+        for rule in lark_parser.rules:
+            if rule.alias is not None or rule.options.keep_all_tokens or rule.options.empty_indices:
+                raise ValueError(f"Rule {rule} is not supported by the regex parser")
+
+            self.rules[rule.origin.name].append(rule)
+
+        self.terminals: dict[str, re.Pattern] = {
+            t.name: re.compile(t.pattern.to_regexp(), lark_parser.options.g_regex_flags) for t in lark_parser.terminals
+        }
+
+        start_rules = self.rules[lark_parser.options.start[0]]
+        if len(start_rules) != 1 or len(start_rules[0].expansion) != 1:
+            raise ValueError("The start rule is not of the form ?start: (item | ...)+")
+
+        # The items of the start rule, by their rank in the start rule
+        self.ranks = {rule.expansion[0].name: rank for rank, rule in enumerate(
+            r for r in self.rules[start_rules[0].expansion[0].name] if len(r.expansion) == 1
+        )}
+        if filler not in self.ranks:
+            raise ValueError(f"The start rule does not contain {filler}")
+
+        self.filler = filler
+        self.master = self._master(prefix_length)
+
+        # The filler terminals are all tried at each position, each in an optional lookahead group
+        self.filler_groups: list[int] = []
+        parts = []
+        group = 1
+        for terminal in self._single_terminals(filler):
+            parts.append(f"(?=({self.terminals[terminal].pattern}))?")
+            self.filler_groups.append(group)
+            group += 1 + self.terminals[terminal].groups
+        self.filler_regex = re.compile("".join(parts))
+
+        # The expansions of every rule as a prefix tree, so that shared prefixes are matched once.
+        # An edge is (symbol, whether the token is left out of the tree), and None leads to the
+        # order of the rule that ends there.
+        self.tries: dict[str, dict] = collections.defaultdict(dict)
+        for name, rules in self.rules.items():
+            for rule in rules:
+                node = self.tries[name]
+                for symbol in rule.expansion:
+                    node = node.setdefault((symbol.name, isinstance(symbol, Terminal) and symbol.filter_out), {})
+                node.setdefault(None, rule.order)
+
+    def _single_terminals(self, symbol: str) -> list[str]:
+        """Get the terminals that symbol can match, if it always matches a single terminal."""
+
+        if symbol in self.terminals:
+            return [symbol]
+
+        terminals = []
+        for rule in self.rules[symbol]:
+            if len(rule.expansion) != 1:
+                raise ValueError(f"{symbol} does not match a single terminal")
+            terminals += self._single_terminals(rule.expansion[0].name)
+
+        return terminals
+
+    def _prefixes(
+            self, symbol: str, length: int, memo: dict[tuple[str, int], frozenset[tuple[str, ...]]]
+    ) -> frozenset[tuple[str, ...]]:
+        """Get the first length terminals of every way in which symbol can be matched."""
+
+        if symbol in self.terminals:
+            return frozenset({(symbol,)})
+
+        key = (symbol, length)
+        if key not in memo:
+            prefixes: set[tuple[str, ...]] = set()
+            for rule in self.rules[symbol]:
+                current: set[tuple[str, ...]] = {()}
+                for child in rule.expansion:
+                    extended = {prefix for prefix in current if len(prefix) >= length}
+                    for prefix in current - extended:
+                        rests = self._prefixes(child.name, length - len(prefix), memo)
+                        extended.update(prefix + rest for rest in rests)
+                    current = extended
+                prefixes |= current
+            memo[key] = frozenset(prefixes)
+
+        return memo[key]
+
+    def _master(self, prefix_length: int) -> re.Pattern:
+        """Compile the master regular expression, which finds the positions at which citations may start."""
+
+        memo: dict[tuple[str, int], frozenset[tuple[str, ...]]] = {}
+        groups = itertools.count()
+        alternatives = []
+        for item in self.ranks:
+            if item == self.filler:
+                continue
+
+            trie: dict = {}
+            for prefix in self._prefixes(item, prefix_length, memo):
+                node = trie
+                for terminal in prefix:
+                    node = node.setdefault(terminal, {})
+                node[None] = {}
+            alternatives.append(f"(?P<{item}>{self._regex(trie, groups)})")
+
+        return re.compile(f"(?=(?:{'|'.join(alternatives)}))")
+
+    def _regex(self, trie: dict, groups: Iterator[int]) -> str:
+        """Get a regular expression which matches the sequences of terminals in a prefix tree.
+
+        Every terminal is matched greedily, and does not backtrack into a shorter match, as in the
+        Earley parser: it is matched in a lookahead group, and then consumed with a backreference
+        to the group. The groups are named after numbers taken from groups.
+        """
+
+        alternatives = []
+        for terminal, node in trie.items():
+            if terminal is None:
+                alternatives.append("")
+            else:
+                group = f"_{next(groups)}"
+                alternatives.append(f"(?=(?P<{group}>{self.terminals[terminal].pattern}))(?P={group})" +
+                                    self._regex(node, groups))
+
+        return f"(?:{'|'.join(alternatives)})"
+
+    def _match(self, symbol: str, text: str, pos: int, memo: dict[tuple[str, int], _Matches]) -> _Matches:
+        """Match symbol at pos in every possible way, and get the tree of each end position.
+
+        Of the trees with the same end, the one of the rule which is first in the grammar is kept.
+        """
+
+        key = (symbol, pos)
+        matches = memo.get(key)
+        if matches is None:
+            terminal = self.terminals.get(symbol)
+            if terminal is None:
+                matches = self._match_rules(symbol, text, pos, memo)
+            else:
+                m = terminal.match(text, pos)
+                matches = {}
+                if m and m.end() > pos:
+                    matches[m.end()] = Token(symbol, m.group(), start_pos=pos, end_pos=m.end())
+            memo[key] = matches
+
+        return matches
+
+    def _match_rules(  # pylint: disable=too-many-locals
+            self, symbol: str, text: str, pos: int, memo: dict[tuple[str, int], _Matches]) -> _Matches:
+        """Match the rules of symbol at pos, following the prefix tree of their expansions."""
+
+        # The order of the rule and the children of the tree of each end position
+        best: dict[int, tuple[int, list]] = {}
+        stack: list[tuple[dict, dict[int, list]]] = [(self.tries[symbol], {pos: []})]
+        while stack:
+            node, current = stack.pop()
+            for edge, child in node.items():
+                if edge is None:
+                    for end, children in current.items():
+                        if end not in best or child < best[end][0]:
+                            best[end] = (child, children)
+                    continue
+
+                # edge is (symbol, whether the token is left out of the tree)
+                following: dict[int, list] = {}
+                for start, children in current.items():
+                    for end, tree in self._match(edge[0], text, start, memo).items():
+                        if end not in following:
+                            following[end] = children if edge[1] else children + [tree]
+
+                if following:
+                    stack.append((child, following))
+
+        return {end: Tree(symbol, children) for end, (_, children) in best.items()}
+
+    def _items(self, text: str) -> tuple[list[int], dict[int, list[_Item]]]:  # pylint: disable=too-many-locals
+        """Find the items which can follow each other from the start of text.
+
+        Returns the start of the last filler which ends at each position (-1 if there is none,
+        and 0 if a filler from the start of text ends there), and the citations that end at
+        each position.
+        """
+
+        memo: dict[tuple[str, int], _Matches] = {}
+        starts = {m.start() for m in self.master.finditer(text)}
+        reachable = bytearray(len(text) + 1)
+        reachable[0] = 1
+        filler_start = [-1] * (len(text) + 1)
+        citations: dict[int, list[_Item]] = {}
+
+        for m in self.filler_regex.finditer(text):
+            pos = m.start()
+            if pos >= len(text):
+                break
+            if not reachable[pos]:
+                continue
+
+            for group in self.filler_groups:
+                end = m.end(group)
+                if end > pos:
+                    reachable[end] = 1
+                    if filler_start[end] != 0:
+                        filler_start[end] = pos
+
+            if pos in starts:
+                for item, rank in self.ranks.items():
+                    if item != self.filler:
+                        for end, tree in self._match(item, text, pos, memo).items():
+                            reachable[end] = 1
+                            citations.setdefault(end, []).append((pos, rank, tree))
+
+        return filler_start, citations
+
+    def parse(self, text: str) -> Tree:
+        """Parse text, and get a tree with the parse trees of the citations in it as children."""
+
+        filler_start, citations = self._items(text)
+        filler_rank = self.ranks[self.filler]
+        found = []
+
+        end = len(text)
+        while end > 0:
+            candidates = list(citations.get(end, ()))
+            if filler_start[end] >= 0:
+                candidates.append((filler_start[end], filler_rank, None))
+            if not candidates:
+                raise ValueError(f"Cannot parse the text before position {end}")
+
+            initial = [c for c in candidates if c[0] == 0]
+            if initial:
+                start, _, tree = min(initial, key=lambda c: c[1])
+            else:
+                start, _, tree = min(candidates, key=lambda c: (c[1], -c[0]))
+
+            if tree is not None:
+                found.append(tree)
+            end = start
+
+        found.reverse()
+        return Tree("start", found)
@@ -0,0 +1,175 @@
+"""
+    nllegalcit/stats.py
+
+    Opt-in instrumentation of the stages of finding citations: downloading, extracting the text
+    of PDF files, parsing and visiting the parse trees.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+import array
+import collections
+import contextlib
+import math
+import threading
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+#: The instrumented stages, and the size that is recorded for each call
+STAGES: dict[str, str] = {
+    "download": "bytes downloaded",
+    "pdf_extract": "characters extracted from a page",
+    "parse": "characters parsed",
+    "visit": "nodes in the parse tree",
+}
+
+# The Stats that are collected in this process, see collect_stats
+_current: Optional["Stats"] = None  # pylint: disable=invalid-name
+
+
+class StageStats():
+    """The durations and sizes of the calls of one stage"""
+
+    #: The duration of every call, in seconds
+    durations: array.array
+
+    #: The size of the input of every call, see STAGES
+    sizes: array.array
+
+    def __init__(self):
+        self.durations = array.array("d")
+        self.sizes = array.array("q")
+
+    def __repr__(self) -> str:
+        return f"StageStats(calls={self.calls}, seconds={self.seconds:.6f}, size={self.size})"
+
+    @property
+    def calls(self) -> int:
+        """The number of calls"""
+
+        return len(self.durations)
+
+    @property
+    def seconds(self) -> float:
+        """The total duration of all calls, in seconds"""
+
+        return math.fsum(self.durations)
+
+    @property
+    def size(self) -> int:
+        """The total size of the input of all calls"""
+
+        return sum(self.sizes)
+
+    def percentile(self, p: float) -> float:
+        """Get the p-th percentile of the durations of the calls, in seconds."""
+
+        if not self.durations:
+            return 0.0
+
+        ordered: list[float] = sorted(self.durations)
+        return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+class Stats():
+    """Durations, sizes and counts of the stages of finding citations.
+
+    Collect them with collect_stats. If a callback is given, it is called as
+    callback(stage, seconds, size) for every recorded call.
+    """
+
+    #: The calls of each stage, by the name of the stage (see STAGES)
+    stages: dict[str, StageStats]
+
+    #: The number of nodes in all visited parse trees
+    nodes: int
+
+    #: The number of citations found, by the name of their class
+    citations: collections.Counter[str]
+
+    def __init__(self, callback: Optional[Callable[[str, float, int], Any]] = None):
+        self.callback = callback
+        self.stages = {stage: StageStats() for stage in STAGES}
+        self.nodes = 0
+        self.citations = collections.Counter()
+
+        # Downloads may be recorded from multiple threads
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        stages = ", ".join(f"{stage}={stats!r}" for stage, stats in self.stages.items() if stats.calls)
+        return f"Stats({stages}, nodes={self.nodes}, citations={dict(self.citations)!r})"
+
+    def record(self, stage: str, seconds: float, size: int = 0) -> None:
+        """Record a call of a stage which took seconds, for an input of size (see STAGES)."""
+
+        with self._lock:
+            stage_stats = self.stages[stage]
+            stage_stats.durations.append(seconds)
+            stage_stats.sizes.append(size)
+
+        if self.callback is not None:
+            self.callback(stage, seconds, size)
+
+    def count(self, nodes: int, citations: Iterable[Any]) -> None:
+        """Count the nodes of a visited parse tree, and the citations found in it."""
+
+        with self._lock:
+            self.nodes += nodes
+            self.citations.update(type(citation).__name__ for citation in citations)
+
+    def summary(self) -> dict[str, Any]:
+        """Get the totals of every stage and the counts, as a dictionary which can be saved as JSON."""
+
+        return {
+            "stages": {
+                stage: {
+                    "calls": stats.calls,
+                    "seconds": stats.seconds,
+                    "size": stats.size,
+                    "p50_seconds": stats.percentile(50),
+                    "p99_seconds": stats.percentile(99),
+                }
+                for stage, stats in self.stages.items()
+            },
+            "nodes": self.nodes,
+            "citations": dict(self.citations),
+        }
+
+
+def current_stats() -> Optional[Stats]:
+    """Get the Stats that are being collected, or None if no stats are collected."""
+
+    return _current
+
+
+@contextlib.contextmanager
+def collect_stats(stats: Optional[Stats] = None) -> Iterator[Stats]:
+    """Collect stats of all calls in this process within the with statement.
+
+    For example:
+    ::
+
+        with collect_stats() as stats:
+            parse_citations_from_pdf("article.pdf")
+        print(stats.stages["parse"].seconds)
+
+    Stages that run in other processes, such as in parse_citations_batch with more than one
+    worker, are not recorded. When no stats are collected, the instrumentation only costs a
+    check of a global variable per call.
+    """
+
+    global _current  # pylint: disable=global-statement
+
+    if stats is None:
+        stats = Stats()
+
+    previous = _current
+    _current = stats
+    try:
+        yield stats
+    finally:
+        _current = previous
@@ -25,18 +25,12 @@ def normalize_nl_ecli_court(court: str) -> str:
     return court
 
 
-def lark_tree_to_str(tree: Tree) -> str:
-    """Get the text that underlies a lark parse tree"""
+def lark_tree_span(tree: Tree) -> tuple[int, int]:
+    """Get the (start, end) position of the text that underlies a lark parse tree"""
 
-    text = ""
+    tokens: list[Token] = list(tree.scan_values(lambda v: isinstance(v, Token)))
 
-    for c in tree.children:
-        if isinstance(c, Token):
-            text += str(c)
-        elif isinstance(c, Tree):
-            text += lark_tree_to_str(c)
-
-    return text
+    return min(t.start_pos for t in tokens), max(t.end_pos for t in tokens)  # type: ignore
 
 
 def ecli_citation_from_correct_string(ecli: str) -> EcliCitation:
@@ -9,238 +9,290 @@
 """
 
 import re
-from typing import Optional
+from typing import Any, Callable, Optional
 
-from lark import Visitor, ParseTree, Token, Tree
+from lark import ParseTree, Token, Tree
+from lark.visitors import Interpreter
 
-from .citations import Citation, KamerstukCitation, CaseLawCitation, EcliCitation, LjnCitation
+from .citations import Citation, CitationSummary, KamerstukCitation, CaseLawCitation, EcliCitation, LjnCitation
 from .errors import CitationParseException
-from .utils import normalize_nl_ecli_court, lark_tree_to_str
+from .stats import current_stats
+from .utils import normalize_nl_ecli_court, lark_tree_span
 
 re_whitespace: re.Pattern = re.compile(r"\s+")
 re_dossiernummer_separator: re.Pattern = re.compile(r"[-.\s]+")
 re_replacement_toevoeging_separator: re.Pattern = re.compile(r"[.\s-]+")
 
 
-class CitationVisitor(Visitor):
-    """Generic visitor to create Citation objects for a ParseTree"""
+# The fields of an EcliCitation, by the type of the token in an ECLI rule
+_ECLI_TOKEN_FIELDS: dict[str, str] = {
+    "caselaw__ECLI_YEAR": "year",
+    "caselaw__OTHER_ECLI_COUNTRY_CODE": "country",
+    "caselaw__NL_ECLI_COURT": "court",
+    "caselaw__EU_ECLI_COURT": "court",
+    "caselaw__CE_ECLI_COURT": "court",
+    "caselaw__OTHER_ECLI_COURT": "court",
+    "caselaw__NL_ECLI_CASENUMBER": "casenumber",
+    "caselaw__EU_ECLI_CASENUMBER": "casenumber",
+    "caselaw__CE_ECLI_CASENUMBER": "casenumber",
+    "caselaw__OTHER_ECLI_CASENUMBER": "casenumber",
+}
+
+# The country of the ECLIs of a rule, if it is not taken from the ECLI itself
+_ECLI_COUNTRIES: dict[str, Optional[str]] = {
+    "caselaw__nl_ecli": "NL",
+    "caselaw__eu_ecli": "EU",
+    "caselaw__ce_ecli": "CE",
+    "caselaw__other_ecli": None,
+}
+
+_KAMERS: dict[str, KamerstukCitation.Kamer] = {
+    "kamerstukken__TK": KamerstukCitation.Kamer.TK,
+    "kamerstukken__EK": KamerstukCitation.Kamer.EK,
+    "kamerstukken__VV": KamerstukCitation.Kamer.VV,
+}
+
+
+def _span(tree: ParseTree) -> tuple[int, int]:
+    """Get the (start, end) position of the text that underlies a citation rule.
+
+    The children of a tree are in the order of the text, so only the first and the last token
+    are needed, instead of all tokens (see lark_tree_span).
+    """
+
+    first: Any = tree
+    while isinstance(first, Tree):
+        first = first.children[0] if first.children else None
+
+    last: Any = tree
+    while isinstance(last, Tree):
+        last = last.children[-1] if last.children else None
+
+    if not isinstance(first, Token) or not isinstance(last, Token):
+        return lark_tree_span(tree)
+
+    return first.start_pos, last.end_pos  # type: ignore[return-value]
+
+
+def _kamer(tree: ParseTree) -> KamerstukCitation.Kamer:
+    kamer_token = tree.children[0]
+    if isinstance(kamer_token, Token) and kamer_token.type in _KAMERS:
+        return _KAMERS[kamer_token.type]
+
+    raise CitationParseException("Invalid Kamer in KamerstukCitation")
+
+
+def _vergaderjaar(tree: ParseTree) -> str:
+    first_year = None
+    second_year = None
+
+    for c in tree.children:
+        if isinstance(c, Tree):
+            # The vergaderjaar in a vergaderjaar_met_pre
+            return _vergaderjaar(c)
+
+        if first_year is None and c.type == "kamerstukken__JAAR4":
+            first_year = str(c)
+        elif c.type == "kamerstukken__JAAR4":
+            second_year = str(c)
+        elif c.type == "kamerstukken__JAAR2":
+            if first_year == "1999":
+                second_year = "2000"
+            elif first_year == "1899":
+                second_year = "1900"
+            elif first_year is not None:
+                second_year = f"{first_year[0:2]}{str(c)}"
+            else:
+                raise CitationParseException("First year is none")
 
-    def __init__(self):
-        super().__init__()
+    return f"{first_year}-{second_year}"
 
-        self.citations: list[Citation] = []
 
-    def kamerstuk(self, tree: ParseTree):
-        """Create a KamerstukCitation from a kamerstuk ParseTree rule"""
-        v = KamerstukCitationVisitor()
-        v.visit(tree)
-        v.citation.matched_text = lark_tree_to_str(tree)
-        self.citations.append(v.citation)
+def _dossiernummer(tree: ParseTree) -> str:
+    dossiernummer = "?"
+    dossiernummer_toevoeging: Optional[str] = None
 
-    def case_law(self, tree: ParseTree):
-        """Create a CaseLawCitation from a case_law parse rule"""
-        v = CaseLawCitationVisitor()
-        v.visit(tree)
-        if v.citation is not None:
-            v.citation.matched_text = lark_tree_to_str(tree)
-            self.citations.append(v.citation)
+    for c in tree.children:
+        if isinstance(c, Token):
+            if c.type == "kamerstukken__DOSSIERNUMMER":
+                dossiernummer = re_dossiernummer_separator.sub("", c)
+            elif c.type == "kamerstukken__DOSSIERNUMMER_TOEVOEGING":
+                dossiernummer_toevoeging = re_replacement_toevoeging_separator.sub("", c).replace("hoofdstuk", "")
 
+    if dossiernummer_toevoeging is None:
+        return dossiernummer
 
-class CaseLawCitationVisitor(Visitor):
-    """Visitor class to create a CaseLawCitation from the parse tree"""
+    return f"{dossiernummer}-{dossiernummer_toevoeging}"
 
-    # pylint: disable=missing-function-docstring
 
-    citation: Optional[CaseLawCitation]
+def _ondernummer(tree: ParseTree) -> str:
+    return str(tree.children[0])
 
-    def __init__(self):
-        super().__init__()
 
-        self.citation = None
+def _paginaverwijzing(tree: ParseTree) -> str:
+    paginas_los: list[str] = []
+    pagina_ranges: list[str] = []
 
-    def caselaw__nl_ecli(self, tree: ParseTree):
-        cit = EcliCitation("NL", "?", -1, "?")
+    for c in tree.children:
+        if isinstance(c, Token):
+            if c.type == "kamerstukken__PAGINA_LOS":
+                paginas_los.append(str(c))
+        elif c.data == "kamerstukken__pagina_range":
+            start = None
+            end = None
+            for d in c.children:
+                if isinstance(d, Token):
+                    if d.type == "kamerstukken__PAGINA_START":
+                        start = str(d)
+                    elif d.type == "kamerstukken__PAGINA_EIND":
+                        end = str(d)
 
-        for child in tree.children:
-            if isinstance(child, Token):
-                if child.type == "caselaw__ECLI_YEAR":
-                    cit.year = int(child)
-                elif child.type == "caselaw__NL_ECLI_COURT":
-                    # TODO: Implement court name normalization
-                    cit.court = normalize_nl_ecli_court(str(child))
-                elif child.type == "caselaw__NL_ECLI_CASENUMBER":
-                    cit.casenumber = str(child)
-
-        self.citation = cit
-
-    def caselaw__eu_ecli(self, tree: ParseTree):
-        year: int
-        court: str
-        casenumber: str
+            pagina_ranges.append(f"{start}-" if end is None else f"{start}-{end}")
 
-        for child in tree.children:
-            if isinstance(child, Token):
-                if child.type == "caselaw__ECLI_YEAR":
-                    year = int(child)
-                elif child.type == "caselaw__EU_ECLI_COURT":
-                    court = str(child)
-                elif child.type == "caselaw__EU_ECLI_CASENUMBER":
-                    casenumber = str(child)
+    return ",".join(paginas_los + pagina_ranges)
 
-        self.citation = EcliCitation("EU", court, year, casenumber)
 
-    def caselaw__ce_ecli(self, tree: ParseTree):
-        year: int
-        court: str
-        casenumber: str
+# The field of a KamerstukCitation, and the function that creates it, by the rule in a kamerstuk
+_KAMERSTUK_FIELDS: dict[str, tuple[str, Callable[[ParseTree], Any]]] = {
+    "kamerstukken__kamer": ("kamer", _kamer),
+    "kamerstukken__vergaderjaar_met_pre": ("vergaderjaar", _vergaderjaar),
+    "kamerstukken__vergaderjaar": ("vergaderjaar", _vergaderjaar),
+    "kamerstukken__dossiernummer": ("dossiernummer", _dossiernummer),
+    "kamerstukken__ondernummer": ("ondernummer", _ondernummer),
+    "kamerstukken__paginaverwijzing": ("paginaverwijzing", _paginaverwijzing),
+}
 
-        for child in tree.children:
-            if isinstance(child, Token):
-                if child.type == "caselaw__ECLI_YEAR":
-                    year = int(child)
-                elif child.type == "caselaw__CE_ECLI_COURT":
-                    court = str(child)
-                elif child.type == "caselaw__CE_ECLI_CASENUMBER":
-                    casenumber = str(child)
-
-        self.citation = EcliCitation("CE", court, year, casenumber)
-
-    def caselaw__other_ecli(self, tree: ParseTree):
-        year: int
-        country: str
-        court: str
-        casenumber: str
 
-        for child in tree.children:
-            if isinstance(child, Token):
-                if child.type == "caselaw__ECLI_YEAR":
-                    year = int(child)
-                elif child.type == "caselaw__OTHER_ECLI_COUNTRY_CODE":
-                    country = str(child)
-                elif child.type == "caselaw__OTHER_ECLI_COURT":
-                    court = str(child)
-                elif child.type == "caselaw__OTHER_ECLI_CASENUMBER":
-                    casenumber = str(child)
+def kamerstuk_citation(tree: ParseTree, **position: Any) -> KamerstukCitation:
+    """Create a KamerstukCitation from a kamerstuk parse tree, at the given position in the text (see Citation)."""
+
+    fields: dict[str, Any] = {"vergaderjaar": "?", "dossiernummer": "?", "ondernummer": "?"}
+
+    for child in tree.children:
+        if isinstance(child, Tree):
+            field = _KAMERSTUK_FIELDS.get(child.data)
+            if field is not None:
+                fields[field[0]] = field[1](child)
 
-        self.citation = EcliCitation(country, court, year, casenumber)
+    return KamerstukCitation(**fields, **position)
 
-    def caselaw__ljn(self, tree: ParseTree):
-        code: str
 
+def case_law_citation(tree: ParseTree, **position: Any) -> Optional[CaseLawCitation]:
+    """Create a CaseLawCitation from a case_law parse tree, at the given position in the text (see Citation)."""
+
+    # case_law has one rule: case_law_ecli with one ECLI rule, or ljn
+    while tree.data in ("case_law", "caselaw__case_law", "caselaw__case_law_ecli"):
+        child = tree.children[0]
+        if not isinstance(child, Tree):
+            return None
+        tree = child
+
+    if tree.data == "caselaw__ljn":
         for child in tree.children:
-            if isinstance(child, Token):
-                if child.type == "caselaw__LJN_CONTENT":
-                    code = re_whitespace.sub("", str(child).upper())
+            if isinstance(child, Token) and child.type == "caselaw__LJN_CONTENT":
+                return LjnCitation(re_whitespace.sub("", str(child).upper()), **position)
+        return None
 
-        self.citation = LjnCitation(code)
+    if tree.data not in _ECLI_COUNTRIES:
+        return None
 
+    fields: dict[str, Any] = {"country": _ECLI_COUNTRIES[tree.data], "year": -1, "court": "?", "casenumber": "?"}
+    for child in tree.children:
+        if isinstance(child, Token):
+            field = _ECLI_TOKEN_FIELDS.get(child.type)
+            if field is not None:
+                fields[field] = str(child)
 
-class KamerstukCitationVisitor(Visitor):
-    """Visitor class to create a KamerstukCitation from the Lark parse tree"""
+    fields["year"] = int(fields["year"])
+    if tree.data == "caselaw__nl_ecli":
+        # TODO: Implement court name normalization
+        fields["court"] = normalize_nl_ecli_court(fields["court"])
 
-    # pylint: disable=missing-function-docstring
+    return EcliCitation(**fields, **position)
 
-    def __init__(self):
-        super().__init__()
 
-        self.citation = KamerstukCitation("?", "?", "?", "?")
-
-    def kamerstukken__kamer(self, tree: ParseTree):
-        kamer_token = tree.children[0]
-        if isinstance(kamer_token, Token):
-            if kamer_token.type == "kamerstukken__TK":
-                self.citation.kamer = "II"
-            elif kamer_token.type == "kamerstukken__EK":
-                self.citation.kamer = "I"
-            elif kamer_token.type == "kamerstukken__VV":
-                self.citation.kamer = "VV"
-            else:
-                raise CitationParseException("Invalid Kamer in KamerstukCitation")
-        else:
-            raise CitationParseException("Invalid Kamer in KamerstukCitation")
-
-    def kamerstukken__dossiernummer(self, tree: ParseTree):
-        dossiernummer = "?"
-        dossiernummer_toevoeging: Optional[str] = None
-        for c in tree.children:
-            if isinstance(c, Token):
-                if c.type == "kamerstukken__DOSSIERNUMMER":
-                    dossiernummer = re_dossiernummer_separator.sub("", c)
-                elif c.type == "kamerstukken__DOSSIERNUMMER_TOEVOEGING":
-                    dossiernummer_toevoeging = re_replacement_toevoeging_separator.sub("", c).replace("hoofdstuk", "")
-
-        if dossiernummer_toevoeging is None:
-            self.citation.dossiernummer = str(dossiernummer)
-        else:
-            self.citation.dossiernummer = f"{dossiernummer}-{dossiernummer_toevoeging}"
-
-    def kamerstukken__vergaderjaar(self, tree: ParseTree):
-        first_year = None
-        second_year = None
-
-        for c in tree.children:
-            if isinstance(c, Token):
-                if first_year is None and c.type == "kamerstukken__JAAR4":
-                    first_year = str(c)
-                elif c.type == "kamerstukken__JAAR4":
-                    second_year = str(c)
-                elif c.type == "kamerstukken__JAAR2":
-                    if first_year == "1999":
-                        second_year = "2000"
-                    elif first_year == "1899":
-                        second_year = "1900"
-                    else:
-                        if first_year is not None:
-                            second_year = f"{first_year[0:2]}{str(c)}"
-                        else:
-                            raise CitationParseException("First year is none")
-
-        self.citation.vergaderjaar = f"{first_year}-{second_year}"
-
-    def kamerstukken__ondernummer(self, tree: ParseTree):
-        self.citation.ondernummer = str(tree.children[0])
-
-    def kamerstukken__paginaverwijzing(self, tree: ParseTree):
-        paginas_los: list[str] = []
-        for c in tree.children:
-            if isinstance(c, Token):
-                if c.type == "kamerstukken__PAGINA_LOS":
-                    paginas_los.append(str(c))
-
-        pagina_ranges: list[str] = []
-        for c in tree.children:
-            if isinstance(c, Tree):
-                if c.data == "kamerstukken__pagina_range":
-                    start = None
-                    end = None
-                    for d in c.children:
-                        if isinstance(d, Token):
-                            if d.type == "kamerstukken__PAGINA_START":
-                                start = str(d)
-                            elif d.type == "kamerstukken__PAGINA_EIND":
-                                end = str(d)
-                    if end is None:
-                        pagina_ranges.append(f"{start}-")
-                    else:
-                        pagina_ranges.append(f"{start}-{end}")
-        paginas = paginas_los + pagina_ranges
-        if len(paginas) == 1:
-            self.citation.paginaverwijzing = paginas[0]
-        else:
-            self.citation.paginaverwijzing = ','.join(paginas)
+# The rules in the root of a parse tree which contain a citation
+_CITATION_RULES: frozenset[str] = frozenset({"kamerstuk", "case_law"})
 
 
-class CitationVisitorOnlyKamerstukCitations(Visitor):
-    """Generic visitor to create Citation objects for a ParseTree"""
+class CitationVisitor(Interpreter):
+    """Generic visitor to create Citation objects for a ParseTree
+
+    The parse tree is walked from the root, and each citation is created from its own subtree in
+    a single pass. The text in between citations is left out of the parse tree by the grammar.
+    """
+
+    def __init__(self, source: str = "", offset: int = 0):
+        """Create a visitor for the parse tree of source, which starts at position offset in the text."""
 
-    def __init__(self):
         super().__init__()
 
-        self.citations: list[KamerstukCitation] = []
+        self.citations: list[Citation] = []
+
+        # Note that these names should not be the same as any rule in the grammar
+        self.source = source
+        self.offset = offset
+
+    def _position(self, tree: ParseTree) -> dict[str, Any]:
+        """Get the position in the text of the citation in tree, as arguments for a Citation"""
+        start, end = _span(tree)
+        return {
+            "start": start + self.offset,
+            "end": end + self.offset,
+            "source": self.source,
+            "source_offset": self.offset
+        }
+
+    def add_citation(self, citation: Citation) -> None:
+        """Add a citation that was found in the parse tree."""
+        self.citations.append(citation)
+
+    def __default__(self, tree: ParseTree):
+        """Visit the citations among the children of the root of a parse tree"""
+        for child in tree.children:
+            if isinstance(child, Tree) and child.data in _CITATION_RULES:
+                self._visit_tree(child)
 
     def kamerstuk(self, tree: ParseTree):
         """Create a KamerstukCitation from a kamerstuk ParseTree rule"""
-        v = KamerstukCitationVisitor()
-        v.visit(tree)
-        v.citation.matched_text = lark_tree_to_str(tree)
-        self.citations.append(v.citation)
+        self.add_citation(kamerstuk_citation(tree, **self._position(tree)))
+
+    def case_law(self, tree: ParseTree):
+        """Create a CaseLawCitation from a case_law parse rule"""
+        citation = case_law_citation(tree, **self._position(tree))
+        if citation is not None:
+            self.add_citation(citation)
+
+
+class CitationVisitorOnlyKamerstukCitations(CitationVisitor):
+    """Generic visitor to create Citation objects for a ParseTree"""
+
+    citations: list[KamerstukCitation]  # type: ignore[assignment]
+
+    def case_law(self, tree: ParseTree):
+        """Ignore case law citations"""
+
+
+class CitationSummaryVisitor(CitationVisitor):
+    """Visitor that counts the distinct citations in a ParseTree, instead of collecting all of them"""
+
+    def __init__(self, source: str = "", offset: int = 0, summary: Optional[dict[Citation, CitationSummary]] = None):
+        """Create a visitor that adds to summary, which may be shared by the visitors of several windows."""
+
+        super().__init__(source, offset)
+
+        self.summary = summary if summary is not None else {}
+
+        # The citations are not collected in self.citations, so they are counted in the stats here
+        self._stats = current_stats()
+
+    def add_citation(self, citation: Citation) -> None:
+        """Count a citation that was found in the parse tree."""
+        if self._stats is not None:
+            self._stats.count(0, (citation,))
+
+        summary = self.summary.get(citation)
+        if summary is None:
+            self.summary[citation] = CitationSummary(citation)
+        else:
+            summary.add(citation)
@@ -0,0 +1,148 @@
+"""
+    nllegalcit/windows.py
+
+    Split (very) long texts into overlapping windows, which can be parsed one by one.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+import mmap
+from typing import Iterable, Iterator
+
+from .prefilter import WINDOW_MARGIN
+
+#: Default size of a window, in characters (or bytes, for memory-mapped files).
+WINDOW_SIZE: int = 100_000
+
+#: Default overlap between two consecutive windows. A quarter of this must be larger than the
+#: longest citation that can be recognized.
+WINDOW_OVERLAP: int = 5 * WINDOW_MARGIN
+
+# Preferred places to split a text: paragraphs, then sentences, then lines, then words.
+_SEPARATORS: tuple[str, ...] = ("\n\n", ". ", "\n", " ")
+_BYTE_SEPARATORS: tuple[bytes, ...] = (b"\n\n", b". ", b"\n", b" ")
+
+
+def _decode(chunk: str | bytes) -> str:
+    if isinstance(chunk, str):
+        return chunk
+
+    # surrogateescape makes sure that invalid UTF-8 does not change the length of a window.
+    return chunk.decode("utf-8", errors="surrogateescape")
+
+
+def _length(text: str | mmap.mmap, start: int, end: int) -> int:
+    """Get the number of characters in text[start:end]"""
+
+    if isinstance(text, str):
+        return end - start
+
+    return len(_decode(text[start:end]))
+
+
+def _boundary(text: str | mmap.mmap, lo: int, hi: int) -> int:
+    """Get the position just after the last boundary in text[lo:hi], or hi if there is none"""
+
+    separators = _SEPARATORS if isinstance(text, str) else _BYTE_SEPARATORS
+
+    for separator in separators:
+        i = text.rfind(separator, lo, hi)  # type: ignore[arg-type]
+        if i != -1:
+            return i + len(separator)
+
+    if not isinstance(text, str):
+        # Do not split in the middle of a multi-byte UTF-8 character
+        while hi < len(text) and (text[hi] & 0xC0) == 0x80:
+            hi += 1
+
+    return hi
+
+
+def _split(text: str | mmap.mmap, start: int, end: int, overlap: int) -> tuple[int, int]:
+    """Get the start of the window after the window text[start:end], and the cut in between"""
+
+    next_start = _boundary(text, start + (end - start) // 2, end - overlap)
+    cut = _boundary(text, next_start + overlap // 4, (next_start + end) // 2)
+
+    return next_start, cut
+
+
+def iter_windows(
+        text: str | mmap.mmap,
+        window_size: int = WINDOW_SIZE,
+        overlap: int = WINDOW_OVERLAP) -> Iterator[tuple[str, int, int]]:
+    """Split text into overlapping windows at paragraph or sentence boundaries.
+
+    text may be a string, or a memory-mapped UTF-8 encoded text file, in which case only one
+    window at a time is decoded. For each window, this yields a tuple (window, offset, cut):
+
+    - window is the text of the window;
+    - offset is the position of the start of the window in the complete text, in characters;
+    - cut is the position in the window up to which a citation belongs to this window. A
+      citation that ends after cut belongs to the next window, which overlaps with this one.
+    """
+
+    if window_size <= 2 * overlap:
+        raise ValueError("window_size must be larger than twice the overlap")
+
+    length = len(text)
+    start = 0
+    offset = 0
+
+    while True:
+        if start + window_size >= length:
+            window = _decode(text[start:])
+            yield window, offset, len(window)
+            return
+
+        end = _boundary(text, start + window_size // 2 + overlap, start + window_size)
+        next_start, cut = _split(text, start, end, overlap)
+
+        yield _decode(text[start:end]), offset, _length(text, start, cut)
+
+        offset += _length(text, start, next_start)
+        start = next_start
+
+
+def iter_chunk_windows(
+        chunks: Iterable[str],
+        window_size: int = WINDOW_SIZE,
+        overlap: int = WINDOW_OVERLAP) -> Iterator[tuple[str, int, int]]:
+    """Split a stream of text chunks, such as the pages of a document, into overlapping windows.
+
+    This yields the same (window, offset, cut) tuples as iter_windows, for the concatenation
+    of all chunks. A window is yielded as soon as enough text has been received after each
+    chunk, so that the complete text never needs to be in memory.
+    """
+
+    if window_size <= 2 * overlap:
+        raise ValueError("window_size must be larger than twice the overlap")
+
+    buffer = ""
+    offset = 0
+
+    for chunk in chunks:
+        buffer += chunk
+
+        while len(buffer) > 2 * overlap:
+            if len(buffer) > window_size:
+                end = _boundary(buffer, window_size // 2 + overlap, window_size)
+            else:
+                end = len(buffer)
+
+            next_start, cut = _split(buffer, 0, end, overlap)
+
+            yield buffer[:end], offset, cut
+
+            offset += next_start
+            buffer = buffer[next_start:]
+
+            if end == next_start + len(buffer):
+                # Everything up to the end of this chunk has been yielded
+                break
+
+    yield buffer, offset, len(buffer)
@@ -0,0 +1,57 @@
+"""
+    tests/pdf.py
+
+    Helper to create simple PDF files for the test cases.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: list[str]) -> bytes:
+    """Create a PDF with one page per string in pages, using a standard Helvetica font.
+
+    Every line of a page string becomes one line of text on the page. An empty string
+    creates a page without any text.
+    """
+
+    objects: list[str] = []
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+
+    objects.append("<< /Type /Catalog /Pages 2 0 R >>")
+    objects.append(f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(pages)} >>")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+    for page_id, text in zip(page_ids, pages):
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>"
+        )
+
+        stream = "BT /F1 10 Tf 12 TL 40 800 Td\n"
+        for line in text.splitlines():
+            stream += f"({_escape(line)}) Tj T*\n"
+        stream += "ET"
+
+        objects.append(f"<< /Length {len(stream.encode('cp1252'))} >>\nstream\n{stream}\nendstream")
+
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += f"{i} 0 obj\n{obj}\nendobj\n".encode("cp1252")
+
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("cp1252")
+    for offset in offsets:
+        pdf += f"{offset:010d} 00000 n \n".encode("cp1252")
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("cp1252")
+
+    return pdf
@@ -0,0 +1,72 @@
+"""
+    tests/test_batch.py
+
+    Test cases for parsing many documents at once using multiple processes.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+# pylint: disable=line-too-long, missing-function-docstring
+
+import importlib
+import pathlib
+import tempfile
+import unittest
+
+from nllegalcit import EcliCitation, KamerstukCitation, LjnCitation, parse_citations, parse_citations_batch, parse_citations_from_pdf_batch
+
+from .pdf import make_pdf
+
+TEXTS = [
+    "Kamerstukken II 2022/23, 36 229, nr. 1",
+    "Geen verwijzingen in deze tekst.",
+    "ECLI:NL:HR:2006:AV0653 en LJN: AB4535",
+    "Kamerstukken I 2021/22, 35 925, nr. E",
+]
+
+EXPECTED = [
+    [KamerstukCitation("II", "2022-2023", "36229", "1")],
+    [],
+    [EcliCitation("NL", "HR", 2006, "AV0653"), LjnCitation("AB4535")],
+    [KamerstukCitation("I", "2021-2022", "35925", "E")],
+]
+
+
+class BatchTests(unittest.TestCase):
+    """Test cases for parsing many documents at once"""
+
+    def test_in_process(self):
+        results = parse_citations_batch(TEXTS, workers=1, prefilter=False)
+        self.assertEqual([r.citations for r in results], EXPECTED)
+
+        # The options of the batch are not left behind in the current process (the package removes
+        # the name of the batch module, so it is imported by name)
+        batch = importlib.import_module("nllegalcit.batch")
+        self.assertEqual((batch._worker_function, batch._worker_kwargs), (parse_citations, {}))  # pylint: disable=protected-access
+
+    def test_workers_keep_order(self):
+        results = parse_citations_batch(TEXTS * 3, workers=2, chunksize=2, max_tasks_per_child=1)
+        self.assertEqual([r.citations for r in results], EXPECTED * 3)
+
+        for r in results:
+            self.assertGreaterEqual(r.seconds, 0)
+
+    def test_keyword_arguments(self):
+        results = parse_citations_batch(TEXTS, workers=2, prefilter=False)
+        self.assertEqual([r.citations for r in results], EXPECTED)
+
+    def test_pdf_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for i, text in enumerate(TEXTS):
+                path = pathlib.Path(tmp) / f"{i}.pdf"
+                path.write_bytes(make_pdf([text]))
+                paths.append(path)
+
+            results = parse_citations_from_pdf_batch(paths, workers=2)
+
+        self.assertEqual([r.citations for r in results], EXPECTED)
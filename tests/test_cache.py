@@ -0,0 +1,114 @@
+"""
+    tests/test_cache.py
+
+    Test cases for the persistent cache of parse results.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+# pylint: disable=line-too-long, missing-function-docstring
+
+import io
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+from nllegalcit import CitationCache, EcliCitation, KamerstukCitation, LjnCitation, parse_citations
+from nllegalcit.cache import code_version
+
+from .pdf import make_pdf
+
+TEXT = "Zie ECLI:NL:HR:2006:AV0653, LJN AB4535 en Kamerstukken II 2005/06, 30 316, nr. 3, p. 7."
+
+
+class CacheTests(unittest.TestCase):
+    """Test cases for the persistent cache of parse results"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.path = pathlib.Path(self.tmp.name) / "cache.sqlite3"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_text(self):
+        with CitationCache(self.path) as cache:
+            first = cache.parse_citations(TEXT)
+            second = cache.parse_citations(TEXT)
+
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+            self.assertEqual(first, parse_citations(TEXT))
+            self.assertEqual(second, first)
+            self.assertEqual([c.matched_text for c in second], [c.matched_text for c in first])
+            self.assertIs(second[2].kamer, KamerstukCitation.Kamer.TK)  # type: ignore[attr-defined]
+
+        # The results are kept when the cache is opened again
+        with CitationCache(self.path) as cache:
+            self.assertEqual(cache.parse_citations(TEXT), first)
+            self.assertEqual(cache.parse_citations(TEXT + " "), first)
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+            self.assertEqual(len(cache), 2)
+
+    def test_arguments_are_part_of_the_key(self):
+        with CitationCache(self.path) as cache:
+            for types in ({"ecli"}, None, {"kamerstuk"}, ["ljn", "ecli"], ("ecli", "ljn")):
+                with self.subTest(types=types):
+                    self.assertEqual(cache.parse_citations(TEXT, types=types), parse_citations(TEXT, types=types))
+
+            # The order of the types does not matter
+            self.assertEqual((cache.hits, cache.misses), (1, 4))
+
+            self.assertEqual(cache.parse_citations(TEXT, engine="regex"), parse_citations(TEXT))
+            self.assertEqual(cache.parse_citations(TEXT, prefilter=False), parse_citations(TEXT))
+            self.assertEqual((cache.hits, cache.misses), (2, 5))
+
+    def test_code_version(self):
+        version = code_version()
+        read_bytes = pathlib.Path.read_bytes
+
+        def changed(name):
+            return lambda path: read_bytes(path) + (b"# changed" if path.name == name else b"")
+
+        # Every module changes the version, not only those which create the citations
+        for name in ("parser.py", "regexparser.py", "prefilter.py", "windows.py", "pdf.py", "visitors.py"):
+            with self.subTest(name=name), mock.patch.object(pathlib.Path, "read_bytes", autospec=True, side_effect=changed(name)):
+                self.assertNotEqual(code_version(), version)
+
+    def test_pdf(self):
+        pdf = make_pdf(["Eerste pagina.", "Zie ECLI:NL:HR:2006:AV0653."])
+        with CitationCache(self.path) as cache:
+            self.assertEqual(cache.parse_citations_from_pdf(io.BytesIO(pdf)), [EcliCitation("NL", "HR", 2006, "AV0653")])
+
+            pdf_path = pathlib.Path(self.tmp.name) / "test.pdf"
+            pdf_path.write_bytes(pdf)
+            citations = cache.parse_citations_from_pdf(pdf_path)
+            self.assertEqual(citations, [EcliCitation("NL", "HR", 2006, "AV0653")])
+            self.assertEqual(citations[0].page, 2)
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_version_change(self):
+        with CitationCache(self.path) as cache:
+            cache.parse_citations(TEXT)
+
+        with mock.patch("nllegalcit.cache.code_version", return_value="changed"):
+            with CitationCache(self.path) as cache:
+                self.assertEqual(len(cache), 0)
+                cache.parse_citations(TEXT)
+                self.assertEqual(cache.misses, 1)
+
+    def test_eviction(self):
+        with CitationCache(self.path, max_size=1000) as cache:
+            for i in range(20):
+                cache.parse_citations(f"Zie LJN AB{i:04d}.")
+
+            self.assertLessEqual(cache.size(), 1000)
+            self.assertLess(len(cache), 20)
+
+            # The most recent result is kept
+            self.assertEqual(cache.parse_citations("Zie LJN AB0019."), [LjnCitation("AB0019")])
+            self.assertEqual(cache.hits, 1)
@@ -0,0 +1,84 @@
+"""
+    tests/test_citations.py
+
+    Test cases for the Citation classes themselves.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+# pylint: disable=line-too-long, missing-function-docstring
+
+import pickle
+import unittest
+
+from nllegalcit import EcliCitation, KamerstukCitation, LjnCitation, parse_citations
+
+
+class CitationTests(unittest.TestCase):
+    """Test cases for the Citation classes themselves"""
+
+    def test_immutable(self):
+        citation = EcliCitation("NL", "HR", 2006, "AV0653")
+        with self.assertRaises(AttributeError):
+            citation.year = 2007  # type: ignore[misc]
+        with self.assertRaises(AttributeError):
+            citation.other = 1  # type: ignore[attr-defined]
+        self.assertFalse(hasattr(citation, "__dict__"))
+
+    def test_hashable(self):
+        citations = parse_citations("ECLI:NL:HR:2006:AV0653, LJN AV0653 en ECLI:NL:HR:2006:AV0653; Kamerstukken II 2005/06, 30 316, nr. 3.")
+        self.assertEqual(
+            set(citations),
+            {EcliCitation("NL", "HR", 2006, "AV0653"), LjnCitation("AV0653"), KamerstukCitation("II", "2005-2006", "30316", "3")}
+        )
+        self.assertEqual(len({KamerstukCitation("II", "2005-2006", "30316", "3"), KamerstukCitation("II", "2005-2006", "30316", "3", "7")}), 2)
+
+    def test_ordering(self):
+        citations = [
+            LjnCitation("AB4535"),
+            KamerstukCitation("II", "2005-2006", "30316", "3", paginaverwijzing="7"),
+            EcliCitation("NL", "HR", 2006, "AV0653"),
+            KamerstukCitation("II", "2005-2006", "30316", "3"),
+            KamerstukCitation("I", "2021-2022", "35925", "E"),
+            EcliCitation("NL", "HR", 2001, "AB4535"),
+        ]
+        self.assertEqual(sorted(citations), [
+            EcliCitation("NL", "HR", 2001, "AB4535"),
+            EcliCitation("NL", "HR", 2006, "AV0653"),
+            KamerstukCitation("I", "2021-2022", "35925", "E"),
+            KamerstukCitation("II", "2005-2006", "30316", "3"),
+            KamerstukCitation("II", "2005-2006", "30316", "3", paginaverwijzing="7"),
+            LjnCitation("AB4535"),
+        ])
+
+    def test_kamer(self):
+        citation = KamerstukCitation("II", "2005-2006", "30316", "3")
+        self.assertIs(citation.kamer, KamerstukCitation.Kamer.TK)
+        self.assertEqual(citation, KamerstukCitation(KamerstukCitation.Kamer.TK, "2005-2006", "30316", "3"))
+        self.assertEqual(repr(citation), "Kamerstukken II 2005-2006, 30316, nr. 3")
+        self.assertEqual(parse_citations("Kamerstukken I 2021/22, 35 925, nr. E")[0].kamer, KamerstukCitation.Kamer.EK)  # type: ignore[attr-defined]
+
+        with self.assertRaises(ValueError):
+            KamerstukCitation("III", "2005-2006", "30316", "3")
+
+    def test_replace_and_pickle(self):
+        citation = parse_citations("Zie ECLI:NL:HR:2006:AV0653.")[0]
+        paged = citation.replace(page=3)
+        self.assertEqual((paged.page, paged.start, paged.matched_text), (3, 12, "HR:2006:AV0653"))
+        self.assertIsNone(citation.page)
+
+        copy = pickle.loads(pickle.dumps(paged))
+        self.assertEqual(copy, paged)
+        self.assertEqual((copy.page, copy.start, copy.end, copy.matched_text), (3, 12, 26, "HR:2006:AV0653"))
+
+    def test_source_is_not_kept(self):
+        text = "Zie ECLI:NL:HR:2006:AV0653. " + "Verder niets. " * 1000
+        citation = parse_citations(text)[0]
+
+        self.assertEqual(citation.matched_text, "HR:2006:AV0653")
+        self.assertEqual(citation.shift(5).matched_text, "HR:2006:AV0653")
+        self.assertLess(len(pickle.dumps(citation)), 300)
@@ -0,0 +1,148 @@
+"""
+    tests/test_cli.py
+
+    Test cases for the nllegalcit command.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+# pylint: disable=line-too-long, missing-function-docstring
+
+import contextlib
+import csv
+import io
+import json
+import pathlib
+import tempfile
+import unittest
+
+from nllegalcit.cli import main
+
+DOCUMENTS = {
+    "a.txt": "Zie ECLI:NL:HR:2006:AV0653 en Kamerstukken II 2005/06, 30 316, nr. 3.",
+    "b.txt": "Vgl. LJN AB4535.",
+    "sub/c.TXT": "Kamerstukken I 1979/80, 15 516, nr. 42e, blz. 7",
+    "sub/d.doc": "ECLI:NL:HR:2006:AV0653",
+}
+
+
+class CommandLineTests(unittest.TestCase):
+    """Test cases for the nllegalcit command"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.root = pathlib.Path(self.directory.name)
+        self.corpus = self.root / "corpus"
+
+        for name, text in DOCUMENTS.items():
+            (self.corpus / name).parent.mkdir(parents=True, exist_ok=True)
+            (self.corpus / name).write_text(text, encoding="utf-8")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_main(self, *args):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            status = main([*args, "--workers", "1"])
+
+        return status, stderr.getvalue()
+
+    def read_jsonl(self, name="out.jsonl"):
+        with open(self.root / name, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_jsonl(self):
+        status, _ = self.run_main(str(self.corpus), "-o", str(self.root / "out.jsonl"))
+        self.assertEqual(status, 0)
+
+        records = self.read_jsonl()
+        self.assertEqual([(pathlib.Path(r["doc_id"]).name, r["type"]) for r in records], [
+            ("a.txt", "ecli"), ("a.txt", "kamerstuk"), ("b.txt", "ljn"), ("c.TXT", "kamerstuk")
+        ])
+        self.assertEqual(records[0], {
+            "doc_id": str(self.corpus / "a.txt"), "type": "ecli", "country": "NL", "court": "HR",
+            "casenumber": "AV0653", "year": 2006, "start": 12, "end": 26
+        })
+
+    def test_csv(self):
+        paths = self.root / "paths.txt"
+        paths.write_text(f"{self.corpus / 'b.txt'}\n{self.corpus / 'sub' / 'c.TXT'}\n", encoding="utf-8")
+
+        status, _ = self.run_main("--files-from", str(paths), "-o", str(self.root / "out.csv"))
+        self.assertEqual(status, 0)
+
+        with open(self.root / "out.csv", encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+
+        self.assertEqual([(r["type"], r["ljn"], r["dossiernummer"], r["paginaverwijzing"]) for r in rows], [
+            ("ljn", "AB4535", "", ""), ("kamerstuk", "", "15516", "7")
+        ])
+
+    def test_unchanged_files_are_skipped(self):
+        output = str(self.root / "out.jsonl")
+        self.run_main(str(self.corpus), "-o", output)
+        status, stderr = self.run_main(str(self.corpus), "-o", output)
+
+        self.assertEqual(status, 0)
+        self.assertIn("0 citations in 0 files, 3 unchanged files skipped", stderr)
+        self.assertEqual(len(self.read_jsonl()), 4)
+
+        (self.corpus / "b.txt").write_text("Vgl. LJN AB4536.", encoding="utf-8")
+        self.run_main(str(self.corpus), "-o", output)
+
+        self.assertEqual([r["ljn"] for r in self.read_jsonl() if r["type"] == "ljn"], ["AB4536"])
+        self.assertEqual(len(self.read_jsonl()), 4)
+
+        status, stderr = self.run_main(str(self.corpus), "-o", output)
+        self.assertIn("0 citations in 0 files, 3 unchanged files skipped", stderr)
+        self.assertEqual(len(self.read_jsonl()), 4)
+
+    def test_changed_files_are_replaced_in_csv(self):
+        output = str(self.root / "out.csv")
+        self.run_main(str(self.corpus), "-o", output)
+        (self.corpus / "a.txt").write_text("Zie ECLI:NL:HR:2007:AV0654.", encoding="utf-8")
+        self.run_main(str(self.corpus), "-o", output)
+
+        with open(output, encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+
+        self.assertEqual([(pathlib.Path(r["doc_id"]).name, r["type"]) for r in rows], [
+            ("b.txt", "ljn"), ("c.TXT", "kamerstuk"), ("a.txt", "ecli")
+        ])
+
+        (self.corpus / "b.txt").write_text("Vgl. LJN AB4536.", encoding="utf-8")
+        self.run_main(str(self.corpus), "-o", output)
+
+        with open(output, encoding="utf-8", newline="") as f:
+            self.assertEqual([r["ljn"] for r in csv.DictReader(f) if r["type"] == "ljn"], ["AB4536"])
+
+    def test_resume(self):
+        output = self.root / "out.jsonl"
+        manifest = self.root / "out.jsonl.manifest"
+        self.run_main(str(self.corpus), "-o", str(output))
+        expected = self.read_jsonl()
+
+        # Interrupt the run after the first file, while writing the second file
+        with open(manifest, "rb") as f:
+            first = f.readline()
+        manifest.write_bytes(first + b'["corpus/b.txt", "0')
+        with open(output, "ab") as f:
+            f.write(b'{"doc_id": "incomplete')
+
+        status, stderr = self.run_main(str(self.corpus), "-o", str(output))
+
+        self.assertEqual(status, 0)
+        self.assertIn("2 citations in 2 files, 1 unchanged files skipped", stderr)
+        self.assertEqual(self.read_jsonl(), expected)
+
+    def test_failed_file(self):
+        status, stderr = self.run_main(str(self.root / "missing.txt"), "-o", str(self.root / "out.jsonl"))
+
+        self.assertEqual(status, 1)
+        self.assertIn("missing.txt: FileNotFoundError", stderr)
+        self.assertEqual(self.read_jsonl(), [])
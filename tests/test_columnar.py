@@ -0,0 +1,68 @@
+"""
+    tests/test_columnar.py
+
+    Test cases for collecting citations in columns and writing them to Parquet files.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+# pylint: disable=line-too-long, missing-function-docstring
+
+import pathlib
+import tempfile
+import unittest
+
+from nllegalcit import CitationColumns, EcliCitation, ParquetCitationWriter, parse_citations
+
+try:
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None  # type: ignore[assignment]  # pylint: disable=invalid-name
+
+TEXT = "Zie ECLI:NL:HR:2006:AV0653, LJN AB4535 en Kamerstukken II 2005/06, 30 316, nr. 3, p. 7."
+
+
+@unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+class ColumnarTests(unittest.TestCase):
+    """Test cases for collecting citations in columns and writing them to Parquet files"""
+
+    def test_columns(self):
+        columns = CitationColumns()
+        columns.extend("a", parse_citations(TEXT))
+        columns.append("b", EcliCitation("EU", "C", 2019, "123"))
+        self.assertEqual(len(columns), 4)
+
+        table = columns.to_arrow().to_pydict()
+        self.assertEqual(table["doc_id"], ["a", "a", "a", "b"])
+        self.assertEqual(table["type"], ["ecli", "ljn", "kamerstuk", "ecli"])
+        self.assertEqual(table["court"], ["HR", None, None, "C"])
+        self.assertEqual(table["year"], [2006, None, None, 2019])
+        self.assertEqual(table["ljn"], [None, "AB4535", None, None])
+        self.assertEqual(table["kamer"], [None, None, "II", None])
+        self.assertEqual(table["paginaverwijzing"], [None, None, "7", None])
+        self.assertEqual(table["start"], [12, 28, 55, None])
+        self.assertEqual(table["end"], [26, 38, 86, None])
+        self.assertEqual(table["page"], [None] * 4)
+
+        columns.clear()
+        self.assertEqual(len(columns), 0)
+        self.assertEqual(columns.to_arrow().num_rows, 0)
+
+    def test_parquet(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / "citations.parquet"
+            with ParquetCitationWriter(path, batch_size=5) as writer:
+                for i in range(4):
+                    writer.write(f"doc{i}", parse_citations(TEXT))
+
+            parquet_file = pyarrow.parquet.ParquetFile(path)
+            self.assertEqual(parquet_file.metadata.num_row_groups, 2)
+
+            table = parquet_file.read()
+            self.assertEqual(table.num_rows, 12)
+            self.assertEqual(table.column("doc_id").to_pylist()[-3:], ["doc3"] * 3)
+            self.assertEqual(table.column("dossiernummer").to_pylist()[:3], [None, None, "30316"])
@@ -0,0 +1,130 @@
+"""
+    tests/test_document.py
+
+    Test cases for documents which are edited, of which only the changed paragraphs are parsed.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+# pylint: disable=line-too-long, missing-function-docstring
+
+import random
+import unittest
+
+from nllegalcit import Document, ParagraphCache, parse_citations
+from nllegalcit.document import _Lengths
+
+PROSE = "Het hof is van oordeel dat artikel 6 EVRM niet is geschonden, zoals blijkt uit de verklaringen van getuigen. "
+
+TEXT = (
+    "  " + PROSE + "\n\n" +
+    "Zie ECLI:NL:HR:2006:AV0653 en Kamerstukken II 2005/06, 30 316, nr. 3." + "\n  \n" +
+    PROSE * 3 + "LJN AB4535.\n\n" +
+    "Kamerstukken II 2005/06,\n\n30 316, nr. 3.\n"
+)
+
+
+def positions(citations):
+    return [(c, c.start, c.end, c.matched_text) for c in citations]
+
+
+def expected(text, **kwargs):
+    # With a paragraph cache, the text is parsed paragraph by paragraph, as a Document is
+    return positions(parse_citations(text, paragraph_cache=ParagraphCache(), **kwargs))
+
+
+class DocumentTests(unittest.TestCase):
+    """Test cases for documents which are edited"""
+
+    def test_citations(self):
+        document = Document(TEXT)
+        self.assertEqual(document.text, TEXT)
+        self.assertEqual(len(document), len(TEXT))
+        self.assertEqual(positions(document.citations), expected(TEXT))
+        self.assertEqual(len(document.citations), 3)
+
+    def test_edit_citation(self):
+        document = Document(TEXT)
+        before = list(document.citations)
+        start = TEXT.index("0653")
+        removed, added = document.edit(start, start + 4, "1234")
+
+        # All citations of the changed paragraph are removed and added again
+        self.assertEqual(positions(removed), positions(before[:2]))
+        self.assertEqual(positions(added), positions(document.citations[:2]))
+        self.assertEqual([repr(c) for c in added], ["ECLI:NL:HR:2006:AV1234", "Kamerstukken II 2005-2006, 30316, nr. 3"])
+        self.assertEqual(positions(document.citations), expected(document.text))
+
+    def test_citations_view(self):
+        document = Document(TEXT)
+        citations = document.citations
+        text = TEXT.replace("ECLI:NL:HR:2006:AV0653", "LJN AB4535") + "\n\nZie ook ECLI:NL:HR:2007:AV0654."
+
+        document.edit(0, len(TEXT), text)
+        self.assertEqual(positions(citations), expected(text))
+        self.assertEqual(positions([citations[i] for i in range(-len(citations), len(citations))]), expected(text) * 2)
+        self.assertEqual(positions(citations[1:]), expected(text)[1:])
+        self.assertEqual(citations, list(citations))
+
+        with self.assertRaises(IndexError):
+            citations[len(citations)]  # pylint: disable=expression-not-assigned
+
+    def test_join_and_split_paragraphs(self):
+        document = Document(TEXT)
+        blank = TEXT.index("2005/06,\n\n") + len("2005/06,")
+
+        removed, added = document.edit(blank, blank + 2, " ")
+        self.assertEqual((removed, [repr(c) for c in added]), ([], ["Kamerstukken II 2005-2006, 30316, nr. 3"]))
+        self.assertEqual(positions(document.citations), expected(document.text))
+
+        removed, added = document.edit(blank, blank + 1, "\n\n")
+        self.assertEqual((len(removed), added), (1, []))
+        self.assertEqual(document.text, TEXT)
+        self.assertEqual(positions(document.citations), expected(TEXT))
+
+    def test_insert_and_delete_everything(self):
+        document = Document()
+        self.assertEqual((document.text, document.citations), ("", []))
+
+        document.edit(0, 0, TEXT)
+        self.assertEqual(positions(document.citations), expected(TEXT))
+
+        document.edit(0, len(TEXT), "")
+        self.assertEqual((document.text, document.citations), ("", []))
+
+    def test_random_edits(self):
+        rng = random.Random(0)
+        text = TEXT * 3
+        document = Document(text, engine="regex")
+
+        for _ in range(200):
+            start = rng.randrange(len(text) + 1)
+            end = min(len(text), start + rng.choice([0, 1, 2, 10]))
+            replacement = rng.choice(["", "\n\n", "\n", " ", "7", "nr.", "ECLI:NL:HR:", "Kamerstukken II "])
+
+            document.edit(start, end, replacement)
+            text = text[:start] + replacement + text[end:]
+
+            self.assertEqual(document.text, text)
+            self.assertEqual(positions(document.citations), expected(text, engine="regex"))
+
+    def test_invalid_edit(self):
+        document = Document(TEXT)
+
+        for start, end in ((-1, 0), (5, 4), (0, len(TEXT) + 1)):
+            with self.subTest(start=start, end=end):
+                with self.assertRaises(ValueError):
+                    document.edit(start, end, "")
+
+    def test_lengths(self):
+        lengths = _Lengths([3, 1, 4, 1, 5])
+        self.assertEqual([lengths.start(i) for i in range(6)], [0, 3, 4, 8, 9, 14])
+        self.assertEqual([lengths.find(pos) for pos in range(15)], [0, 0, 0, 1, 2, 2, 2, 2, 3, 4, 4, 4, 4, 4, 4])
+
+        lengths.add(1, 2)
+        self.assertEqual([lengths.start(i) for i in range(6)], [0, 3, 6, 10, 11, 16])
+        self.assertEqual(_Lengths([0]).find(0), 0)
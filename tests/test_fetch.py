@@ -0,0 +1,155 @@
+"""
+    tests/test_fetch.py
+
+    Test cases for concurrently downloading and parsing PDF files, using a local HTTP server.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+# pylint: disable=line-too-long, missing-function-docstring
+
+import asyncio
+import concurrent.futures
+import http.server
+import threading
+import time
+import unittest
+
+import requests
+
+from nllegalcit import EcliCitation, KamerstukCitation, parse_citations_from_pdf_url, parse_citations_from_pdf_urls
+
+from .pdf import make_pdf
+
+DOCUMENTS = {
+    "/0.pdf": (make_pdf(["Kamerstukken II 2022/23, 36 229, nr. 1"]), [KamerstukCitation("II", "2022-2023", "36229", "1")]),
+    "/1.pdf": (make_pdf(["Geen verwijzingen."]), []),
+    "/2.pdf": (make_pdf(["ECLI:NL:HR:2006:AV0653"]), [EcliCitation("NL", "HR", 2006, "AV0653")]),
+}
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """Serves the DOCUMENTS, and keeps track of the number of concurrent requests"""
+
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        if self.path == "/slow.pdf":
+            time.sleep(2)
+
+        if self.path not in DOCUMENTS:
+            self.send_error(404)
+            return
+
+        with self.lock:
+            _Handler.active += 1
+            _Handler.max_active = max(_Handler.max_active, _Handler.active)
+
+        time.sleep(0.05)
+
+        # Count the request as finished before the client can receive the response
+        with self.lock:
+            _Handler.active -= 1
+
+        content = DOCUMENTS[self.path][0]
+        self.send_response(200)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class _Server(http.server.ThreadingHTTPServer):
+    """HTTP server that ignores clients that disconnect, such as after a timeout"""
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+class FetchTests(unittest.TestCase):
+    """Test cases for concurrently downloading and parsing PDF files"""
+
+    server: _Server
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = _Server(("127.0.0.1", 0), _Handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}{path}"
+
+    def test_single_url(self):
+        self.assertEqual(parse_citations_from_pdf_url(self.url("/0.pdf")), DOCUMENTS["/0.pdf"][1])
+
+    def test_many_urls_in_order(self):
+        paths = list(DOCUMENTS) * 4
+        with concurrent.futures.ThreadPoolExecutor(2) as executor:
+            results = asyncio.run(parse_citations_from_pdf_urls([self.url(p) for p in paths], executor=executor))
+
+        self.assertEqual(results, [DOCUMENTS[p][1] for p in paths])
+
+    def test_process_pool(self):
+        results = asyncio.run(parse_citations_from_pdf_urls([self.url(p) for p in DOCUMENTS]))
+        self.assertEqual(results, [d[1] for d in DOCUMENTS.values()])
+
+    def test_per_host_limit(self):
+        _Handler.max_active = 0
+        with concurrent.futures.ThreadPoolExecutor(2) as executor:
+            asyncio.run(parse_citations_from_pdf_urls(
+                [self.url(p) for p in list(DOCUMENTS) * 4],
+                max_connections=8,
+                max_connections_per_host=2,
+                executor=executor
+            ))
+
+        self.assertEqual(_Handler.max_active, 2)
+
+    def test_errors(self):
+        with concurrent.futures.ThreadPoolExecutor(2) as executor:
+            results = asyncio.run(parse_citations_from_pdf_urls(
+                [self.url("/0.pdf"), self.url("/missing.pdf"), self.url("/slow.pdf")],
+                timeout=0.5,
+                executor=executor,
+                return_exceptions=True
+            ))
+
+            self.assertEqual(results[0], DOCUMENTS["/0.pdf"][1])
+            self.assertIsInstance(results[1], requests.HTTPError)
+            self.assertIsInstance(results[2], requests.Timeout)
+
+            with self.assertRaises(requests.HTTPError):
+                asyncio.run(parse_citations_from_pdf_urls([self.url("/missing.pdf")], executor=executor))
+
+    def test_error_cancels_other_urls(self):
+        async def fetch():
+            with self.assertRaises(requests.HTTPError):
+                await parse_citations_from_pdf_urls(
+                    [self.url("/slow.pdf")] * 3 + [self.url("/missing.pdf")], timeout=5, executor=executor
+                )
+
+            return asyncio.all_tasks()
+
+        with concurrent.futures.ThreadPoolExecutor(2) as executor:
+            start = time.perf_counter()
+            tasks = asyncio.run(fetch())
+            elapsed = time.perf_counter() - start
+
+        # Only the task of fetch itself is left, and the downloads that had started (which take
+        # 2 seconds) were finished before the session was closed
+        self.assertEqual(len(tasks), 1)
+        self.assertGreaterEqual(elapsed, 2)
@@ -0,0 +1,138 @@
+"""
+    tests/test_grammar.py
+
+    Test cases for the on-disk cache of compiled grammars.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+# pylint: disable=line-too-long, missing-function-docstring
+
+import os
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+from nllegalcit import parse_citations, EcliCitation, KamerstukCitation, LjnCitation
+from nllegalcit.grammar import load_parser, cache_dir, subset_grammar
+from nllegalcit.parser import parser
+
+TEXT = "Kamerstukken II 2022/23, 36 229, nr. 1 en ECLI:NL:HR:2006:AV0653."
+
+TYPES_TEXT = "Zie Kamerstukken II 2022/23, 36 229, nr. 1, HR 6 juni 2006, ECLI:NL:HR:2006:AV0653 en LJN: AB4535."
+
+
+class GrammarCacheTests(unittest.TestCase):
+    """Test cases for the on-disk cache of compiled grammars"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.env = mock.patch.dict(os.environ, {"NLLEGALCIT_CACHE_DIR": self.tmp.name})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.tmp.cleanup()
+
+    def cache_files(self) -> list[pathlib.Path]:
+        return list(pathlib.Path(self.tmp.name).glob("grammar-*.pickle"))
+
+    def test_cache_is_written_and_used(self):
+        compiled = load_parser("citations.lark", parser="earley")
+        self.assertEqual(len(self.cache_files()), 1)
+
+        cached = load_parser("citations.lark", parser="earley")
+        self.assertIsNot(cached, compiled)
+        self.assertEqual(cached.parse(TEXT), compiled.parse(TEXT))
+
+    def test_options_are_part_of_the_key(self):
+        load_parser("citations.lark", parser="earley")
+        load_parser("citations.lark", parser="earley", ambiguity="explicit")
+        self.assertEqual(len(self.cache_files()), 2)
+
+    def test_corrupt_cache_is_ignored(self):
+        compiled = load_parser("citations.lark", parser="earley")
+        self.cache_files()[0].write_bytes(b"not a pickle")
+
+        with self.assertLogs("nllegalcit.grammar", level="WARNING"):
+            parser = load_parser("citations.lark", parser="earley")
+
+        self.assertEqual(parser.parse(TEXT), compiled.parse(TEXT))
+
+    def test_cache_disabled(self):
+        with mock.patch.dict(os.environ, {"NLLEGALCIT_CACHE_DIR": ""}):
+            self.assertIsNone(cache_dir())
+            load_parser("citations.lark", parser="earley")
+
+        self.assertEqual(self.cache_files(), [])
+
+    def test_subset_grammar_is_cached(self):
+        source = subset_grammar(["ljn"])
+        compiled = load_parser("citations[ljn]", source, parser="earley")
+        self.assertEqual(len(self.cache_files()), 1)
+
+        cached = load_parser("citations[ljn]", source, parser="earley")
+        self.assertEqual(cached.parse(TYPES_TEXT), compiled.parse(TYPES_TEXT))
+
+        load_parser("citations[ecli]", subset_grammar(["ecli"]), parser="earley")
+        self.assertEqual(len(self.cache_files()), 2)
+
+
+class SubsetGrammarTests(unittest.TestCase):
+    """Test cases for parsing only some types of citations"""
+
+    def test_same_as_all_types(self):
+        classes = {"ecli": EcliCitation, "ljn": LjnCitation, "kamerstuk": KamerstukCitation}
+        all_types = parse_citations(TYPES_TEXT)
+        self.assertEqual(len(all_types), 3)
+
+        for types in (["ecli"], ["ljn"], ["kamerstuk"], ["ecli", "ljn"], ["ljn", "kamerstuk"], ["ecli", "ljn", "kamerstuk"]):
+            with self.subTest(types=types):
+                expected = [c for c in all_types if isinstance(c, tuple(classes[t] for t in types))]
+                self.assertEqual(parse_citations(TYPES_TEXT, types=types), expected)
+                self.assertEqual(parse_citations(TYPES_TEXT, prefilter=False, types=types), expected)
+
+    def test_single_type(self):
+        self.assertEqual(parse_citations(TYPES_TEXT, types="ljn"), parse_citations(TYPES_TEXT, types={"ljn"}))
+
+    def test_unknown_type(self):
+        with self.assertRaises(ValueError):
+            parse_citations(TYPES_TEXT, types={"ecli", "bwb"})
+
+        with self.assertRaises(ValueError):
+            parse_citations(TYPES_TEXT, types=[])
+
+
+class ParseTreeTests(unittest.TestCase):
+    """Test cases for the parse trees of the citation grammars, which only contain the citations"""
+
+    def test_text_is_left_out(self):
+        parsers = {
+            "citations.lark": parser,
+            "citations_kamerstukken.lark": load_parser("citations_kamerstukken.lark", parser="earley"),
+            "citations[ecli,ljn]": load_parser("citations[ecli,ljn]", subset_grammar(["ecli", "ljn"]), parser="earley"),
+        }
+        expected = {
+            "citations.lark": ["kamerstuk", "case_law", "case_law"],
+            "citations_kamerstukken.lark": ["kamerstuk"],
+            "citations[ecli,ljn]": ["case_law", "case_law"],
+        }
+
+        for name, grammar_parser in parsers.items():
+            with self.subTest(grammar=name):
+                tree = grammar_parser.parse(TYPES_TEXT)
+                if len(expected[name]) == 1:
+                    # ?start is inlined if it only contains a single citation
+                    self.assertEqual(tree.data, expected[name][0])
+                else:
+                    self.assertEqual([child.data for child in tree.children], expected[name])
+
+    def test_text_is_not_ambiguous(self):
+        explicit = load_parser("citations.lark", parser="earley", ambiguity="explicit")
+        tree = explicit.parse("Zie 42e  en 30.316,\xa0p.\t7–8 ‘a’ (2006)!")
+        self.assertEqual(list(tree.find_data("_ambig")), [])
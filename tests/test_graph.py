@@ -0,0 +1,111 @@
+"""
+    tests/test_graph.py
+
+    Test cases for the citation graph.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+# pylint: disable=line-too-long, missing-function-docstring
+
+import tempfile
+import unittest
+from unittest import mock
+
+from nllegalcit import CitationGraph, CitationGraphBuilder, EcliCitation, parse_citations
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # type: ignore[assignment]  # pylint: disable=invalid-name
+
+DOCUMENTS = {
+    "a": "Zie ECLI:NL:HR:2006:AV0653, ECLI:NL:HR:2006:AV0653 en Kamerstukken II 2005/06, 30 316, nr. 3, p. 7.",
+    "b": "Vgl. Kamerstukken II 2005/06, 30 316, nr. 3, p. 9 en LJN AB4535.",
+    "c": "Geen verwijzingen.",
+    "d": "Zie ECLI:NL:HR:2006:AV0653.",
+}
+
+ECLI = "ECLI:NL:HR:2006:AV0653"
+KAMERSTUK = "Kamerstukken II 2005-2006, 30316, nr. 3"
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class GraphTests(unittest.TestCase):
+    """Test cases for the citation graph"""
+
+    def setUp(self):
+        builder = CitationGraphBuilder()
+        for name, text in DOCUMENTS.items():
+            builder.add(name, parse_citations(text))
+
+        self.graph = builder.build()
+
+    def test_csr(self):
+        self.assertEqual(self.graph.documents, ["a", "b", "c", "d"])
+        self.assertEqual(self.graph.targets, [ECLI, KAMERSTUK, "LJN AB4535"])
+        self.assertEqual(self.graph.indptr.tolist(), [0, 2, 4, 4, 5])
+        self.assertEqual(self.graph.indices.tolist(), [0, 1, 1, 2, 0])
+        self.assertEqual(self.graph.weights.tolist(), [2, 1, 1, 1, 1])
+
+    def test_degrees(self):
+        self.assertEqual(self.graph.out_degree().tolist(), [2, 2, 0, 1])
+        self.assertEqual(self.graph.in_degree().tolist(), [2, 2, 1])  # pylint: disable=no-member
+        self.assertEqual(self.graph.top_cited(2), [(ECLI, 2), (KAMERSTUK, 2)])
+        self.assertEqual(self.graph.top_cited(10), [(ECLI, 2), (KAMERSTUK, 2), ("LJN AB4535", 1)])
+
+    def test_neighbourhood(self):
+        self.assertEqual(self.graph.cited_by_document("b"), [KAMERSTUK, "LJN AB4535"])
+        self.assertEqual(self.graph.cited_by_document("c"), [])
+        self.assertEqual(self.graph.citing_documents(EcliCitation("NL", "HR", 2006, "AV0653")), ["a", "d"])
+        self.assertEqual(self.graph.citing_documents(KAMERSTUK), ["a", "b"])
+        self.assertEqual(self.graph.neighbours("a"), ["b", "d"])
+        self.assertEqual(self.graph.neighbours("c"), [])
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.graph.save(tmp)
+            graph = CitationGraph.load(tmp)
+
+            self.assertIsInstance(graph.indices, numpy.memmap)
+            self.assertEqual(graph.documents, self.graph.documents)
+            self.assertEqual(graph.targets, self.graph.targets)
+            self.assertEqual(graph.weights.tolist(), self.graph.weights.tolist())
+            self.assertEqual(graph.citing_documents(KAMERSTUK), ["a", "b"])
+            del graph
+
+    def test_duplicate_document(self):
+        builder = CitationGraphBuilder()
+        builder.add("a", [])
+        with self.assertRaises(ValueError):
+            builder.add("a", [])
+
+    def test_line_break_in_citation(self):
+        builder = CitationGraphBuilder()
+        builder.add("a", parse_citations("Zie ECLI:NL:HR:2006:AV\n0653 en Kamerstukken II 2005/06,\n30 316, nr. 3."))
+        builder.add("b", parse_citations("Zie ECLI:NL:HR:2006:AV0653."))
+
+        graph = builder.build()
+        self.assertEqual(graph.targets, [ECLI, KAMERSTUK])
+        self.assertEqual(graph.citing_documents(ECLI), ["a", "b"])
+
+    def test_failed_add_changes_nothing(self):
+        builder = CitationGraphBuilder()
+        builder.add("a", parse_citations("Zie LJN AB4535."))
+        with mock.patch("nllegalcit.graph.citation_target", side_effect=["LJN AB4536", "invalid\ntarget"]):
+            with self.assertRaises(ValueError):
+                builder.add("b", parse_citations("Zie LJN AB4536 en LJN AB4537."))
+
+        with self.assertRaises(ValueError):
+            builder.add("c\nd", [])
+
+        builder.add("b", parse_citations("Zie LJN AB4537."))
+        graph = builder.build()
+        self.assertEqual(graph.documents, ["a", "b"])
+        self.assertEqual(graph.targets, ["LJN AB4535", "LJN AB4537"])
+        self.assertEqual(graph.indptr.tolist(), [0, 1, 2])
+        self.assertEqual(graph.cited_by_document("b"), ["LJN AB4537"])
@@ -0,0 +1,84 @@
+"""
+    tests/test_ljn.py
+
+    Test cases for resolving LJN citations to ECLI citations with a local index.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+# pylint: disable=line-too-long, missing-function-docstring
+
+import pathlib
+import tempfile
+import unittest
+
+from nllegalcit import EcliCitation, LjnCitation, LjnIndex, build_ljn_index, parse_citations
+
+MAPPING = [
+    ("AU9722", "ECLI:NL:HR:2006:AU9722"),
+    ("AB4535", "ECLI:NL:RBAMS:2001:AB4535"),
+    ("ZZ0001", "ECLI:NL:CRVB:2010:ZZ0001"),
+    ("AA0000", "ECLI:NL:HR:1999:AA0000"),
+    ("AU9722", "ECLI:NL:PHR:2006:AU9722"),
+]
+
+
+class LjnIndexTests(unittest.TestCase):
+    """Test cases for resolving LJN citations to ECLI citations with a local index"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.path = pathlib.Path(self.tmp.name) / "ljn.idx"
+        self.assertEqual(build_ljn_index(MAPPING, self.path), 4)
+        self.index = LjnIndex(self.path)
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def test_resolve(self):
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual(self.index.resolve("AU9722"), EcliCitation("NL", "HR", 2006, "AU9722"))
+        self.assertEqual(self.index.resolve("ab 4535"), EcliCitation("NL", "RBAMS", 2001, "AB4535"))
+        self.assertEqual(self.index.lookup("ZZ0001"), "ECLI:NL:CRVB:2010:ZZ0001")
+        self.assertEqual(self.index.lookup("AA0000"), "ECLI:NL:HR:1999:AA0000")
+        self.assertIsNone(self.index.resolve("AU9723"))
+        self.assertIsNone(self.index.resolve("invalid"))
+
+    def test_resolve_citation(self):
+        ljn = parse_citations("Zie LJN: AU9722.")[0]
+        assert isinstance(ljn, LjnCitation)
+        self.assertEqual(ljn.resolve(self.index), EcliCitation("NL", "HR", 2006, "AU9722"))
+
+    def test_resolve_many(self):
+        ljns = ["AB4535", "au9722", "AU9723", "ZZ0001", "AU 9722", "AB45351", "AB453", "", "ÀB4535", LjnCitation("AA0000")]
+        expected = [self.index.lookup(ljn) for ljn in ljns]
+
+        self.assertEqual(expected, [
+            "ECLI:NL:RBAMS:2001:AB4535", "ECLI:NL:HR:2006:AU9722", None, "ECLI:NL:CRVB:2010:ZZ0001",
+            "ECLI:NL:HR:2006:AU9722", None, None, None, None, "ECLI:NL:HR:1999:AA0000"
+        ])
+        self.assertEqual(self.index.lookup_many(ljns), expected)
+        self.assertEqual(self.index.lookup_many(["AB1"]), [None])
+        self.assertEqual(self.index.lookup_many([]), [])
+        self.assertEqual(self.index.resolve_many(["AU9722", "AU9723"]), [EcliCitation("NL", "HR", 2006, "AU9722"), None])
+
+    def test_empty_index(self):
+        path = pathlib.Path(self.tmp.name) / "empty.idx"
+        build_ljn_index([], path)
+        with LjnIndex(path) as index:
+            self.assertIsNone(index.lookup("AU9722"))
+            self.assertEqual(index.lookup_many(["AU9722"]), [None])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            build_ljn_index([("AU972", "ECLI:NL:HR:2006:AU9722")], pathlib.Path(self.tmp.name) / "invalid.idx")
+
+        not_an_index = pathlib.Path(self.tmp.name) / "not_an_index"
+        not_an_index.write_bytes(b"\0" * 64)
+        with self.assertRaises(ValueError):
+            LjnIndex(not_an_index)
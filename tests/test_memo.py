@@ -0,0 +1,79 @@
+"""
+    tests/test_memo.py
+
+    Test cases for reusing the citations of paragraphs which were parsed before.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+# pylint: disable=line-too-long, missing-function-docstring
+
+import unittest
+
+from nllegalcit import ParagraphCache, parse_citations, parse_kamerstukcitation
+from nllegalcit.memo import iter_paragraphs
+
+PROSE = "Het hof is van oordeel dat artikel 6 EVRM niet is geschonden, zoals blijkt uit de verklaringen van getuigen. "
+
+BOILERPLATE = "Zie ECLI:NL:HR:2006:AV0653 en Kamerstukken II 2005/06, 30 316, nr. 3."
+
+TEXT = PROSE + "\n\n" + BOILERPLATE + "\n  \n" + PROSE * 3 + "LJN AB4535.\n\n" + BOILERPLATE + "\n"
+
+
+def positions(citations):
+    return [(c, c.start, c.end, c.matched_text) for c in citations]
+
+
+class ParagraphCacheTests(unittest.TestCase):
+    """Test cases for reusing the citations of paragraphs which were parsed before"""
+
+    def test_paragraphs(self):
+        self.assertEqual(list(iter_paragraphs(" a\nb\n\nc\n \t\n\nd\n")), [(1, 4), (6, 7), (12, 13)])
+        self.assertEqual(list(iter_paragraphs("\n\n")), [])
+
+    def test_same_results(self):
+        cache = ParagraphCache()
+
+        for prefilter in (True, False):
+            expected = positions(parse_citations(TEXT, prefilter=prefilter))
+            self.assertEqual(positions(parse_citations(TEXT, prefilter=prefilter, paragraph_cache=cache)), expected)
+            self.assertEqual(positions(parse_citations(TEXT, prefilter=prefilter, paragraph_cache=cache)), expected)
+
+        self.assertEqual(parse_citations(TEXT * 5, window_size=2500, paragraph_cache=cache), parse_citations(TEXT * 5))
+
+    def test_hit_rate(self):
+        cache = ParagraphCache()
+        parse_citations(TEXT, paragraph_cache=cache)
+
+        # The paragraph with only prose is not parsed, and the second boilerplate paragraph is a hit
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 2, 2))
+
+        parse_citations(TEXT, paragraph_cache=cache)
+        self.assertEqual((cache.hits, cache.misses), (4, 2))
+        self.assertAlmostEqual(cache.hit_rate, 4 / 6)
+
+        cache.clear()
+        self.assertEqual((cache.hits, cache.misses, len(cache), cache.hit_rate), (0, 0, 0, 0.0))
+
+    def test_kinds_are_separate(self):
+        cache = ParagraphCache()
+        kamerstukken = parse_kamerstukcitation(BOILERPLATE, paragraph_cache=cache)
+
+        self.assertEqual(len(kamerstukken), 1)
+        self.assertEqual(len(parse_citations(BOILERPLATE, paragraph_cache=cache)), 2)
+        self.assertEqual(cache.hits, 0)
+
+    def test_eviction(self):
+        cache = ParagraphCache(max_paragraphs=2)
+        for year in (2001, 2002, 2001, 2003):
+            parse_citations(f"ECLI:NL:HR:{year}:AB1234", paragraph_cache=cache)
+
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 3, 2))
+
+        # 2002 was the least recently used paragraph
+        parse_citations("ECLI:NL:HR:2002:AB1234", paragraph_cache=cache)
+        self.assertEqual(cache.misses, 4)
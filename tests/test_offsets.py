@@ -0,0 +1,78 @@
+"""
+    tests/test_offsets.py
+
+    Test cases for the positions of citations in the parsed text.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+# pylint: disable=line-too-long, missing-function-docstring
+
+import io
+import mmap
+import tempfile
+import unittest
+
+from nllegalcit import EcliCitation, parse_citations, parse_citations_from_pdf, parse_kamerstukcitation
+
+from .pdf import make_pdf
+
+PROSE = ("Het hof is van oordeel dat artikel 6 EVRM niet is geschonden, zoals blijkt uit de verklaringen "
+         "van getuigen en het proces-verbaal van 3 april. ")
+
+TEXT = (PROSE * 3 + "Zie Kamerstukken II 2005/06, 30 316, nr. 3, p. 7–8. " +
+        PROSE * 8 + "Vgl. ECLI:NL:HR:2006:AV0653 en LJN: AB4535. Één " +
+        PROSE * 8 + "Kamerstukken I 2021/22, 35 925, nr. E.")
+
+
+class OffsetTests(unittest.TestCase):
+    """Test cases for the positions of citations in the parsed text"""
+
+    def assertSpans(self, citations, text):  # pylint: disable=invalid-name
+        self.assertEqual(
+            [text[c.start:c.end] for c in citations],
+            ["II 2005/06, 30 316, nr. 3, p. 7–8", "HR:2006:AV0653", "LJN: AB4535", "I 2021/22, 35 925, nr. E"]
+        )
+
+    def test_offsets(self):
+        citations = parse_citations(TEXT)
+        self.assertSpans(citations, TEXT)
+        self.assertEqual([c.matched_text for c in citations], [TEXT[c.start:c.end] for c in citations])
+
+    def test_offsets_without_prefilter(self):
+        self.assertSpans(parse_citations(TEXT, prefilter=False), TEXT)
+
+    def test_offsets_windowed(self):
+        citations = parse_citations(TEXT, window_size=2100)
+        self.assertSpans(citations, TEXT)
+        self.assertEqual([c.matched_text for c in citations], [TEXT[c.start:c.end] for c in citations])
+
+    def test_offsets_mmap(self):
+        with tempfile.TemporaryFile() as f:
+            f.write(TEXT.encode("utf-8"))
+            f.flush()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                citations = parse_citations(m, window_size=2100)
+
+        # Positions are in characters, not in bytes
+        self.assertSpans(citations, TEXT)
+
+    def test_offsets_kamerstukken(self):
+        citations = parse_kamerstukcitation(TEXT)
+        self.assertEqual([c.matched_text for c in citations], ["II 2005/06, 30 316, nr. 3, p. 7–8", "I 2021/22, 35 925, nr. E"])
+
+    def test_offsets_pdf(self):
+        pages = ["Eerste pagina.", "Zie ECLI:NL:HR:2006:AV0653."]
+        citations = parse_citations_from_pdf(io.BytesIO(make_pdf(pages)))
+        self.assertEqual(citations, [EcliCitation("NL", "HR", 2006, "AV0653")])
+        self.assertEqual(citations[0].matched_text, "HR:2006:AV0653")
+        self.assertEqual(citations[0].page, 2)
+
+    def test_no_offsets(self):
+        citation = EcliCitation("NL", "HR", 2006, "AV0653")
+        self.assertIsNone(citation.start)
+        self.assertIsNone(citation.matched_text)
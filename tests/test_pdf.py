@@ -0,0 +1,77 @@
+"""
+    tests/test_pdf.py
+
+    Test cases for extracting the text of PDF files, page by page.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+# pylint: disable=line-too-long, missing-function-docstring
+
+import io
+import pathlib
+import tempfile
+import unittest
+
+from pypdf import PdfReader
+
+from nllegalcit import EcliCitation, KamerstukCitation, parse_citations_from_pdf
+from nllegalcit.pdf import iter_pdf_pages, page_has_text
+
+from .pdf import make_pdf
+
+PAGES = [
+    "Zie Kamerstukken II 2022/23, 36 229, nr. 1",
+    "",
+    "Geen verwijzingen op deze pagina.",
+    "Vgl. ECLI:NL:HR:2006:AV0653 en\nKamerstukken I 2021/22, 35 925, nr. E",
+]
+
+EXPECTED = [
+    KamerstukCitation("II", "2022-2023", "36229", "1"),
+    EcliCitation("NL", "HR", 2006, "AV0653"),
+    KamerstukCitation("I", "2021-2022", "35925", "E"),
+]
+
+
+def _without_fonts(pdf: bytes) -> bytes:
+    """Turn the pages of a PDF into pages without fonts, like scanned pages"""
+    return pdf.replace(b"/Resources << /Font << /F1 3 0 R >> >>", b"/Resources <<                    >>")
+
+
+class PdfTests(unittest.TestCase):
+    """Test cases for extracting the text of PDF files, page by page"""
+
+    def test_page_has_text(self):
+        pdf = make_pdf(PAGES)
+        self.assertTrue(all(page_has_text(page) for page in PdfReader(io.BytesIO(pdf)).pages))
+
+        pdf = _without_fonts(pdf)
+        self.assertFalse(any(page_has_text(page) for page in PdfReader(io.BytesIO(pdf)).pages))
+        self.assertEqual(list(iter_pdf_pages(io.BytesIO(pdf))), ["", "", "", ""])
+
+    def test_workers_keep_page_order(self):
+        pdf = make_pdf(PAGES * 3)
+        self.assertEqual(
+            list(iter_pdf_pages(io.BytesIO(pdf), workers=2)),
+            list(iter_pdf_pages(io.BytesIO(pdf)))
+        )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / "test.pdf"
+            path.write_bytes(pdf)
+            self.assertEqual(list(iter_pdf_pages(path, workers=2)), list(iter_pdf_pages(io.BytesIO(pdf))))
+
+    def test_page_numbers(self):
+        citations = parse_citations_from_pdf(io.BytesIO(make_pdf(PAGES)))
+        self.assertEqual(citations, EXPECTED)
+        self.assertEqual([c.page for c in citations], [1, 4, 4])
+
+    def test_page_numbers_workers(self):
+        citations = parse_citations_from_pdf(io.BytesIO(make_pdf(PAGES * 2)), workers=2)
+        self.assertEqual(citations, EXPECTED * 2)
+        self.assertEqual([c.page for c in citations], [1, 4, 4, 5, 8, 8])
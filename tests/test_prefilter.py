@@ -0,0 +1,88 @@
+"""
+    tests/test_prefilter.py
+
+    Test cases for the trigger-based prefilter, which limits parsing to candidate windows.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+# pylint: disable=line-too-long, missing-function-docstring
+
+import unittest
+
+from nllegalcit import parse_citations, parse_kamerstukcitation
+from nllegalcit.citations import KamerstukCitation
+from nllegalcit.prefilter import candidate_windows, re_trigger_kamerstuk
+
+PROSE = ("De rechtbank overweegt dat de verdachte op 12 maart 2019 te Amsterdam opzettelijk heeft gehandeld, "
+         "zoals blijkt uit de verklaringen van getuigen en het proces-verbaal van 3 april. ")
+
+DOCUMENT = (
+    PROSE * 5 +
+    "Zie Kamerstukken II 2005/06, 30 316, nr. 3, p. 7–8. " +
+    PROSE * 5 +
+    "Vgl. HR 6 juni 2006, ECLI:NL:HR:2006:AV0653 en LJN: AB4535. " +
+    PROSE * 5 +
+    "Kamerstukken I 2021/22, 35 925, nr. E" +
+    PROSE
+)
+
+
+class PrefilterTests(unittest.TestCase):
+    """Test cases for the trigger-based prefilter"""
+
+    def test_no_triggers(self):
+        self.assertEqual(candidate_windows(PROSE * 5), [])
+        self.assertEqual(parse_citations(PROSE * 5), [])
+
+    def test_windows_are_bounded(self):
+        windows = candidate_windows(DOCUMENT, margin=50)
+        self.assertEqual(len(windows), 3)
+        self.assertLess(sum(end - start for start, end in windows), len(DOCUMENT) // 2)
+
+        for start, end in windows:
+            self.assertTrue(start == 0 or DOCUMENT[start - 1].isspace())
+            self.assertTrue(end == len(DOCUMENT) or DOCUMENT[end].isspace())
+
+    def test_overlapping_windows_are_merged(self):
+        windows = candidate_windows("ECLI:NL:HR:2006:AV0653 en ECLI:NL:HR:2006:AV0654")
+        self.assertEqual(windows, [(0, 48)])
+
+    def test_same_as_full_parse(self):
+        full = parse_citations(DOCUMENT, prefilter=False)
+        self.assertEqual(len(full), 4)
+        self.assertEqual(parse_citations(DOCUMENT), full)
+        self.assertEqual(
+            [c.matched_text for c in parse_citations(DOCUMENT)],
+            [c.matched_text for c in full]
+        )
+
+        # Non-breaking spaces, as often found in text extracted from PDF files, are whitespace in the grammars
+        for text in ("Zie LJN\xa0AB4535 en", "Zie HR\xa0:\xa02006:AV0653 en", "Kamerstukken II, vergaderjaar\xa02005-2006, 30 316, nr. 3"):
+            with self.subTest(text=text):
+                full = parse_citations(text, prefilter=False)
+                self.assertEqual(len(full), 1)
+                self.assertEqual(parse_citations(text), full)
+
+    def test_same_as_full_parse_kamerstukken(self):
+        self.assertEqual(
+            parse_kamerstukcitation(DOCUMENT),
+            parse_kamerstukcitation(DOCUMENT, prefilter=False)
+        )
+
+    def test_kamerstuk_triggers(self):
+        text = "Vgl. HR 6 juni 2006, ECLI:NL:HR:2006:AV0653 en LJN: AB4535."
+        self.assertEqual(len(candidate_windows(text)), 1)
+        self.assertEqual(candidate_windows(text, trigger=re_trigger_kamerstuk), [])
+        self.assertEqual(candidate_windows(DOCUMENT, trigger=re_trigger_kamerstuk, margin=50),
+                         [window for window in candidate_windows(DOCUMENT, margin=50) if "Kamerstukken" in DOCUMENT[window[0]:window[1]]])
+
+    def test_kamerstuk_grammar_same_as_full_grammar(self):
+        self.assertEqual(
+            parse_kamerstukcitation(DOCUMENT, prefilter=False),
+            [c for c in parse_citations(DOCUMENT, prefilter=False) if isinstance(c, KamerstukCitation)]
+        )
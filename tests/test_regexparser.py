@@ -0,0 +1,72 @@
+"""
+    tests/test_regexparser.py
+
+    Test cases for the regex engine, which must find the same citations as the Earley parser.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+# pylint: disable=line-too-long, missing-function-docstring
+
+import unittest
+
+from lark import Lark
+
+from nllegalcit import parse_citations, parse_kamerstukcitation, summarize_citations
+from nllegalcit.regexparser import RegexParser
+
+TEXTS = [
+    "Zie ECLI:NL:HR:2006:AV0653.",
+    "ECLI:NL:HR:2006:AV0653",
+    "a ECLI:DE:BGH:2019:123",
+    "LJN AB12345",
+    "HR 6 juni 2006, ECLI:NL:HR:2006:AV0653 en LJN: AB4535.",
+    "Kamerstukken II 2005/06, 30 316, nr. 3, p. 7–8.",
+    "Zie Kamerstukken I 1979/80, 15 300, nr. 42e, blz. 7 en Kamerstukken II 2016/17, 34 550, nr. 3, p. 25-26.",
+    "(Kamerstukken II, 1984–1985, 18764, nrs. 1–3, blz. 29)",
+    "Kamerstukken II 2019/20, 35 300,                                    nr. 6, p. 12",
+    "Kamerstukken II 2021/22, 35 925, nr. E en Kamerstukken 35 925, nr. 3",
+]
+
+
+class RegexEngineTests(unittest.TestCase):
+    """Test cases for parsing with engine="regex\""""
+
+    def assertSameCitations(self, earley, regex):  # pylint: disable=invalid-name
+        self.assertEqual([(c, c.start, c.end) for c in regex], [(c, c.start, c.end) for c in earley])
+
+    def test_same_as_earley(self):
+        for text in TEXTS:
+            for prefilter in (True, False):
+                with self.subTest(text=text, prefilter=prefilter):
+                    self.assertSameCitations(parse_citations(text, prefilter=prefilter),
+                                             parse_citations(text, prefilter=prefilter, engine="regex"))
+
+    def test_same_as_earley_types(self):
+        text = " ".join(TEXTS)
+        for types in ("ecli", "ljn", ("ecli", "ljn"), "kamerstuk"):
+            with self.subTest(types=types):
+                self.assertSameCitations(parse_citations(text, types=types),
+                                         parse_citations(text, types=types, engine="regex"))
+
+        self.assertSameCitations(parse_kamerstukcitation(text), parse_kamerstukcitation(text, engine="regex"))
+
+    def test_same_summary(self):
+        text = " ".join(TEXTS * 10)
+        self.assertEqual(summarize_citations(text, window_size=2100),
+                         summarize_citations(text, window_size=2100, engine="regex"))
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            parse_citations("Zie ECLI:NL:HR:2006:AV0653.", engine="lalr")
+
+        with self.assertRaises(ValueError):
+            parse_citations("Geen citaties.", engine="lalr")
+
+    def test_unsupported_grammar(self):
+        with self.assertRaises(ValueError):
+            RegexParser(Lark('start: "a"+', parser="earley"))
@@ -0,0 +1,92 @@
+"""
+    tests/test_stats.py
+
+    Test cases for collecting stats of the stages of finding citations.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+# pylint: disable=line-too-long, missing-function-docstring
+
+import io
+import unittest
+from unittest import mock
+
+from nllegalcit import Stats, collect_stats, parse_citations, parse_citations_from_pdf, parse_citations_from_pdf_url, summarize_citations
+from nllegalcit.stats import current_stats
+
+from .pdf import make_pdf
+
+TEXT = "Zie ECLI:NL:HR:2006:AV0653 en LJN AB4535. Vgl. Kamerstukken II 2005/06, 30 316, nr. 3."
+
+
+class StatsTests(unittest.TestCase):
+    """Test cases for collecting stats of the stages of finding citations"""
+
+    def test_disabled(self):
+        self.assertIsNone(current_stats())
+
+    def test_parse(self):
+        with collect_stats() as stats:
+            parse_citations(TEXT, prefilter=False)
+
+        self.assertIsNone(current_stats())
+        self.assertEqual(stats.stages["parse"].calls, 1)
+        self.assertEqual(stats.stages["parse"].size, len(TEXT))
+        self.assertGreater(stats.stages["parse"].seconds, 0)
+        self.assertEqual(stats.stages["visit"].calls, 1)
+        self.assertEqual(stats.stages["visit"].size, stats.nodes)
+        self.assertGreater(stats.nodes, 10)
+        self.assertEqual(stats.citations, {"EcliCitation": 1, "LjnCitation": 1, "KamerstukCitation": 1})
+        self.assertEqual(stats.stages["pdf_extract"].calls, 0)
+
+        # Nothing is recorded after the with statement
+        parse_citations(TEXT)
+        self.assertEqual(stats.stages["parse"].calls, 1)
+
+    def test_pdf(self):
+        with collect_stats() as stats:
+            parse_citations_from_pdf(io.BytesIO(make_pdf(["ECLI:NL:HR:2006:AV0653", "", "LJN AB4535"])))
+
+        self.assertEqual(stats.stages["pdf_extract"].calls, 3)
+        self.assertEqual(stats.citations, {"EcliCitation": 1, "LjnCitation": 1})
+
+    def test_download(self):
+        response = mock.Mock(content=make_pdf(["LJN AB4535"]))
+        with mock.patch("requests.get", return_value=response), collect_stats() as stats:
+            parse_citations_from_pdf_url("https://example.org/a.pdf")
+
+        self.assertEqual(stats.stages["download"].calls, 1)
+        self.assertEqual(stats.stages["download"].size, len(response.content))
+
+    def test_callback(self):
+        calls = []
+        with collect_stats(Stats(callback=lambda *args: calls.append(args))):
+            parse_citations(TEXT)
+
+        self.assertEqual({stage for stage, _, _ in calls}, {"parse", "visit"})
+
+    def test_summary(self):
+        with collect_stats() as outer:
+            with collect_stats() as inner:
+                parse_citations(TEXT)
+            parse_citations(TEXT)
+
+        summary = inner.summary()
+        self.assertEqual(summary["citations"], {"EcliCitation": 1, "LjnCitation": 1, "KamerstukCitation": 1})
+        self.assertEqual(summary["stages"]["parse"]["calls"], inner.stages["parse"].calls)
+        self.assertLessEqual(summary["stages"]["parse"]["p50_seconds"], summary["stages"]["parse"]["p99_seconds"])
+        self.assertEqual(outer.stages["parse"].calls, inner.stages["parse"].calls)
+
+        # summarize_citations counts the same citations as parse_citations
+        with collect_stats() as parsed:
+            parse_citations(TEXT + " " + TEXT)
+        with collect_stats() as summarized:
+            summarize_citations(TEXT + " " + TEXT)
+
+        self.assertEqual(summarized.summary()["citations"], {"EcliCitation": 2, "LjnCitation": 2, "KamerstukCitation": 2})
+        self.assertEqual((summarized.nodes, summarized.citations), (parsed.nodes, parsed.citations))
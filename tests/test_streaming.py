@@ -0,0 +1,80 @@
+"""
+    tests/test_streaming.py
+
+    Test cases for iterating over citations as soon as they are found.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+# pylint: disable=line-too-long, missing-function-docstring
+
+import io
+import unittest
+
+from nllegalcit import (EcliCitation, KamerstukCitation, parse_citations, parse_kamerstukcitation, iter_citations,
+                        iter_citations_from_pdf, iter_kamerstukcitations, parse_citations_from_pdf)
+from nllegalcit.windows import iter_chunk_windows
+
+from .pdf import make_pdf
+
+PROSE = ("De rechtbank overweegt dat de verdachte op 12 maart 2019 te Amsterdam opzettelijk heeft gehandeld,\n"
+         "zoals blijkt uit de verklaringen van getuigen en het proces-verbaal van 3 april.\n")
+
+TEXT = (PROSE * 3 + "Zie Kamerstukken II 2005/06, 30 316, nr. 3, p. 7–8.\n" +
+        PROSE * 3 + "Vgl. ECLI:NL:HR:2006:AV0653.\n")
+
+
+class StreamingTests(unittest.TestCase):
+    """Test cases for iterating over citations as soon as they are found"""
+
+    def test_iter_citations(self):
+        citations = iter_citations(TEXT)
+        self.assertEqual(next(citations), KamerstukCitation("II", "2005-2006", "30316", "3", paginaverwijzing="7-8"))
+        self.assertEqual(next(citations), EcliCitation("NL", "HR", 2006, "AV0653"))
+        self.assertEqual(list(citations), [])
+
+    def test_iter_citations_windowed(self):
+        self.assertEqual(list(iter_citations(TEXT * 4, window_size=2100)), parse_citations(TEXT * 4))
+
+    def test_iter_kamerstukcitations(self):
+        self.assertEqual(list(iter_kamerstukcitations(TEXT)), parse_kamerstukcitation(TEXT))
+
+    def test_chunk_windows_are_yielded_before_the_end(self):
+        received = []
+
+        def chunks():
+            for i in range(5):
+                received.append(i)
+                yield PROSE * 20
+
+        windows = iter_chunk_windows(chunks(), window_size=6000, overlap=400)
+        next(windows)
+        self.assertEqual(received, [0])
+
+        rest = list(windows)
+        self.assertEqual(received, [0, 1, 2, 3, 4])
+
+        window, offset, cut = rest[-1]
+        self.assertEqual(offset + len(window), 5 * len(PROSE * 20))
+        self.assertEqual(cut, len(window))
+
+    def test_pdf_page_by_page(self):
+        pages = [
+            PROSE * 12 + "Zie Kamerstukken II 2005/06, 30 316,",
+            "nr. 3, p. 7–8.\n" + PROSE * 12,
+            "",
+            PROSE * 10 + "Vgl. ECLI:NL:HR:2006:AV0653.\n",
+        ]
+        pdf = make_pdf(pages)
+
+        expected = [
+            KamerstukCitation("II", "2005-2006", "30316", "3", paginaverwijzing="7-8"),
+            EcliCitation("NL", "HR", 2006, "AV0653")
+        ]
+
+        self.assertEqual(list(iter_citations_from_pdf(io.BytesIO(pdf))), expected)
+        self.assertEqual(parse_citations_from_pdf(io.BytesIO(pdf)), expected)
@@ -0,0 +1,50 @@
+"""
+    tests/test_summary.py
+
+    Test cases for counting the distinct citations in a text.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+# pylint: disable=line-too-long, missing-function-docstring
+
+import collections
+import unittest
+
+from nllegalcit import CitationSummary, EcliCitation, KamerstukCitation, LjnCitation, parse_citations, summarize_citations
+
+PROSE = "Het hof is van oordeel dat artikel 6 EVRM niet is geschonden, zoals blijkt uit de verklaringen van getuigen. "
+
+TEXT = (PROSE * 5 + "Zie ECLI:NL:HR:2006:AV0653 en LJN AB4535. " +
+        PROSE * 10 + "Vgl. Kamerstukken II 2005/06, 30 316, nr. 3 en HR 2006 (ECLI:NL:HR:2006:AV0653). " +
+        PROSE * 10 + "Zie opnieuw ECLI:NL:HR:2006:AV0653 en Kamerstukken II 2005/06, 30 316, nr. 3.")
+
+
+class SummaryTests(unittest.TestCase):
+    """Test cases for counting the distinct citations in a text"""
+
+    def test_summary(self):
+        summary = summarize_citations(TEXT)
+        ecli_starts = [TEXT.find("HR:2006:AV0653", i) for i in (0, 1000, 2500)]
+        kamerstuk_starts = [TEXT.find("II 2005/06", i) for i in (0, 2500)]
+
+        self.assertEqual(summary, [
+            CitationSummary(EcliCitation("NL", "HR", 2006, "AV0653"), 3, ecli_starts[0], ecli_starts[2]),
+            CitationSummary(LjnCitation("AB4535"), 1, TEXT.find("LJN"), TEXT.find("LJN")),
+            CitationSummary(KamerstukCitation("II", "2005-2006", "30316", "3"), 2, kamerstuk_starts[0], kamerstuk_starts[1]),
+        ])
+
+    def test_summary_matches_parse_citations(self):
+        counts = collections.Counter(parse_citations(TEXT))
+        self.assertEqual({s.citation: s.count for s in summarize_citations(TEXT)}, counts)
+        self.assertEqual(summarize_citations(TEXT, prefilter=False), summarize_citations(TEXT))
+
+    def test_summary_windowed(self):
+        self.assertEqual(summarize_citations(TEXT, window_size=2100), summarize_citations(TEXT))
+
+    def test_empty(self):
+        self.assertEqual(summarize_citations(PROSE), [])
@@ -0,0 +1,77 @@
+"""
+    tests/test_windows.py
+
+    Test cases for parsing long texts window by window.
+
+    Copyright 2023, Martijn Staal <nllegalcit [at] martijn-staal.nl>
+
+    Available under the EUPL-1.2, or, at your option, any later version.
+
+    SPDX-License-Identifier: EUPL-1.2
+"""
+
+# pylint: disable=line-too-long, missing-function-docstring
+
+import mmap
+import tempfile
+import unittest
+
+from nllegalcit import parse_citations, parse_kamerstukcitation
+from nllegalcit.windows import iter_windows
+
+PROSE = ("De rechtbank overweegt dat de verdachte op 12 maart 2019 te Amsterdam opzettelijk heeft gehandeld, "
+         "zoals blijkt uit de verklaringen van getuigen en het proces-verbaal van 3 april. ")
+
+CITATIONS = [
+    "Kamerstukken II 2005/06, 30 316, nr. 3, p. 7–8. ",
+    "ECLI:NL:HR:2006:AV0653. ",
+    "LJN: AB4535.\n\n",
+    "Kamerstukken I 2021/22, 35 925, nr. E. ",
+    "ECLI:EU:C:2019:1145. ",
+]
+
+DOCUMENT = "".join(PROSE * (i % 4 + 1) + c for i, c in enumerate(CITATIONS * 2))
+
+
+class WindowTests(unittest.TestCase):
+    """Test cases for parsing long texts window by window"""
+
+    def test_windows_cover_text(self):
+        previous_end = 0
+        for window, offset, cut in iter_windows(DOCUMENT, window_size=2000, overlap=400):
+            self.assertLessEqual(len(window), 2000)
+            self.assertLessEqual(offset, previous_end - 400 if offset > 0 else 0)
+            self.assertEqual(DOCUMENT[offset:offset + len(window)], window)
+            self.assertLessEqual(cut, len(window))
+            previous_end = offset + len(window)
+
+        self.assertEqual(previous_end, len(DOCUMENT))
+
+    def test_invalid_window_size(self):
+        with self.assertRaises(ValueError):
+            list(iter_windows(DOCUMENT, window_size=500, overlap=400))
+
+    def test_same_as_single_window(self):
+        expected = parse_citations(DOCUMENT)
+        self.assertEqual(len(expected), 10)
+
+        for window_size in (2100, 3000):
+            citations = parse_citations(DOCUMENT, window_size=window_size)
+            self.assertEqual(citations, expected)
+            self.assertEqual([c.matched_text for c in citations], [c.matched_text for c in expected])
+
+    def test_kamerstukken(self):
+        self.assertEqual(
+            parse_kamerstukcitation(DOCUMENT, window_size=2500),
+            parse_kamerstukcitation(DOCUMENT)
+        )
+
+    def test_mmap(self):
+        expected = parse_citations("Één " + DOCUMENT)
+
+        with tempfile.TemporaryFile() as f:
+            f.write(("Één " + DOCUMENT).encode("utf-8"))
+            f.flush()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                self.assertEqual(parse_citations(m, window_size=2500), expected)
+                self.assertEqual(parse_citations(m), expected)
@@ -35,15 +35,15 @@ def create_constructor_for_citation(c: Citation) -> str:
 
     if isinstance(c, KamerstukCitation):
         if c.paginaverwijzing is None and c.rijksdossiernummer is None:
-            return f"KamerstukCitation(\"{c.kamer}\", \"{c.vergaderjaar}\", \"{c.dossiernummer}\", \"{c.ondernummer}\")"
+            return f"KamerstukCitation(\"{c.kamer.value}\", \"{c.vergaderjaar}\", \"{c.dossiernummer}\", \"{c.ondernummer}\")"
 
         if c.paginaverwijzing is not None and c.rijksdossiernummer is None:
-            return f"KamerstukCitation(\"{c.kamer}\", \"{c.vergaderjaar}\", \"{c.dossiernummer}\", \"{c.ondernummer}\", paginaverwijzing=\"{c.paginaverwijzing}\")"
+            return f"KamerstukCitation(\"{c.kamer.value}\", \"{c.vergaderjaar}\", \"{c.dossiernummer}\", \"{c.ondernummer}\", paginaverwijzing=\"{c.paginaverwijzing}\")"
 
         if c.paginaverwijzing is None and c.rijksdossiernummer is not None:
-            return f"KamerstukCitation(\"{c.kamer}\", \"{c.vergaderjaar}\", \"{c.dossiernummer}\", \"{c.ondernummer}\", rijksdossiernummer=\"{c.rijksdossiernummer}\")"
+            return f"KamerstukCitation(\"{c.kamer.value}\", \"{c.vergaderjaar}\", \"{c.dossiernummer}\", \"{c.ondernummer}\", rijksdossiernummer=\"{c.rijksdossiernummer}\")"
 
-        return f"KamerstukCitation(\"{c.kamer}\", \"{c.vergaderjaar}\", \"{c.dossiernummer}\", \"{c.ondernummer}\", rijksdossiernummer=\"{c.rijksdossiernummer}\", paginaverwijzing=\"{c.paginaverwijzing}\")"
+        return f"KamerstukCitation(\"{c.kamer.value}\", \"{c.vergaderjaar}\", \"{c.dossiernummer}\", \"{c.ondernummer}\", rijksdossiernummer=\"{c.rijksdossiernummer}\", paginaverwijzing=\"{c.paginaverwijzing}\")"
 
 
 test_count: int = args.startcount